@@ -0,0 +1,138 @@
+""" Compares the tuple heap (PriorityQueue), the indexed heap of
+parallel lists (CompactQueue) and the lazy-deletion heap (LazyQueue):
+memory per queued vertex, time of mixes of operations and time of a
+replanning scenario. The mixes are:
+
+    updates: LPA*-like, most operations remove and reinsert a vertex.
+    removes: vertices are removed more often than they are popped.
+    pops: vertices are inserted and popped, rarely removed.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_queue.py [operations] [size]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+from lpastar_pf.CompactQueue import CompactQueue
+from lpastar_pf.LazyQueue import LazyQueue
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+from lpastar_pf.PriorityQueue import PriorityQueue
+
+
+class StillAgent(GAgent):
+
+    def __init__(self, position):
+        super().__init__()
+        self.position = position
+
+    def get_position(self):
+        return self.position
+
+    def follow_trajectory(self, points):
+        pass
+
+    def stop_trajectory(self):
+        pass
+
+
+class EmptySensor(ASensor):
+
+    def scan(self, origin):
+        return []
+
+
+QUEUES = (("heap", lambda rows: PriorityQueue()),
+          ("compact", lambda rows: CompactQueue(rows)),
+          ("lazy", lambda rows: LazyQueue(rows)))
+
+# Cumulated probabilities of an update (remove then insert), a remove
+# and a pop, the other operations are inserts.
+WORKLOADS = (("updates", (0.6, 0.7, 0.8)),
+             ("removes", (0.2, 0.6, 0.7)),
+             ("pops", (0.05, 0.1, 0.6)))
+
+
+def memory(factory, size):
+    rng = random.Random(0)
+    tracemalloc.start()
+    queue = factory(size)
+    for i in range(size):
+        queue.insert((rng.random() * 1000, rng.random() * 1000),
+                     (i, rng.randrange(size)))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / size
+
+
+def operations(factory, mix, count, size):
+    rng = random.Random(1)
+    ops = [(rng.random(), (rng.randrange(size), rng.randrange(size)),
+            (float(rng.randrange(1000)), float(rng.randrange(1000))))
+           for _ in range(count)]
+    queue = factory(size)
+    begin = time.perf_counter()
+    update, remove, pop = mix
+    for r, vertex, key in ops:
+        if r < update:
+            queue.remove(vertex)
+            queue.insert(key, vertex)
+        elif r < remove:
+            queue.remove(vertex)
+        elif r < pop:
+            try:
+                queue.pop()
+            except Exception:
+                pass
+        else:
+            queue.remove(vertex)
+            queue.insert(key, vertex)
+    return time.perf_counter() - begin
+
+
+def replanning(queue):
+    params = {
+        "width": 3000,
+        "height": 2000,
+        "resolution": 10,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "period": 0,
+        "timeout": 600,
+        "queue": queue
+    }
+    path_finder = LPAStarPathFinder(StillAgent((5.0, 5.0, 0.0)),
+                                    EmptySensor(), params)
+    path_finder.map.set_static_obstacles(
+        [(100, j) for j in range(0, 190)] +
+        [(200, j) for j in range(10, 200)])
+    begin = time.perf_counter()
+    path_finder.reset((2995.0, 5.0))
+    path_finder.compute_shortest_path()
+    first = time.perf_counter() - begin
+    changed = path_finder.map.set_obstacles([(150, j) for j in range(150)])
+    begin = time.perf_counter()
+    path_finder.update_vertices(changed)
+    path_finder.compute_shortest_path()
+    return first, time.perf_counter() - begin
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    print("%-8s %12s" % ("queue", "bytes/entry")
+          + "".join(" %12s" % (name + " (s)") for name, _ in WORKLOADS)
+          + " %10s %10s" % ("plan (s)", "replan (s)"))
+    for name, factory in QUEUES:
+        first, second = replanning(name)
+        print("%-8s %12.1f" % (name, memory(factory, 10000))
+              + "".join(" %12.3f" % operations(factory, mix, count, size)
+                        for _, mix in WORKLOADS)
+              + " %10.3f %10.3f" % (first, second))
+
+
+if __name__ == "__main__":
+    main()
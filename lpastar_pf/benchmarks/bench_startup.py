@@ -0,0 +1,110 @@
+""" Measures the startup cost of LPAStarPathFinder: the import time of
+the planner in a fresh interpreter, the construction time of the planner
+and the time of its first reset, which allocates the g/rhs storage.
+Asserts that importing the planner does not import the optional
+modules, which are only imported when their feature is enabled.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_startup.py [width] [height] [res]
+"""
+import os
+import subprocess
+import sys
+import time
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+
+
+class StillAgent(GAgent):
+
+    def __init__(self, position):
+        super().__init__()
+        self.position = position
+
+    def get_position(self):
+        return self.position
+
+    def follow_trajectory(self, points):
+        pass
+
+    def stop_trajectory(self):
+        pass
+
+
+class EmptySensor(ASensor):
+
+    def scan(self, origin):
+        return []
+
+
+OPTIONAL = ["multiprocessing", "PIL", "lpastar_pf.TiledGMap",
+            "lpastar_pf.RecedingHorizon", "lpastar_pf.PathCache",
+            "lpastar_pf.landmarks", "lpastar_pf.bidirectional",
+            "lpastar_pf.metrics", "lpastar_pf.SafeIntervalPlanner",
+            "lpastar_pf.BeliefGrid", "lpastar_pf.ARaySensor",
+            "lpastar_pf.tour", "lpastar_pf.replay", "lpastar_pf.profiling"]
+
+
+def lazy_imports():
+    code = "import sys\n" \
+        "import lpastar_pf.LPAStarPathFinder\n" \
+        "print(' '.join(m for m in %r if m in sys.modules))" % OPTIONAL
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    return subprocess.run([sys.executable, "-c", code], check=True,
+                          capture_output=True, text=True,
+                          env=env).stdout.split()
+
+
+def import_time(repeat=5):
+    code = "import time\n" \
+        "begin = time.perf_counter()\n" \
+        "import lpastar_pf.LPAStarPathFinder\n" \
+        "print(time.perf_counter() - begin)"
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    return min(float(subprocess.run([sys.executable, "-c", code],
+                                    check=True, capture_output=True,
+                                    text=True, env=env).stdout)
+               for _ in range(repeat))
+
+
+def run(storage, width, height, resolution):
+    params = {
+        "width": width,
+        "height": height,
+        "resolution": resolution,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "period": 0,
+        "timeout": 600,
+        "storage": storage
+    }
+    begin = time.perf_counter()
+    path_finder = LPAStarPathFinder(StillAgent((resolution / 2,
+                                                resolution / 2, 0.0)),
+                                    EmptySensor(), params)
+    constructed = time.perf_counter()
+    path_finder.reset((width - resolution / 2, height - resolution / 2))
+    return constructed - begin, time.perf_counter() - constructed
+
+
+def main():
+    width = float(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    height = float(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    resolution = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    loaded = lazy_imports()
+    assert not loaded, "optional modules imported eagerly: " + \
+        ", ".join(loaded)
+    print("import: %.1f ms, no optional module" % (import_time() * 1e3))
+    print("map: %d x %d cases" % (width / resolution, height / resolution))
+    print("%-8s %18s %18s" % ("storage", "construction (ms)",
+                              "first reset (ms)"))
+    for storage in ("dense", "sparse"):
+        construction, reset = run(storage, width, height, resolution)
+        print("%-8s %18.1f %18.1f" % (storage, construction * 1e3,
+                                      reset * 1e3))
+
+
+if __name__ == "__main__":
+    main()
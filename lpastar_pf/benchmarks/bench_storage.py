@@ -0,0 +1,137 @@
+""" Compares dense and sparse g/rhs storage of LPAStarPathFinder on a
+large map where the search only explores a corridor, then compares
+the dense grids before and after they moved from NumPy arrays indexed
+by [i, j] back to lists of lists indexed by [i][j], on the accesses
+of the rhs-value computation.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_storage.py [width] [height] [res]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+from lpastar_pf.storage import grid_nbytes
+
+
+class StillAgent(GAgent):
+
+    def __init__(self, position):
+        super().__init__()
+        self.position = position
+
+    def get_position(self):
+        return self.position
+
+    def follow_trajectory(self, points):
+        pass
+
+    def stop_trajectory(self):
+        pass
+
+
+class EmptySensor(ASensor):
+
+    def scan(self, origin):
+        return []
+
+
+def run(storage, width, height, resolution):
+    params = {
+        "width": width,
+        "height": height,
+        "resolution": resolution,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "period": 0,
+        "timeout": 600,
+        "storage": storage
+    }
+    y = height / 2
+    path_finder = LPAStarPathFinder(StillAgent((resolution / 2, y, 0.0)),
+                                    EmptySensor(), params)
+
+    tracemalloc.start()
+    begin = time.perf_counter()
+    path_finder.reset((width - resolution / 2, y))
+    path = path_finder.compute_shortest_path()
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    grids = grid_nbytes(path_finder.g) + grid_nbytes(path_finder.rhs) + \
+        grid_nbytes(path_finder.parents)
+    return len(path), elapsed, grids, peak
+
+
+def access(dense, columns, rows):
+    """ Computes the rhs-value and the parent of every inner vertex of
+    a **columns x rows** grid from its 8 neighbours, as
+    __compute_rhs does, with NumPy arrays indexed by [i, j] (the dense
+    grids before) or lists indexed by [i][j] (the dense grids after).
+    Returns the time per vertex in microseconds.
+    """
+    moves = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+             if di != 0 or dj != 0]
+    if dense == "numpy":
+        g = np.full((columns, rows), 1.0)
+        rhs = np.full((columns, rows), np.inf)
+        parents = np.full((columns, rows), -1, dtype=np.int8)
+        begin = time.perf_counter()
+        for i in range(1, columns - 1):
+            for j in range(1, rows - 1):
+                best, parent = float("inf"), -1
+                for di, dj in moves:
+                    cost = g[i + di, j + dj] + 1.0
+                    if cost < best:
+                        best, parent = cost, 3 * (di + 1) + dj + 1
+                rhs[i, j] = best
+                parents[i, j] = parent
+    else:
+        g = [[1.0] * rows for _ in range(columns)]
+        rhs = [[float("inf")] * rows for _ in range(columns)]
+        parents = [[-1] * rows for _ in range(columns)]
+        begin = time.perf_counter()
+        for i in range(1, columns - 1):
+            for j in range(1, rows - 1):
+                best, parent = float("inf"), -1
+                for di, dj in moves:
+                    cost = g[i + di][j + dj] + 1.0
+                    if cost < best:
+                        best, parent = cost, 3 * (di + 1) + dj + 1
+                rhs[i][j] = best
+                parents[i][j] = parent
+    elapsed = time.perf_counter() - begin
+    return elapsed * 1e6 / ((columns - 2) * (rows - 2))
+
+
+def main():
+    width = float(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    height = float(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    resolution = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    print("map: %d x %d cases" % (width / resolution, height / resolution))
+    print("%-8s %8s %10s %14s %14s" % ("storage", "path", "time (s)",
+                                       "grids (MiB)", "peak (MiB)"))
+    for storage in ("dense", "sparse"):
+        length, elapsed, grids, peak = run(storage, width, height,
+                                           resolution)
+        print("%-8s %8d %10.3f %14.2f %14.2f" % (storage, length, elapsed,
+                                                 grids / 2 ** 20,
+                                                 peak / 2 ** 20))
+
+    print()
+    print("dense grid accesses, per computed rhs-value")
+    print("%-22s %10s" % ("dense grids", "time (us)"))
+    before = access("numpy", 500, 500)
+    after = access("lists", 500, 500)
+    print("%-22s %10.3f" % ("before: numpy [i, j]", before))
+    print("%-22s %10.3f" % ("after: lists [i][j]", after))
+    print("speedup: %.2fx" % (before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from abc import abstractmethod
+from lpastar_pf.ASensor import ASensor
+from typing import Tuple
+import numpy as np
+
+
+class ARaySensor(ASensor):
+
+    """ Abstract class ARaySensor for range sensors which cast rays,
+    as lidars. Besides the obstacles, they report their rays, so the
+    space seen free along a ray can be cleared from the map. Your
+    sensor class must inherit from it and override the scan and the
+    scan_rays methods to use the **belief_grid** parameter of
+    LPAStarPathFinder.
+
+    Methods
+    -------
+
+    scan(origin):
+        Scans the environment and returns a list of
+        absolute coordinates of obstacles.
+    scan_rays(origin):
+        Scans the environment and returns the end of each ray.
+    """
+
+    @abstractmethod
+    def scan_rays(self, origin: Tuple[float, float, float]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        """ Scans the environment according to the sensor position and
+        returns where each ray has stopped.
+
+        Args:
+            origin (Tuple[float, float, float]):
+                The position of the sensor in the **[x, y, alpha]**
+                format, where **(x, y)** are the coordinates of the
+                sensor and **alpha** is its orientation. Rays start
+                from **(x, y)**.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: A **N x 2** array of the
+            absolute coordinates of the ends of the rays, and a
+            boolean array of size **N**, True where a ray has stopped
+            on an obstacle and False where it has reached its range
+        """
+        pass
@@ -34,6 +34,8 @@ class ASensor(ABC):
             Iterable[Tuple[float, float, float]]: An Iterable(list generally)
             of the obstacles in the **[x, y, w]** format, where **(x, y)** are
             the absolute coordinates of the center of an obstacle and **w**
-            is its width
+            is its width. Moving obstacles may be given in the
+            **[x, y, w, vx, vy]** format, where **(vx, vy)** is their
+            velocity in map units per second.
         """
         pass
@@ -0,0 +1,231 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.pf_exceptions import MapInitializationException
+from typing import Tuple
+import numpy as np
+
+
+class BeliefGrid:
+
+    """ A persistent occupancy grid built from the rays of a sensor.
+    The cases a ray crosses are observed free and the case where it
+    stops on an obstacle is observed occupied, the other cases keep
+    their belief: what is out of sight is not forgotten, and a wall
+    seen again changes nothing. A case both crossed by a ray and hit
+    by another one is observed occupied.
+
+    Each observation adds **hit** or **miss** to the log-odds of the
+    case, bounded by **limit**. A free case becomes occupied when its
+    log-odds exceed **occupied_threshold**, an occupied case becomes
+    free when they fall below **free_threshold**: between both
+    thresholds, a case keeps its belief, so a noisy case does not
+    flip at every scan. The defaults make a single observation decide
+    the belief. The ROS configuration sets a band instead: with a hit
+    of 0.85, a miss of -0.4, a limit of 3.5 and thresholds at 0.7 and
+    -0.7, a case seen free once needs two hits to become occupied and
+    a wall seen for long needs eleven misses to be cleared.
+
+    The rays are traversed all at once with a DDA (Amanatides-Woo
+    traversal): at each step, every ray which has not reached its end
+    case moves to the next case along the axis whose case boundary
+    it meets first.
+
+    Attributes
+    ----------
+    map: GMap
+        The map, which gives the resolution and the size of the grid.
+    occupied: np.ndarray
+        A **columns x rows** grid, True where a case is believed
+        occupied.
+    log_odds: np.ndarray
+        A **columns x rows** grid of the log-odds of occupancy of the
+        cases.
+    hit: float
+        Log-odds added to a case observed occupied.
+    miss: float
+        Log-odds added to a case observed free, negative.
+    limit: float
+        Bound of the absolute log-odds, so a case which has been
+        observed for a long time can still change.
+    occupied_threshold: float
+        Log-odds above which a case becomes occupied.
+    free_threshold: float
+        Log-odds below which a case becomes free.
+
+    Methods
+    -------
+
+    integrate(origin, endpoints, hits):
+        Updates the belief with the rays of a scan.
+    traverse(origin, endpoints):
+        Gets the cases crossed by rays.
+    __inside(cells):
+        Tells which cases are inside the map.
+    """
+
+    def __init__(self, _map: GMap,
+                 hit: float = 1.0,
+                 miss: float = -1.0,
+                 limit: float = 0.5,
+                 occupied_threshold: float = 0.0,
+                 free_threshold: float = 0.0) -> None:
+        """ Initializes a belief where every case is free, with null
+            log-odds.
+
+        Args:
+            _map (GMap):
+                The map
+            hit=1.0 (float):
+                Log-odds added to a case observed occupied
+            miss=-1.0 (float):
+                Log-odds added to a case observed free
+            limit=0.5 (float):
+                Bound of the absolute log-odds
+            occupied_threshold=0.0 (float):
+                Log-odds above which a case becomes occupied
+            free_threshold=0.0 (float):
+                Log-odds below which a case becomes free
+
+        Raises:
+            MapInitializationException: The log-odds could never
+                cross the thresholds
+        """
+        if hit <= 0 or miss >= 0 or limit <= 0:
+            raise MapInitializationException(
+                "The hit and limit log-odds must be positive "
+                "and the miss log-odds negative")
+        if not -limit < free_threshold <= occupied_threshold < limit:
+            raise MapInitializationException(
+                "The log-odds thresholds must be ordered and "
+                "within the limit")
+        self.map = _map
+        self.occupied = np.zeros((_map.columns, _map.rows), dtype=bool)
+        self.log_odds = np.zeros((_map.columns, _map.rows),
+                                 dtype=np.float32)
+        self.hit = hit
+        self.miss = miss
+        self.limit = limit
+        self.occupied_threshold = occupied_threshold
+        self.free_threshold = free_threshold
+
+    def integrate(self,
+                  origin: Tuple[float, float],
+                  endpoints: np.ndarray,
+                  hits: np.ndarray) -> np.ndarray:
+        """ Updates the log-odds of the cases crossed by the rays
+            from **origin** to **endpoints**, which are observed free,
+            and of the cases where the rays hit an obstacle, which are
+            observed occupied. Cases outside of the map are ignored.
+
+        Args:
+            origin (Tuple[float, float]):
+                The coordinates where the rays start
+            endpoints (np.ndarray):
+                A **N x 2** array of the coordinates of the ends of
+                the rays
+            hits (np.ndarray):
+                A boolean array of size **N**, True where a ray has
+                stopped on an obstacle
+
+        Returns:
+            np.ndarray: A **M x 2** array of the cases whose belief
+            has changed, which have crossed a threshold
+        """
+        endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2)
+        hits = np.asarray(hits, dtype=bool).reshape(-1)
+        cells, rays, last = self.traverse(origin, endpoints)
+        seen = self.__inside(cells)
+        hit = (last & hits[rays])[seen]
+        cells = cells[seen]
+
+        # Only the crossed cases are compared, not the whole grid.
+        flat = cells[:, 0] * self.map.rows + cells[:, 1]
+        flat, inverse = np.unique(flat, return_inverse=True)
+        observed = np.bincount(inverse, weights=hit,
+                               minlength=len(flat)) > 0
+        log_odds = self.log_odds.reshape(-1)
+        log_odds[flat] = np.clip(
+            log_odds[flat] + np.where(observed, self.hit, self.miss),
+            -self.limit, self.limit)
+
+        # Hysteresis: a case keeps its belief between the thresholds.
+        belief = self.occupied.reshape(-1)
+        before = belief[flat]
+        after = np.where(log_odds[flat] > self.occupied_threshold, True,
+                         np.where(log_odds[flat] < self.free_threshold,
+                                  False, before))
+        flat = flat[after != before]
+        belief[flat] = ~belief[flat]
+        return np.stack(np.divmod(flat, self.map.rows), axis=1)
+
+    def traverse(self,
+                 origin: Tuple[float, float],
+                 endpoints: np.ndarray
+                 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Gets the cases crossed by the rays from **origin** to
+            **endpoints**, from the case of **origin** to the case of
+            each endpoint included. A ray crosses exactly as many
+            cases as the Manhattan distance between its first and its
+            last case, plus one.
+
+        Args:
+            origin (Tuple[float, float]):
+                The coordinates where the rays start
+            endpoints (np.ndarray):
+                A **N x 2** array of the coordinates of the ends of
+                the rays
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: A **K x 2**
+            array of crossed cases, which may be outside of the map,
+            the index of the ray of each case, and True for the last
+            case of each ray
+        """
+        start = np.asarray(origin[:2], dtype=float) / self.map.resolution
+        end = np.asarray(endpoints, dtype=float).reshape(-1, 2) \
+            / self.map.resolution
+        count = len(end)
+        direction = end - start
+        cell = np.repeat(np.floor(start).astype(np.int64)[None], count,
+                         axis=0)
+        last_cell = np.floor(end).astype(np.int64)
+        step = np.sign(direction).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Fraction of the ray between two case boundaries, and
+            # fraction where the next boundary of each axis is met.
+            delta = np.where(step != 0, np.abs(1.0 / direction), np.inf)
+            boundary = cell + (step > 0)
+            limit = np.where(step != 0, (boundary - start) / direction,
+                             np.inf)
+        steps = np.abs(last_cell - cell).sum(axis=1)
+
+        rays = np.arange(count)
+        cells = [cell.copy()]
+        indices = [rays]
+        last = [steps == 0]
+        for k in range(int(steps.max()) if count > 0 else 0):
+            active = rays[steps > k]
+            # Rounding errors must not step past the last case.
+            along_x = ((limit[active, 0] < limit[active, 1])
+                       & (cell[active, 0] != last_cell[active, 0])) \
+                | (cell[active, 1] == last_cell[active, 1])
+            axis = np.where(along_x, 0, 1)
+            cell[active, axis] += step[active, axis]
+            limit[active, axis] += delta[active, axis]
+            cells.append(cell[active].copy())
+            indices.append(active)
+            last.append(steps[active] == k + 1)
+        return np.concatenate(cells), np.concatenate(indices), \
+            np.concatenate(last)
+
+    def __inside(self, cells: np.ndarray) -> np.ndarray:
+        """ Tells which cases are inside the map.
+
+        Args:
+            cells (np.ndarray):
+                A **K x 2** array of cases
+
+        Returns:
+            np.ndarray: A boolean array of size **K**
+        """
+        return (cells[:, 0] >= 0) & (cells[:, 0] < self.map.columns) & \
+            (cells[:, 1] >= 0) & (cells[:, 1] < self.map.rows)
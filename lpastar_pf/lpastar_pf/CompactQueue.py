@@ -0,0 +1,263 @@
+from lpastar_pf.pf_exceptions import EmptyQueueException
+from typing import Callable, Tuple
+
+
+class CompactQueue:
+
+    """ A priority queue of vertices keyed by pairs of floats, as the
+    keys of LPA*. Entries are not tuples: the two components of the
+    keys and the vertices are stored in three parallel lists forming an
+    indexed binary heap, and a vertex **(i, j)** is encoded as the
+    integer **i * rows + j**. The heap position of each vertex is
+    indexed, so a vertex is removed or its key is changed in
+    **O(log n)** instead of a scan of the heap.
+
+    Entries are ordered by key then by vertex code, which orders the
+    vertices as tuples: pops come in the order of PriorityQueue. A
+    vertex is in the queue at most once.
+
+    Attributes
+    ----------
+    rows: int
+        The number of rows of the map, vertices must have
+        **0 <= j < rows**.
+    first: List[float]
+        The first components of the keys, in heap order.
+    second: List[float]
+        The second components of the keys, in heap order.
+    codes: List[int]
+        The codes of the vertices, in heap order.
+    positions: Dict[int, int]
+        The heap position of each vertex code.
+
+    Methods
+    -------
+
+    insert(key, value):
+        Inserts a vertex, or changes its key if it is queued.
+    pop():
+        Removes the vertex with the lowest key.
+    top_key():
+        Gets the lowest key.
+    remove(value):
+        Removes a vertex if it is queued.
+    rekey(key):
+        Recomputes the keys of all vertices.
+    __remove_at(position):
+        Removes the entry at a heap position.
+    __precedes(a, b):
+        Compares the entries at two heap positions.
+    __move(source, target):
+        Moves an entry to a heap position.
+    __swap(a, b):
+        Swaps the entries at two heap positions.
+    __sift_up(position):
+        Moves an entry up to its place.
+    __sift_down(position):
+        Moves an entry down to its place.
+    """
+
+    def __init__(self, rows: int) -> None:
+        """ Initializes an empty queue.
+
+        Args:
+            rows (int):
+                The number of rows of the map.
+        """
+        self.rows = rows
+        self.first = []
+        self.second = []
+        self.codes = []
+        self.positions = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def insert(self, key: Tuple[float, float],
+               value: Tuple[int, int]) -> None:
+        """ Inserts **value** with **key**. If it is already queued its
+            key is replaced.
+
+        Args:
+            key (Tuple[float, float]):
+                The key of the vertex.
+            value (Tuple[int, int]):
+                The vertex.
+        """
+        code = value[0] * self.rows + value[1]
+        position = self.positions.get(code)
+        if position is None:
+            position = len(self.codes)
+            self.first.append(key[0])
+            self.second.append(key[1])
+            self.codes.append(code)
+            self.positions[code] = position
+            self.__sift_up(position)
+            return
+        self.first[position] = key[0]
+        self.second[position] = key[1]
+        self.__sift_up(position)
+        self.__sift_down(position)
+
+    def pop(self) -> Tuple[Tuple[float, float], Tuple[int, int]]:
+        """ Removes the vertex with the lowest key.
+
+        Raises:
+            EmptyQueueException: Raises if the queue is empty.
+
+        Returns:
+            Tuple[Tuple[float, float], Tuple[int, int]]: The key and
+            the vertex
+        """
+        if not self.codes:
+            raise EmptyQueueException("Can't pop, the queue is empty")
+        key = (self.first[0], self.second[0])
+        code = self.codes[0]
+        self.__remove_at(0)
+        return key, divmod(code, self.rows)
+
+    def top_key(self) -> Tuple[float, float]:
+        """ Gets the lowest key.
+
+        Raises:
+            EmptyQueueException: Raises if the queue is empty.
+
+        Returns:
+            Tuple[float, float]: The lowest key
+        """
+        if not self.codes:
+            raise EmptyQueueException("Can't get top key, the queue is empty")
+        return self.first[0], self.second[0]
+
+    def remove(self, value: Tuple[int, int]) -> None:
+        """ Removes **value** if it is queued.
+
+        Args:
+            value (Tuple[int, int]):
+                The vertex.
+        """
+        position = self.positions.get(value[0] * self.rows + value[1])
+        if position is not None:
+            self.__remove_at(position)
+
+    def rekey(self, key: Callable[[Tuple[int, int]],
+                                  Tuple[float, float]]) -> None:
+        """ Recomputes the keys of all vertices with **key** and
+            rebuilds the heap.
+
+        Args:
+            key (Callable[[Tuple[int, int]], Tuple[float, float]]):
+                The key of a vertex.
+        """
+        for position, code in enumerate(self.codes):
+            self.first[position], self.second[position] = \
+                key(divmod(code, self.rows))
+        for position in reversed(range(len(self.codes) // 2)):
+            self.__sift_down(position)
+
+    def __remove_at(self, position: int) -> None:
+        """ Removes the entry at **position**: the last entry takes its
+            place and is moved up or down.
+
+        Args:
+            position (int):
+                A heap position.
+        """
+        del self.positions[self.codes[position]]
+        last = len(self.codes) - 1
+        if position != last:
+            self.__move(last, position)
+        self.first.pop()
+        self.second.pop()
+        self.codes.pop()
+        if position != last:
+            # An entry which moves up leaves an ancestor of its
+            # subtree at position, which does not move down.
+            self.__sift_up(position)
+            self.__sift_down(position)
+
+    def __precedes(self, a: int, b: int) -> bool:
+        """ Compares the entries at positions **a** and **b**.
+
+        Args:
+            a (int):
+                A heap position.
+            b (int):
+                Another heap position.
+
+        Returns:
+            bool: True if the entry at **a** comes first
+        """
+        first = self.first
+        if first[a] != first[b]:
+            return first[a] < first[b]
+        second = self.second
+        if second[a] != second[b]:
+            return second[a] < second[b]
+        return self.codes[a] < self.codes[b]
+
+    def __move(self, source: int, target: int) -> None:
+        """ Moves the entry at **source** to **target**.
+
+        Args:
+            source (int):
+                The heap position of the entry.
+            target (int):
+                The new heap position of the entry.
+        """
+        self.first[target] = self.first[source]
+        self.second[target] = self.second[source]
+        code = self.codes[source]
+        self.codes[target] = code
+        self.positions[code] = target
+
+    def __swap(self, a: int, b: int) -> None:
+        """ Swaps the entries at positions **a** and **b**.
+
+        Args:
+            a (int):
+                A heap position.
+            b (int):
+                Another heap position.
+        """
+        first, second, codes = self.first, self.second, self.codes
+        first[a], first[b] = first[b], first[a]
+        second[a], second[b] = second[b], second[a]
+        codes[a], codes[b] = codes[b], codes[a]
+        self.positions[codes[a]] = a
+        self.positions[codes[b]] = b
+
+    def __sift_up(self, position: int) -> None:
+        """ Moves the entry at **position** up while it comes before
+            its parent.
+
+        Args:
+            position (int):
+                A heap position.
+        """
+        while position > 0:
+            parent = (position - 1) >> 1
+            if not self.__precedes(position, parent):
+                return
+            self.__swap(position, parent)
+            position = parent
+
+    def __sift_down(self, position: int) -> None:
+        """ Moves the entry at **position** down while one of its
+            children comes before it.
+
+        Args:
+            position (int):
+                A heap position.
+        """
+        size = len(self.codes)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                return
+            if child + 1 < size and self.__precedes(child + 1, child):
+                child += 1
+            if not self.__precedes(child, position):
+                return
+            self.__swap(position, child)
+            position = child
@@ -1,5 +1,4 @@
-import multiprocessing as mp
-from typing import Iterable, Tuple
+from typing import Iterable, List, Tuple
 
 
 class GAgent:
@@ -25,6 +24,10 @@ class GAgent:
         Makes the agent follow the trajectory. Must use a worker
         process to execute the path.
 
+    update_trajectory(points, start):
+        Replaces the end of the trajectory from a waypoint, without
+        resetting the waypoint index of the worker process.
+
     move(x, y):
         Moves the agent to (x,y).
 
@@ -59,16 +62,47 @@ class GAgent:
             i = 0
             while True:
                 if conn.poll():
-                    _points_cp = conn.recv()
-                    i = 0
+                    message = conn.recv()
+                    if isinstance(message, tuple):
+                        # A delta keeps the waypoints before start.
+                        start, tail = message
+                        _points_cp = _points_cp[:start] + tail
+                        i = min(i, start, len(_points_cp) - 1)
+                    else:
+                        _points_cp = message
+                        i = 0
                 self.move(*_points_cp[i])
                 if i < len(_points_cp) - 1:
                     i += 1
 
+        # The worker is only needed by agents which do not override
+        # follow_trajectory, multiprocessing is imported on demand.
+        import multiprocessing as mp
         self.parent, self.child = mp.Pipe()
         self.worker = mp.Process(target=follow, args=(self.child, points, ))
         self.worker.start()
 
+    def update_trajectory(self,
+                          points: List[Tuple[float, float]],
+                          start: int) -> None:
+        """ Makes the agent follow **points**, a trajectory whose
+        waypoints before **start** are those of the current one. Only
+        the new waypoints are sent to the worker process, which keeps
+        its waypoint index unless it has already passed **start**.
+        Agents without a running worker follow the whole trajectory.
+
+        Args:
+            points (List[Tuple[float, float]]):
+                The new trajectory.
+            start (int):
+                The index of the first waypoint which differs
+                from the current trajectory.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            self.parent.send((start, list(points[start:])))
+        else:
+            self.follow_trajectory(points)
+
     def stop_trajectory(self) -> None:
         """ Prevents agent from continuing the trajectory. Kills
         the worker process to stop giving movement commands. Sends
@@ -1,7 +1,10 @@
-from typing import Iterable, Dict, Tuple, Any
+from typing import Iterable, Dict, Tuple, Any, List, Callable
 from lpastar_pf.pf_exceptions import MapInitializationException
 from lpastar_pf.pf_exceptions import ImpossibleTransitionException
-from math import sqrt
+from lpastar_pf.distance_transform import distance_transform
+from lpastar_pf.distance_transform import update_distance_transform
+from math import sqrt, ceil
+import numpy as np
 
 
 class GMap():
@@ -13,8 +16,21 @@ class GMap():
     are modelized by adjecent vertices.
 
     There is only 2 types of vertices: free vertices and obstacle
-    vertices. We maintain only the list of obstacles and we use
-    **get_transition_cost** to retreive the edge cost and
+    vertices. Free vertices have a continuous cost given by the
+    **terrain** grid (ramps, carpet, slow zones). Obstacles are
+    stored in layers of boolean grids indexed by **[i, j]**: a static
+    layer loaded once (walls of the field), a dynamic layer updated
+    from the sensor scans and an optional inflation layer which grows
+    both of them by **inflation_radius**.
+    The layers are combined in the **occupancy** grid and every layer
+    update returns only the vertices whose combined value has changed.
+
+    The distance from every vertex to the nearest obstacle is kept in
+    the **distance** grid and updated only around the changed vertices.
+    The inflation layer and the **cell_costs** of free vertices, which
+    decay with this distance up to **cost_decay_radius**, are derived
+    from it.
+    We use **get_transition_cost** to retreive the edge cost and
     **get_heuristics_cost** to retreive the heuristics cost.
 
     Attributes
@@ -36,11 +52,40 @@ class GMap():
     obstacle_case_value: int
         A multiplier for a transition from or
         to the obstacle case.
-    obstacles: Iterable[Tuple[int, int]]
-        A list of obstacles represented by
-        theirs indices **(i, j)**
+    inflation_radius: float
+        Optional radius, in map units, by which obstacles are
+        inflated. Defaults to 0 (no inflation layer).
+    cost_decay_radius: float
+        Optional distance, in map units, from an obstacle up to which
+        free vertices are penalized. Defaults to **inflation_radius**.
+    cost_decay_factor: float
+        Optional exponential decay rate of the default cost decay
+        function, in inverse map units. Defaults to 1 / resolution.
+    cost_decay: Callable[[np.ndarray], np.ndarray]
+        A vectorized function which maps distances to the nearest
+        obstacle, in map units, to the extra cost of the vertices.
+    distance: np.ndarray
+        Distance, in cases, from each vertex to the nearest obstacle.
+        Infinite beyond **cost_decay_radius**.
+    terrain: np.ndarray
+        Traversal cost multiplier of each vertex, 1 by default.
+    cell_costs: np.ndarray
+        The cost of each vertex, used to weight its edges. It is
+        **free_case_value * terrain** plus the cost decay for free
+        vertices and **obstacle_case_value** for obstacle vertices.
+    static_layer: np.ndarray
+        Boolean grid of the obstacles which never move.
+    dynamic_layer: np.ndarray
+        Boolean grid of the obstacles reported by the last scan.
+    inflation_layer: np.ndarray
+        Boolean grid of the free vertices too close to an obstacle.
+    occupancy: np.ndarray
+        Combination of all layers. A vertex is an obstacle vertex
+        if and only if its occupancy is True.
     heuristics_multiplier: int
         A multiplier for a heuristics transition cost.
+    version: int
+        A counter bumped every time the cost of some vertices changes.
 
     Methods
     -------
@@ -54,6 +99,12 @@ class GMap():
     indexes_to_coors(i, j):
         Helper function used to convert graph representation
         indices to the real life coordinates.
+    coors_to_indexes_batch(coors, clip):
+        Converts an array of real life coordinates to
+        their graph representation.
+    indexes_to_coors_batch(indexes):
+        Converts an array of graph representation indices
+        to the real life coordinates.
     convert_obstacles_to_graph(obstacles):
         Helper function which allows create graph representation
         obstacles from real life obstacles according
@@ -71,19 +122,43 @@ class GMap():
     get_obstacles():
         Gets all **obstacles**.
     set_obstacles(obstacles):
-        Sets **obstacles**.
+        Sets **obstacles** of the dynamic layer.
+    set_static_obstacles(obstacles):
+        Sets obstacles of the static layer.
+    set_dynamic_layer(layer):
+        Sets the dynamic layer from a boolean grid.
+    set_cost_decay(cost_decay):
+        Sets the cost decay function.
+    set_terrain(terrain, origin):
+        Sets the traversal costs of a region of the map.
+    load_terrain_image(path, min_cost, max_cost):
+        Sets the traversal costs of the map from an image.
+    rasterize(obstacles):
+        Converts graph obstacles to a boolean grid.
+    __update_layers():
+        Recombines the layers and returns the changed vertices.
+    __update_costs(region):
+        Recomputes inflation layer, occupancy and costs of a region.
+    __exponential_cost_decay(distance):
+        The default cost decay function.
+    __read_image(path):
+        Reads a grayscale image to a 2D array.
     """
 
     def __init__(self,
                  params: Dict[str, int],
-                 obstacles: Iterable[Tuple[float, float, float]] = None
+                 obstacles: Iterable[Tuple[float, float, float]] = None,
+                 static_obstacles: Iterable[Tuple[float, float, float]]
+                 = None
                  ) -> None:
         """ Uses __param_getter method to extract data from dictionary.
-        Initializes obstacles if provided.
+        Initializes obstacles and static obstacles if provided.
 
         Args:
             obstacles=None (Iterable[Tuple[float, float, float]]):
-                A list of real life obstacles.
+                A list of real life obstacles of the dynamic layer.
+            static_obstacles=None (Iterable[Tuple[float, float, float]]):
+                A list of real life obstacles of the static layer.
             params (Dict[str, int]):
                 A dictionary with attributes to initialize.
         """
@@ -98,9 +173,33 @@ class GMap():
         self.obstacle_case_value = self.__param_getter("obstacle_case_value",
                                                        params)
 
+        self.inflation_radius = params.get("inflation_radius", 0)
+        self.cost_decay_radius = params.get("cost_decay_radius",
+                                            self.inflation_radius)
+        self.cost_decay_factor = params.get("cost_decay_factor",
+                                            1 / self.resolution)
+        self.cost_decay = self.__exponential_cost_decay
+        self.distance_cap = int(ceil(max(self.inflation_radius,
+                                         self.cost_decay_radius)
+                                     / self.resolution))
+
+        self.version = 0
+        shape = (self.columns, self.rows)
+        self.static_layer = np.zeros(shape, dtype=bool)
+        self.dynamic_layer = np.zeros(shape, dtype=bool)
+        self.inflation_layer = np.zeros(shape, dtype=bool)
+        self.occupancy = np.zeros(shape, dtype=bool)
+        self.distance = distance_transform(self.occupancy, self.distance_cap)
+        self.terrain = np.ones(shape, dtype=float)
+        self.cell_costs = np.full(shape, self.free_case_value, dtype=float)
+
         # We must convert real life obstacles ([x, y, w])
         # to theirs graph representation ([i, j]).
-        self.obstacles = self.convert_obstacles_to_graph(obstacles)
+        if static_obstacles is not None:
+            self.set_static_obstacles(
+                self.convert_obstacles_to_graph(static_obstacles))
+        if obstacles is not None:
+            self.set_obstacles(self.convert_obstacles_to_graph(obstacles))
 
         self.heuristics_multiplier = self \
             .__param_getter("heuristics_multiplier",
@@ -133,40 +232,87 @@ class GMap():
     def convert_obstacles_to_graph(self,
                                    obstacles:
                                    Iterable[Tuple[float, float, float]]
-                                   ) -> Iterable[Tuple[int, int]]:
+                                   ) -> np.ndarray:
         """ Converts real life obstacles to theirs' graph representation.
             Obstacles' representations as graph have no width, they occupy
-            only graph cases/vertices.
+            only graph cases/vertices. All obstacles are converted at
+            once with array operations and clipped to the map.
 
         Args:
             obstacles (Iterable[Tuple[float, float, float]]):
-                Real life obstacles in **[x, y, w]** format,
+                Real life obstacles in **[x, y, w]** format, or
+                **[x, y, w, vx, vy]** for moving obstacles,
                 where **(x, y)** are obstacle's coordinates
                 and **w** is its width
 
         Returns:
-            Iterable[Tuple[int ,int]]: Graph representation of the obstacles.
+            np.ndarray: Graph representation of the obstacles,
+            a **N x 2** array of indices **(i, j)**.
 
         """
-        model_obstacles = []
-        for obstacle in obstacles:
-            x = obstacle[0]
-            y = obstacle[1]
-            w = obstacle[2] / 2
+        # The velocities of moving obstacles are ignored.
+        if not isinstance(obstacles, np.ndarray):
+            obstacles = [obstacle[:3] for obstacle in obstacles]
+        elif obstacles.ndim == 2:
+            obstacles = obstacles[:, :3]
+        obstacles = np.asarray(obstacles, dtype=float).reshape(-1, 3)
+        centers = obstacles[:, :2]
+        w = obstacles[:, 2:3] / 2
+
+        top_left = self.coors_to_indexes_batch(
+            np.maximum(centers - w, 0.0))
+        bottom_right = self.coors_to_indexes_batch(
+            np.minimum(centers + w, (self.width, self.height)))
+
+        # Each obstacle covers a square of cases, all the squares
+        # are enumerated together from their flat sizes.
+        sizes = np.maximum(bottom_right - top_left + 1, 0)
+        sizes[~np.all((centers + w >= 0.0) &
+                      (centers - w <= (self.width, self.height)),
+                      axis=1)] = 0
+        counts = sizes[:, 0] * sizes[:, 1]
+        owners = np.repeat(np.arange(len(obstacles)), counts)
+        offsets = np.arange(counts.sum()) - \
+            np.repeat(np.cumsum(counts) - counts, counts)
+        heights = sizes[owners, 1]
+        return np.stack((top_left[owners, 0] + offsets // heights,
+                         top_left[owners, 1] + offsets % heights), axis=1)
+
+    def coors_to_indexes_batch(self,
+                               coors: np.ndarray,
+                               clip: bool = True) -> np.ndarray:
+        """ Converts an array of real life coordinates to the indices
+            of the graph's vertices in a single array operation.
 
-            square_left_i, square_top_j = self.coors_to_indexes(
-                max(0.0, x - w),
-                max(0.0, y - w))
+        Args:
+            coors (np.ndarray):
+                A **N x 2** array of real life coordinates **(x, y)**
+            clip=True (bool):
+                Clips the indices to the bounds of the map if True
 
-            square_right_i, square_bottom_j = self.coors_to_indexes(
-                min(self.width, x + w),
-                min(self.height, y + w))
+        Returns:
+            np.ndarray: A **N x 2** array of indices **(i, j)**
+        """
+        indexes = (np.asarray(coors, dtype=float).reshape(-1, 2)
+                   / self.resolution).astype(np.int64)
+        if clip:
+            np.clip(indexes, 0, (self.columns - 1, self.rows - 1),
+                    out=indexes)
+        return indexes
 
-            for i in range(square_left_i, square_right_i + 1):
-                for j in range(square_top_j, square_bottom_j + 1):
-                    model_obstacles.append((i, j))
+    def indexes_to_coors_batch(self, indexes: np.ndarray) -> np.ndarray:
+        """ Converts an array of indices of the graph's vertices to the
+            real life coordinates in a single array operation.
 
-        return model_obstacles
+        Args:
+            indexes (np.ndarray):
+                A **N x 2** array of indices **(i, j)**
+
+        Returns:
+            np.ndarray: A **N x 2** array of real life coordinates
+        """
+        return np.asarray(indexes, dtype=float).reshape(-1, 2) \
+            * self.resolution
 
     def coors_to_indexes(self, x: float, y: float) -> Tuple[int, int]:
         """ Converts real life coordinates to the indices of the graph's vertex
@@ -226,10 +372,10 @@ class GMap():
                                                 + ","
                                                 + str(_to[1]))
 
-        if _to in self.obstacles or _from in self.obstacles:
+        if self.occupancy[_to] or self.occupancy[_from]:
             return self.obstacle_case_value
         else:
-            return self.free_case_value * \
+            return (self.cell_costs[_from] + self.cell_costs[_to]) / 2 * \
                 sqrt(abs(_from[1] - _to[1]) +
                      abs(_from[0] - _to[0]))
 
@@ -246,19 +392,21 @@ class GMap():
         """
         i, j = vertex
         neighbours = []
+        if j - 1 >= 0:
+            neighbours.append((i, j-1))
+        if j + 1 < self.rows:
+            neighbours.append((i, j+1))
         if i - 1 >= 0:
             neighbours.append((i-1, j))
             if j - 1 >= 0:
                 neighbours.append((i-1, j-1))
-            if j + 1 <= self.columns:
+            if j + 1 < self.rows:
                 neighbours.append((i-1, j+1))
-        if i + 1 <= self.rows:
+        if i + 1 < self.columns:
             neighbours.append((i+1, j))
             if j - 1 >= 0:
-                neighbours.append((i, j-1))
                 neighbours.append((i+1, j-1))
-            if j + 1 <= self.columns:
-                neighbours.append((i, j+1))
+            if j + 1 < self.rows:
                 neighbours.append((i+1, j+1))
         return neighbours
 
@@ -289,18 +437,309 @@ class GMap():
         return self.resolution
 
     def get_obstacles(self) -> Iterable[Tuple[int, int]]:
-        """ Gets the list of current obstacles on the map
+        """ Gets the list of current obstacles on the map, both
+            static and dynamic. Inflated vertices are not included.
 
         Returns:
             Iterable[Tuple[int, int]]: A list of obstacles
         """
-        return self.obstacles
+        return [tuple(v) for v in
+                np.argwhere(self.static_layer | self.dynamic_layer)]
+
+    obstacles = property(get_obstacles)
 
-    def set_obstacles(self, _obstacles: Iterable[Tuple[int, int]]) -> None:
-        """ Puts new list of obstacles on the map
+    def set_obstacles(self,
+                      _obstacles: Iterable[Tuple[int, int]]
+                      ) -> List[Tuple[int, int]]:
+        """ Puts new list of obstacles on the dynamic layer of the map
 
         Args:
             _obstacles (Iterable[Tuple[int, int]]):
                 A new list of obstacles to put on the map
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose occupancy has changed
+        """
+        self.dynamic_layer = self.rasterize(_obstacles)
+        return self.__update_layers()
+
+    def set_dynamic_layer(self, layer: np.ndarray) -> List[Tuple[int, int]]:
+        """ Puts a boolean grid of obstacles on the dynamic layer of
+            the map, as the belief of a **BeliefGrid**.
+
+        Args:
+            layer (np.ndarray):
+                A **columns x rows** boolean grid, True for obstacles
+
+        Raises:
+            MapInitializationException: The grid has not the size of
+                the map
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose occupancy has changed
+        """
+        if np.shape(layer) != (self.columns, self.rows):
+            raise MapInitializationException(
+                "The dynamic layer must have the size of the map")
+        self.dynamic_layer = np.array(layer, dtype=bool)
+        return self.__update_layers()
+
+    def set_static_obstacles(self,
+                             _obstacles: Iterable[Tuple[int, int]]
+                             ) -> List[Tuple[int, int]]:
+        """ Puts new list of obstacles on the static layer of the map.
+            It is meant to be called once, or at a much lower rate
+            than **set_obstacles**.
+
+        Args:
+            _obstacles (Iterable[Tuple[int, int]]):
+                A new list of static obstacles to put on the map
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose occupancy has changed
+        """
+        self.static_layer = self.rasterize(_obstacles)
+        return self.__update_layers()
+
+    def rasterize(self, _obstacles: Iterable[Tuple[int, int]]) -> np.ndarray:
+        """ Converts graph obstacles to a boolean grid. Obstacles
+            outside of the map are ignored.
+
+        Args:
+            _obstacles (Iterable[Tuple[int, int]]):
+                Graph representation of the obstacles
+
+        Returns:
+            np.ndarray: A **columns x rows** boolean grid
+        """
+        layer = np.zeros((self.columns, self.rows), dtype=bool)
+        indexes = np.asarray(_obstacles if isinstance(_obstacles, np.ndarray)
+                             else list(_obstacles),
+                             dtype=np.int64).reshape(-1, 2)
+        inside = (indexes[:, 0] >= 0) & (indexes[:, 0] < self.columns) & \
+            (indexes[:, 1] >= 0) & (indexes[:, 1] < self.rows)
+        indexes = indexes[inside]
+        layer[indexes[:, 0], indexes[:, 1]] = True
+        return layer
+
+    def set_cost_decay(self,
+                       cost_decay: Callable[[np.ndarray], np.ndarray]
+                       ) -> List[Tuple[int, int]]:
+        """ Sets the function used to penalize free vertices close
+            to the obstacles and recomputes the costs of the map.
+
+        Args:
+            cost_decay (Callable[[np.ndarray], np.ndarray]):
+                A vectorized function which maps an array of distances
+                to the nearest obstacle, in map units, to an array of
+                extra costs.
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        self.cost_decay = cost_decay
+        return self.__update_costs((slice(0, self.columns),
+                                    slice(0, self.rows)))
+
+    def set_terrain(self,
+                    terrain: np.ndarray,
+                    origin: Tuple[int, int] = (0, 0)
+                    ) -> List[Tuple[int, int]]:
+        """ Sets the traversal cost multipliers of the vertices covered
+            by **terrain** placed at **origin**. The rest of the map is
+            left untouched, so a small patch can be updated cheaply.
+            Null and negative costs are rejected, the heuristic is not
+            scaled: it stays admissible as long as
+            **heuristics_multiplier** does not exceed the cheapest
+            case cost, **free_case_value** times the minimal terrain.
+
+        Args:
+            terrain (np.ndarray):
+                A grid of traversal cost multipliers indexed by **[i, j]**
+            origin=(0, 0) (Tuple[int, int]):
+                The vertex of the map where **terrain[0, 0]** is placed
+
+        Raises:
+            MapInitializationException: Occurs when **terrain** does not
+            fit in the map or contains costs which
+            are not strictly positive
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        terrain = np.asarray(terrain, dtype=float)
+        i, j = origin
+        if terrain.ndim != 2 or i < 0 or j < 0 or \
+                i + terrain.shape[0] > self.columns or \
+                j + terrain.shape[1] > self.rows:
+            raise MapInitializationException(
+                "Terrain of shape " + str(terrain.shape) + " at "
+                + str(origin) + " does not fit in the map")
+        # A null cost would make a free detour as cheap as the
+        # straight path, NaN compares false as well.
+        if not (terrain > 0).all():
+            raise MapInitializationException(
+                "Terrain costs must be strictly positive")
+
+        region = (slice(i, i + terrain.shape[0]),
+                  slice(j, j + terrain.shape[1]))
+        self.terrain[region] = terrain
+        return self.__update_costs(region)
+
+    def load_terrain_image(self,
+                           path: str,
+                           min_cost: float = 1.0,
+                           max_cost: float = 10.0
+                           ) -> List[Tuple[int, int]]:
+        """ Sets the traversal costs of the whole map from a grayscale
+            image. Black pixels cost **min_cost** and white pixels cost
+            **max_cost**. The image covers the whole map, its first row
+            being **j = 0**, and is resampled to the map's cases.
+            Netpbm (.pgm) and NumPy (.npy) files are read natively,
+            other formats need Pillow to be installed.
+
+        Args:
+            path (str):
+                The path of the image
+            min_cost=1.0 (float):
+                The cost of the darkest pixels
+            max_cost=10.0 (float):
+                The cost of the brightest pixels
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        image, max_value = self.__read_image(path)
+        height, width = image.shape
+        i = (np.arange(self.columns) * width) // self.columns
+        j = (np.arange(self.rows) * height) // self.rows
+        pixels = image[np.ix_(j, i)].T.astype(float)
+        return self.set_terrain(min_cost + (max_cost - min_cost)
+                                * pixels / max_value)
+
+    def __read_image(self, path: str) -> Tuple[np.ndarray, float]:
+        """ Reads a grayscale image to a 2D array of pixels.
+
+        Args:
+            path (str):
+                The path of the image
+
+        Raises:
+            MapInitializationException: Occurs when the image can't
+            be read
+
+        Returns:
+            Tuple[np.ndarray, float]: The pixels indexed by
+            **[row, column]** and the maximal value of a pixel
+        """
+        if path.endswith(".npy"):
+            image = np.load(path)
+            return image, max(float(image.max()), 1.0)
+
+        if path.endswith(".pgm"):
+            with open(path, "rb") as stream:
+                data = stream.read()
+            header = []
+            position = 0
+            while len(header) < 4:
+                while data[position:position + 1].isspace():
+                    position += 1
+                if data[position:position + 1] == b"#":
+                    position = data.index(b"\n", position)
+                    continue
+                end = position
+                while not data[end:end + 1].isspace():
+                    end += 1
+                header.append(data[position:end])
+                position = end
+            magic, width, height, max_value = header
+            width, height, max_value = int(width), int(height), \
+                int(max_value)
+            if magic == b"P5":
+                dtype = np.uint8 if max_value < 256 else ">u2"
+                image = np.frombuffer(data, dtype=dtype,
+                                      count=width * height,
+                                      offset=position + 1)
+            elif magic == b"P2":
+                image = np.array(data[position:].split(), dtype=int)
+            else:
+                raise MapInitializationException(
+                    "Unsupported netpbm format: " + str(magic))
+            return image.reshape(height, width), float(max_value)
+
+        try:
+            from PIL import Image
+        except ImportError:
+            raise MapInitializationException(
+                "Pillow is required to read " + path)
+        image = np.asarray(Image.open(path).convert("L"))
+        return image, 255.0
+
+    def __update_layers(self) -> List[Tuple[int, int]]:
+        """ Recombines static, dynamic and inflation layers into
+            the **occupancy** grid. The distance transform is only
+            updated around the obstacles which have changed.
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        obstacles = self.static_layer | self.dynamic_layer
+        moved = np.argwhere(obstacles !=
+                            (self.occupancy & ~self.inflation_layer))
+        region = update_distance_transform(self.distance, obstacles,
+                                           moved, self.distance_cap)
+        return self.__update_costs(region)
+
+    def __update_costs(self,
+                       region: Tuple[slice, slice]) -> List[Tuple[int, int]]:
+        """ Recomputes the inflation layer, the occupancy and the cell
+            costs of the **region** from the distance transform.
+
+        Args:
+            region (Tuple[slice, slice]):
+                The region of the map to recompute
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        obstacles = self.static_layer[region] | self.dynamic_layer[region]
+        distance = self.distance[region]
+
+        inflation = (distance * self.resolution <= self.inflation_radius) \
+            & ~obstacles
+        occupancy = obstacles | inflation
+        costs = self.free_case_value * self.terrain[region] + \
+            self.cost_decay(distance * self.resolution)
+        costs[occupancy] = self.obstacle_case_value
+
+        changed = np.argwhere((occupancy != self.occupancy[region]) |
+                              (costs != self.cell_costs[region]))
+        self.inflation_layer[region] = inflation
+        self.occupancy[region] = occupancy
+        self.cell_costs[region] = costs
+        if len(changed) > 0:
+            self.version += 1
+        return [(int(i) + region[0].start, int(j) + region[1].start)
+                for i, j in changed]
+
+    def __exponential_cost_decay(self, distance: np.ndarray) -> np.ndarray:
+        """ Default cost decay function. The extra cost decreases
+            exponentially from **obstacle_case_value** at
+            **inflation_radius** to zero after **cost_decay_radius**.
+
+        Args:
+            distance (np.ndarray):
+                Distances to the nearest obstacle, in map units
+
+        Returns:
+            np.ndarray: The extra cost of each vertex
         """
-        self.obstacles = _obstacles
+        decay = np.exp(-self.cost_decay_factor *
+                       np.maximum(distance - self.inflation_radius, 0.0))
+        decay[distance > self.cost_decay_radius] = 0.0
+        # Only the cells with some decay are multiplied: an infinite
+        # obstacle cost times zero would be NaN.
+        penalty = np.zeros(np.shape(decay))
+        np.multiply(self.obstacle_case_value - self.free_case_value, decay,
+                    out=penalty, where=decay > 0.0)
+        return penalty
@@ -1,14 +1,24 @@
 from lpastar_pf.GAgent import GAgent
 from lpastar_pf.ASensor import ASensor
 from lpastar_pf.GMap import GMap
-from typing import Type, Tuple, Dict, Iterable, List, Any
+from typing import Type, Tuple, Dict, Iterable, Iterator, List, Any
+from typing import TYPE_CHECKING
 from lpastar_pf.pf_exceptions import MapInitializationException
 from lpastar_pf.pf_exceptions import PathDoesNotExistException
 from lpastar_pf.pf_exceptions import TimeoutException
 from lpastar_pf.pf_exceptions import EmptyQueueException
 import time
+import numpy as np
 from lpastar_pf.PriorityQueue import PriorityQueue
-import collections
+from lpastar_pf.CompactQueue import CompactQueue
+from lpastar_pf.LazyQueue import LazyQueue
+from lpastar_pf.storage import allocate_grid, reset_grid
+from lpastar_pf.clock import AClock, WallClock
+
+# Optional features are imported when they are enabled,
+# so that a plain planner starts quickly.
+if TYPE_CHECKING:
+    from lpastar_pf.metrics import PlannerMetrics
 
 
 class LPAStarPathFinder:
@@ -34,48 +44,170 @@ class LPAStarPathFinder:
         The start vertex of the path finding.
     map: GMap
         A map representation as a graph containing
-        the list of the obstacles.
-    g: List[List[int]]
+        the list of the obstacles. A TiledGMap if the
+        **tile_size** parameter is provided.
+    tiled: bool
+        True if the map is a TiledGMap. The storage is then sparse
+        and g-values of unreached vertices are infinite.
+    storage: str
+        **"dense"** (default) stores g-values, rhs-values and parents
+        in lists of lists covering the map. **"sparse"** stores them
+        in hash maps where unvisited vertices implicitly hold infinity,
+        so the memory follows the explored region. Tiled maps and the
+        receding horizon mode need the sparse storage.
+    g: List[List[float]]
         g-values used to store the shortest distance
-        from start to each vertex.
-    rhs: List[List[int]]
+        from start to each vertex, indexed by **[i][j]**.
+        None until the first **reset**, which allocates g-values,
+        rhs-values and parents.
+    rhs: List[List[float]]
         rhs-values used to update g-values. rhs-values are
         a one step look up which uses g-values.
+    parents: List[List[int]]
+        Best predecessor of each vertex, the one which gives its
+        rhs-value, encoded as the direction **3 * (di + 1) + (dj + 1)**
+        from the vertex to its parent. -1 if there is none.
     discover_order: PriorityQueue
         A priority queue used to store vertices to discover
         ordered by (min(g(s), rhs(s)) + h(s, goal), min(g(s), rhs(s))).
+    queue: str
+        **"compact"** (default) uses a CompactQueue, an indexed heap
+        of parallel lists. **"lazy"** uses a LazyQueue, which leaves
+        removed entries in its heap and skips them when they are
+        popped. **"heap"** uses a PriorityQueue of tuples, the only one
+        for a tiled map whose indices are unbounded.
+    compaction_ratio: float
+        Ratio of stale entries to live ones which makes a LazyQueue
+        rebuild its heap.
+    clock: AClock
+        Measures the timeout and the periods of **find_path** and
+        pauses it, in wall-clock or in virtual time.
+    replan: bool
+        True if the path must be recalculated at the next period.
+    min_replan_period: int
+        Minimal time between two path calculations of **find_path**,
+        in milliseconds. Changes which come sooner are applied to the
+        vertices and the path is recalculated once this time has passed.
+    trajectory: List[Tuple[float, float]]
+        The trajectory the agent follows, None if it has none.
+    metrics: PlannerMetrics
+        Cumulative metrics of the planner, None if disabled.
+    stats: PlannerStats
+        Counters and timers of the running call, None if
+        metrics are disabled.
+    horizon: RecedingHorizon
+        The receding horizon planner used instead of LPA* if the
+        **horizon** parameter is provided, None otherwise.
+    sipp: SafeIntervalPlanner
+        The safe interval planner used instead of LPA* if the
+        **prediction_horizon** parameter is provided, None otherwise.
+        Scanned obstacles with a velocity are then predicted instead
+        of being put on the map.
+    belief: BeliefGrid
+        The persistent belief built from the rays of the sensor if the
+        **belief_grid** parameter is True, None otherwise. The dynamic
+        layer of the map is then the belief instead of the last scan.
+        The **log_odds_*** parameters tune the belief, so that sensor
+        noise does not change the map at every scan.
+    cache: PathCache
+        Cache of the paths by start vertex, goal vertex and map
+        version if the **path_cache** parameter is provided,
+        None otherwise.
+    landmarks: Landmarks
+        ALT heuristics combined with the heuristics of the map if the
+        **landmarks** parameter is provided, None otherwise.
+    initial_search: str
+        **"lpastar"** (default) runs LPA* for the first search after a
+        reset. **"bidirectional"** runs a bidirectional search instead,
+        whose result seeds LPA* for the incremental searches.
+    lazy_updates: bool
+        True if **find_path** defers the cost increases which are
+        off the path followed by the agent, see **lazy_updates**
+        parameter.
+    pending: Set[Tuple[int, int]]
+        Changed vertices whose update is deferred.
+    tour_budget: float
+        Time allowed to improve the visiting order of a tour, in
+        seconds.
+
     Methods
     -------
 
     __shrink_path(model_path):
         Takes model_path and adds only key vertices in each path
         direction to avoid agent movements to be jerky.
+    __follow(model_path):
+        Shrinks the path and sends what has changed to the agent.
+    __mark_path(model_path):
+        Marks the vertices of the followed path in a bitmap.
+    __split_moving(obstacles):
+        Splits scanned obstacles between static and moving ones.
     __calculate_key(i, j):
         Calculates the key of vertex associated to the case
         (i, j) to insert it in priority queue.
+    __precedes(key, other):
+        Compares two keys up to rounding errors.
     __update_vertex(v):
         Updates the rhs-value of the vertex and reinserts
         it in priority queue with new key if necessary.
+    __compute_rhs(v):
+        Computes the rhs-value and the parent of the vertex.
+    update_vertices(changed):
+        Updates the vertices whose cost has changed and their neighbours.
+    __defer(changed):
+        Defers the changes which cannot affect the followed path.
+    __decreased(changed):
+        Tells if the cost of a changed vertex has decreased.
     __pause():
         Pauses the exectuion of path finding and map update.
     __param_getter(param_name, params):
         Helper function, which allows to get
         information from a dictionary given in parameters.
-    reset(goal):
+    reset(goal, start):
         Resets start vertex, goal vertex, priorty_queue,
         g-values and rhs-values.
+    plan(start, goal):
+        Answers a path query, from the cache if possible.
+    __cached_path():
+        Gets the path from the agent to the goal, from the
+        cache if possible.
+    __allocate():
+        Allocates g-values, rhs-values and parents.
+    __new_queue():
+        Creates an empty priority queue.
     find_path(goal):
         Entry point function which is responsible to rescan
         map, recalculate optimal path if necessary and update agent.
-    compute_shortest_path():
+    order_tour(goals):
+        Orders the visits of several goals.
+    find_tour(goals):
+        Visits several goals in the order of **order_tour**.
+    compute_shortest_path(path_type, origin):
         Computes the shortest path using the advantages of LPA* algorithm.
+    __search():
+        Runs LPA* until the goal vertex is consistent.
+    __search_bidirectional():
+        Runs the bidirectional search and seeds LPA* with its result.
+    __extract_path(path_type, origin):
+        Walks back from the goal vertex to build the path.
+    __walk_parents(origin):
+        Yields the vertices from the goal back to the agent.
+    enable_metrics(metrics):
+        Starts recording planner metrics.
+    disable_metrics():
+        Stops recording planner metrics.
+    set_terrain(terrain, origin):
+        Updates traversal costs of the map and the affected vertices.
 
     """
 
     def __init__(self,
                  agent: Type[GAgent],
                  sensor: Type[ASensor],
-                 params: Dict[str, int]):
+                 params: Dict[str, int],
+                 static_obstacles: Iterable[Tuple[float, float, float]]
+                 = None,
+                 clock: AClock = None):
         """ Uses __param_getter method to extract data from dictionary.
         Initializes agent and sensor.
 
@@ -86,58 +218,302 @@ class LPAStarPathFinder:
                 A sensor which is used to scan the map.
             params (Dict[str, int]):
                 A dictionary with attributes to initialize.
+            static_obstacles=None (Iterable[Tuple[float, float, float]]):
+                Real life obstacles which never move, loaded once
+                in the static layer of the map.
+            clock=None (AClock):
+                The clock of **find_path**, a WallClock by default.
         """
         self.agent = agent
         self.sensor = sensor
+        self.clock = clock if clock is not None else WallClock()
 
-        self.map = GMap(params, obstacles=[])
+        # A tiled map is unbounded or too large for dense
+        # grids: its vertices are stored sparsely.
+        self.tiled = params.get("tile_size", 0) > 0
+        if self.tiled:
+            from lpastar_pf.TiledGMap import TiledGMap
+            self.map = TiledGMap(params,
+                                 static_obstacles=static_obstacles)
+            self.infinity = float("inf")
+        else:
+            self.map = GMap(params, static_obstacles=static_obstacles)
+            self.infinity = 2 * self.map.obstacle_case_value * \
+                (self.map.rows * self.map.columns) ** 2
         self.period = self.__param_getter("period", params)
-        self.infinity = 2 * self.map.obstacle_case_value * \
-            (self.map.rows * self.map.columns) ** 2
         self.timeout = self.__param_getter("timeout", params)
 
         self.goal = None
         self.start = None
+        self.replan = True
+        self.min_replan_period = params.get("min_replan_period", 0)
+        self.__last_replan = None
+        self.trajectory = None
+
+        self.metrics = None
+        self.stats = None
+        if params.get("metrics", False):
+            self.enable_metrics()
+
+        # The receding horizon mode does not search the whole map,
+        # its memory must not follow the size of the map either.
+        horizon = params.get("horizon", 0) > 0
+        self.storage = params.get("storage",
+                                  "sparse" if self.tiled or horizon
+                                  else "dense")
+        if self.storage not in ("dense", "sparse"):
+            raise MapInitializationException(
+                "Unknown storage: " + str(self.storage))
+        if self.tiled and self.storage == "dense":
+            raise MapInitializationException(
+                "A tiled map needs the sparse storage")
+        if horizon and self.storage == "dense":
+            raise MapInitializationException(
+                "The receding horizon mode needs the sparse storage")
+
+        self.queue = params.get("queue", "heap" if self.tiled else "compact")
+        if self.queue not in ("compact", "lazy", "heap"):
+            raise MapInitializationException(
+                "Unknown queue: " + str(self.queue))
+        if self.tiled and self.queue != "heap":
+            raise MapInitializationException(
+                "A tiled map needs the heap queue")
+        self.compaction_ratio = params.get("queue_compaction_ratio", 1.0)
+        if self.compaction_ratio <= 0:
+            raise MapInitializationException(
+                "The queue compaction ratio must be positive")
+
+        # Receding horizon mode: exact planning inside a window
+        # around the agent and coarse cost-to-go beyond.
+        self.horizon = None
+        if horizon:
+            if self.tiled:
+                raise MapInitializationException(
+                    "The receding horizon mode needs a GMap")
+            from lpastar_pf.RecedingHorizon import RecedingHorizon
+            self.horizon = RecedingHorizon(
+                self.map, params["horizon"],
+                block=params.get("horizon_block", 8),
+                budget=params.get("horizon_budget", 1000))
+
+        # Predictive mode: moving obstacles are avoided in space-time.
+        self.sipp = None
+        if params.get("prediction_horizon", 0) > 0:
+            if self.tiled or self.horizon is not None:
+                raise MapInitializationException(
+                    "The predictive mode needs a GMap and no horizon")
+            from lpastar_pf.SafeIntervalPlanner import SafeIntervalPlanner
+            self.sipp = SafeIntervalPlanner(
+                self.map, params["prediction_horizon"],
+                self.__param_getter("agent_speed", params))
+
+        # Belief mode: the rays of the sensor clear what they cross
+        # and the map only changes where the sensor saw a difference.
+        self.belief = None
+        if params.get("belief_grid", False):
+            if self.tiled or self.sipp is not None:
+                raise MapInitializationException(
+                    "The belief grid needs a GMap and no prediction")
+            from lpastar_pf.ARaySensor import ARaySensor
+            if not isinstance(sensor, ARaySensor):
+                raise MapInitializationException(
+                    "The belief grid needs an ARaySensor")
+            from lpastar_pf.BeliefGrid import BeliefGrid
+            self.belief = BeliefGrid(
+                self.map, hit=params.get("log_odds_hit", 1.0),
+                miss=params.get("log_odds_miss", -1.0),
+                limit=params.get("log_odds_limit", 0.5),
+                occupied_threshold=params.get("log_odds_occupied", 0.0),
+                free_threshold=params.get("log_odds_free", 0.0))
+
+        # Landmarks tighten the heuristics on maze-like maps.
+        self.landmarks = None
+        if params.get("landmarks", 0) > 0:
+            if self.tiled:
+                raise MapInitializationException(
+                    "Landmarks need a GMap")
+            from lpastar_pf.landmarks import Landmarks
+            self.landmarks = Landmarks(self.map, params["landmarks"])
+
+        self.initial_search = params.get("initial_search", "lpastar")
+        if self.initial_search not in ("lpastar", "bidirectional"):
+            raise MapInitializationException(
+                "Unknown initial search: " + str(self.initial_search))
+        self.__fresh = False
 
-        self.g = [[self.infinity for _ in range(self.map.columns)]
-                  for _ in range(self.map.rows)]
+        # A cost increase off the followed path cannot make it
+        # suboptimal, its update waits for a change which can.
+        self.lazy_updates = params.get("lazy_updates", False)
+        if self.lazy_updates and self.tiled:
+            raise MapInitializationException(
+                "Lazy updates need a GMap")
+        self.pending = set()
+        self.__path = []
+        self.__path_cells = None
+        self.__costs = None
 
-        self.rhs = [[self.infinity for _ in range(self.map.columns)]
-                    for _ in range(self.map.rows)]
+        # Time allowed to improve the visiting order of a tour.
+        self.tour_budget = params.get("tour_budget", 1.0)
 
-        self.discover_order = PriorityQueue()
+        # Repeated queries are answered by a LRU cache of paths.
+        self.cache = None
+        if params.get("path_cache", 0) > 0:
+            from lpastar_pf.PathCache import PathCache
+            self.cache = PathCache(params["path_cache"])
 
-    def reset(self, goal: Tuple[float, float]) -> None:
+        # g-values, rhs-values and parents cover the whole map, they
+        # are allocated by the first reset so construction stays cheap.
+        self.g = None
+        self.rhs = None
+        self.parents = None
+        self.discover_order = self.__new_queue()
+
+    def reset(self,
+              goal: Tuple[float, float],
+              start: Tuple[float, float] = None) -> None:
         """ Resets g-values and rhs-values. Initializes start and goal
             positions for the algorithm.
 
         Args:
             goal (Tuple[float, float]):
                 The goal vertex
+            start=None (Tuple[float, float]):
+                The start position, the agent's position by default
         """
-        self.g = [[self.infinity for _ in range(self.map.columns)]
-                  for _ in range(self.map.rows)]
-
-        self.rhs = [[self.infinity for _ in range(self.map.columns)]
-                    for _ in range(self.map.rows)]
+        self.__allocate()
 
-        self.discover_order = PriorityQueue()
+        self.discover_order = self.__new_queue()
+        self.replan = True
+        self.__fresh = True
+        self.__last_replan = None
+        self.trajectory = None
 
         self.goal = self.map.coors_to_indexes(*goal)
-        x, y, _ = self.agent.get_position()
+        if start is None:
+            x, y, _ = self.agent.get_position()
+        else:
+            x, y = start
         i, j = self.map.coors_to_indexes(x, y)
         self.start = (i, j)
         self.rhs[i][j] = 0
+        if self.landmarks is not None:
+            self.landmarks.refresh()
+            self.landmarks.set_goal(self.goal)
         self.discover_order.insert((self.__calculate_key(i, j)), (i, j))
 
+        if self.horizon is not None:
+            self.horizon.set_goal(self.goal)
+        if self.sipp is not None:
+            self.sipp.set_goal(self.goal)
+
+    def plan(self,
+             start: Tuple[float, float],
+             goal: Tuple[float, float]) -> List[Tuple[int, int]]:
+        """ Answers a path query without moving the agent. If the path
+            is cached for the current version of the map it is returned
+            at once, otherwise the planner is reset to the query and
+            the path is computed and cached.
+
+        Args:
+            start (Tuple[float, float]):
+                The start position
+            goal (Tuple[float, float]):
+                The goal position
+
+        Raises:
+            PathDoesNotExistException: Raises if there is no path
+            from start to goal.
+
+        Returns:
+            List[Tuple[int, int]]: The vertices from start to goal
+        """
+        if self.cache is not None:
+            path = self.cache.get(self.map.coors_to_indexes(*start),
+                                  self.map.coors_to_indexes(*goal),
+                                  self.map.version)
+            if path is not None:
+                return path
+        self.reset(goal, start)
+        path = self.compute_shortest_path(origin=self.start)
+        if self.cache is not None:
+            self.cache.put(self.start, self.goal, self.map.version, path)
+        return path
+
+    def __cached_path(self) -> List[Tuple[int, int]]:
+        """ Gets the path from the agent's vertex to the goal from the
+            cache, or computes it with LPA* and caches it. A sub path
+            of a shortest path is a shortest path, so the path is cached
+            from the agent's vertex.
+
+        Raises:
+            PathDoesNotExistException: Raises if there is no path
+            from start to goal.
+
+        Returns:
+            List[Tuple[int, int]]: The vertices from the agent to goal
+        """
+        if self.cache is None:
+            return self.compute_shortest_path()
+        x, y, _ = self.agent.get_position()
+        path = self.cache.get(self.map.coors_to_indexes(x, y), self.goal,
+                              self.map.version)
+        if path is None:
+            path = self.compute_shortest_path()
+            self.cache.put(path[0], self.goal, self.map.version, path)
+        return path
+
+    def __allocate(self) -> None:
+        """ Allocates g-values and rhs-values to infinity and parents
+            to -1, densely or sparsely according to **storage**. The
+            grids of a previous search are cleared instead, so the legs
+            of a tour do not allocate the map again.
+        """
+        sparse = self.storage == "sparse"
+        shape = (self.map.columns, self.map.rows)
+        if self.g is None:
+            self.g = allocate_grid(shape, self.infinity, sparse)
+            self.rhs = allocate_grid(shape, self.infinity, sparse)
+            self.parents = allocate_grid(shape, -1, sparse)
+        else:
+            reset_grid(self.g, self.infinity)
+            reset_grid(self.rhs, self.infinity)
+            reset_grid(self.parents, -1)
+        self.pending = set()
+        self.__path = []
+        if self.lazy_updates:
+            self.__path_cells = np.zeros(shape, dtype=bool)
+        if self.lazy_updates or (self.cache is not None and not self.tiled):
+            self.__costs = self.map.cell_costs.copy()
+
+    def __new_queue(self) -> Any:
+        """ Creates an empty priority queue of the **queue** type.
+
+        Returns:
+            Any: A CompactQueue, a LazyQueue or a PriorityQueue
+        """
+        if self.queue == "compact":
+            return CompactQueue(self.map.rows)
+        if self.queue == "lazy":
+            return LazyQueue(self.map.rows, self.compaction_ratio)
+        return PriorityQueue()
+
     def find_path(self, goal: Tuple[float, float]) -> None:
         """ Entry point function which is responsible to rescan map,
             recalculate optimal path if necessary and update agent.
             First, it calls reset, after that it calls sensor's scan function,
-            converts obstacles to its graph representation and compares them
-            to the previous obstacles. If there is any changes, vertex with
-            changed cost are updated and the path is recalculated.
+            converts obstacles to its graph representation and puts them
+            on the dynamic layer of the map. Only vertices whose combined
+            cost has changed are updated, then the path is recalculated.
             The path is then shrunk and provided to the agent worker process.
+            In receding horizon mode, the path is replanned at each period
+            from the agent's vertex, inside the window only.
+            In predictive mode, obstacles scanned with a velocity are
+            kept off the map. The path is replanned around their
+            predicted positions when the map changes, when they are not
+            where they were predicted, or after a wait.
+            In belief mode, the rays of the sensor update the belief
+            grid instead, and the map is only updated when the belief
+            has changed.
 
         Args:
             goal (Tuple[float, float]):
@@ -146,67 +522,245 @@ class LPAStarPathFinder:
 
         # Reset of rhs-values, g-values, start and goal.
         self.reset(goal)
-        begin = time.time_ns()
+        begin = self.clock.now_ns()
         while True:
 
             # Break if timeout has occured
-            if time.time_ns() - begin > (self.timeout * 1e9):
+            if self.clock.now_ns() - begin > (self.timeout * 1e9):
                 raise TimeoutException("Timeout for \
                                         find_path has been reached")
 
             # Break if the agent has reached the goal.
             x, y, _ = self.agent.get_position()
-            if (x - goal[0]) ** 2 + (y - goal[1]) \
+            if (x - goal[0]) ** 2 + (y - goal[1]) ** 2 \
                <= (self.map.get_resolution() ** 2):
 
                 self.agent.stop_trajectory()
+                self.trajectory = None
                 break
 
+            # Tiles close to the agent are kept in memory.
+            if self.tiled:
+                self.map.set_agents([self.map.coors_to_indexes(x, y)])
+
+            if self.metrics is not None:
+                self.stats = self.metrics.start()
+                scan_begin = time.perf_counter_ns()
+
             # Sensor scan.
-            current_obstacles = self.map.get_obstacles()
-            new_obstacles = self \
-                .map \
-                .convert_obstacles_to_graph(
-                                self
-                                .sensor
-                                .scan(self.agent.get_position()))
-
-            # If there is difference between previous
-            # obstacles and current obstacles.
-            if not collections.Counter(current_obstacles) \
-                    == collections.Counter(new_obstacles):
-
-                self.map.set_obstacles(new_obstacles)
-
-                # Update vertices with changed cost.
-                for obstacle in new_obstacles:
-                    if obstacle not in current_obstacles:
-                        self.__update_vertex(obstacle)
-
-                for obstacle in current_obstacles:
-                    if obstacle not in new_obstacles:
-                        self.__update_vertex(obstacle)
+            if self.belief is not None:
+                endpoints, hits = self.sensor.scan_rays(
+                    self.agent.get_position())
+                seen = self.belief.integrate((x, y), endpoints, hits)
+                changed = self.map.set_dynamic_layer(self.belief.occupied) \
+                    if len(seen) > 0 else []
+            else:
+                obstacles = self.sensor.scan(self.agent.get_position())
+                if self.sipp is not None:
+                    obstacles, moving = self.__split_moving(obstacles)
+                new_obstacles = self.map.convert_obstacles_to_graph(
+                    obstacles)
+
+                # Only vertices whose combined cost has changed
+                # since the previous scan are updated.
+                changed = self.map.set_obstacles(new_obstacles)
+            if self.stats is not None:
+                self.stats.scan_ns += time.perf_counter_ns() - scan_begin
+                self.stats.changed_vertices += len(changed)
 
+            if self.horizon is not None:
+                # The coarse cost-to-go is refreshed in the background,
+                # the window is replanned around the agent.
+                self.horizon.invalidate(changed)
+                self.horizon.step()
                 try:
-                    # Compute path and shrink it.
-                    model_path = self.compute_shortest_path()
-                    shrunk_path = self.__shrink_path(model_path)
-                    real_path = map(
-                        lambda point: self.map.indexes_to_coors(*point),
-                        shrunk_path)
-
-                    self.agent.follow_trajectory(real_path)
+                    self.__follow(self.horizon.plan(
+                        self.map.coors_to_indexes(x, y)))
                 except PathDoesNotExistException:
                     self.__pause()
 
+            elif self.sipp is not None:
+                now = self.clock.now_ns() / 1e9
+                if changed or self.replan or \
+                        self.sipp.deviates(moving, now):
+                    self.replan = False
+                    self.sipp.predict(moving, now)
+                    try:
+                        schedule = self.sipp.plan(
+                            self.map.coors_to_indexes(x, y))
+                        # The agent stops where it has to wait, the
+                        # path is replanned from there.
+                        leg = self.sipp.leg(schedule)
+                        self.replan = len(leg) < len(schedule)
+                        self.__follow(leg)
+                    except PathDoesNotExistException:
+                        self.replan = True
+                        self.__pause()
+
+            else:
+                if changed and not (self.lazy_updates
+                                    and self.__defer(changed)):
+                    self.update_vertices(changed)
+                    self.replan = True
+
+                # The path is recalculated at most once per
+                # min_replan_period, changes are applied meanwhile.
+                now = self.clock.now_ns()
+                if self.replan and (self.__last_replan is None or
+                                    now - self.__last_replan
+                                    >= self.min_replan_period * 1e6):
+                    self.replan = False
+                    self.__last_replan = now
+
+                    try:
+                        # Compute path and shrink it.
+                        self.__follow(self.__cached_path())
+                    except PathDoesNotExistException:
+                        self.__pause()
+
+            if self.stats is not None:
+                self.metrics.finish(self.stats)
+                self.stats = None
+
             # Pause.
             self.__pause()
 
         # Clean up.
-        if self.agent.worker.is_alive():
+        if self.agent.worker is not None and self.agent.worker.is_alive():
             self.agent.worker.kill()
             self.agent.stop()
 
+    def order_tour(self, goals: List[Tuple[float, float]]
+                   ) -> List[Tuple[float, float]]:
+        """ Orders the visits of **goals** from the agent's position on
+            the current map. The costs between the agent and the goals
+            are computed with one search per goal, then the order is
+            improved by 2-opt for at most **tour_budget** seconds.
+
+        Args:
+            goals (List[Tuple[float, float]]):
+                The goal positions
+
+        Raises:
+            MapInitializationException: Raises if the map is tiled.
+
+        Returns:
+            List[Tuple[float, float]]: The goals in visiting order
+        """
+        if self.tiled:
+            raise MapInitializationException("A tour needs a GMap")
+        if len(goals) < 2:
+            return list(goals)
+        from lpastar_pf.tour import cost_matrix, order_tour
+        x, y, _ = self.agent.get_position()
+        costs = cost_matrix(self.map, self.map.coors_to_indexes(x, y),
+                            [self.map.coors_to_indexes(*goal)
+                             for goal in goals])
+        return [goals[k - 1]
+                for k in order_tour(costs, self.tour_budget)]
+
+    def find_tour(self, goals: List[Tuple[float, float]]
+                  ) -> List[Tuple[float, float]]:
+        """ Visits all **goals** in the order given by **order_tour**.
+            The legs are run back to back by **find_path**, which
+            reuses the grids and the map of the previous leg.
+
+        Args:
+            goals (List[Tuple[float, float]]):
+                The goal positions
+
+        Raises:
+            MapInitializationException: Raises if the map is tiled.
+            TimeoutException: Raises if a leg times out.
+
+        Returns:
+            List[Tuple[float, float]]: The goals in visiting order
+        """
+        order = self.order_tour(goals)
+        for goal in order:
+            self.find_path(goal)
+        return order
+
+    def __follow(self, model_path: List[Tuple[int, int]]) -> None:
+        """ Shrinks the path, converts it to real life coordinates
+            and provides it to the agent. The new trajectory usually
+            begins at a waypoint of the current one: if it is the end
+            of the current trajectory the agent keeps following it and
+            nothing is sent, otherwise only the waypoints after their
+            common prefix are sent so the agent does not start over
+            from the first waypoint.
+
+        Args:
+            model_path (List[Tuple[int, int]]):
+                A path to follow.
+        """
+        if self.__path_cells is not None:
+            self.__mark_path(model_path)
+        shrunk_path = self.__shrink_path(model_path)
+        points = list(map(tuple, self.map.indexes_to_coors_batch(
+            shrunk_path).tolist()))
+
+        current = self.trajectory
+        if current is None or points[0] not in current:
+            self.agent.follow_trajectory(points)
+            self.trajectory = points
+            sent = len(points)
+        else:
+            offset = current.index(points[0])
+            common = 1
+            while common < len(points) and offset + common < len(current) \
+                    and points[common] == current[offset + common]:
+                common += 1
+            if common == len(points) and offset + common == len(current):
+                return
+            start = offset + common
+            self.trajectory = current[:start] + points[common:]
+            self.agent.update_trajectory(self.trajectory, start)
+            sent = len(points) - common
+
+        if self.stats is not None:
+            self.stats.sent_waypoints += sent
+
+    def __mark_path(self, model_path: List[Tuple[int, int]]) -> None:
+        """ Replaces the vertices of the previous path by those of
+            **model_path** in the bitmap of the followed path.
+
+        Args:
+            model_path (List[Tuple[int, int]]):
+                The path followed by the agent.
+        """
+        if self.__path:
+            i, j = np.asarray(self.__path, dtype=np.int64).T
+            self.__path_cells[i, j] = False
+        self.__path = list(model_path)
+        if self.__path:
+            i, j = np.asarray(self.__path, dtype=np.int64).T
+            self.__path_cells[i, j] = True
+
+    def __split_moving(self,
+                       obstacles: Iterable[Tuple[float, ...]]
+                       ) -> Tuple[List[Tuple[float, ...]],
+                                  List[Tuple[float, ...]]]:
+        """ Splits scanned obstacles between static ones and moving
+            ones, which have a non zero velocity.
+
+        Args:
+            obstacles (Iterable[Tuple[float, ...]]):
+                Obstacles in **[x, y, w]** or **[x, y, w, vx, vy]**
+                format.
+
+        Returns:
+            Tuple[List, List]: The static obstacles and the moving ones
+        """
+        static = []
+        moving = []
+        for obstacle in obstacles:
+            if len(obstacle) > 3 and (obstacle[3] != 0 or obstacle[4] != 0):
+                moving.append(tuple(obstacle))
+            else:
+                static.append(tuple(obstacle[:3]))
+        return static, moving
+
     def __shrink_path(self,
                       model_path: List[Tuple[int, int]]) \
             -> Iterable[Tuple[int, int]]:
@@ -224,12 +778,14 @@ class LPAStarPathFinder:
         shrunk_path = []
 
         if len(model_path) > 2:
-            direction = abs(model_path[0][0] - model_path[1][0]) + \
-                        2 * abs(model_path[0][1] - model_path[1][1])
+            # Directions are signed: a zig-zag around an obstacle
+            # corner must keep its middle vertex.
+            direction = (model_path[1][0] - model_path[0][0],
+                         model_path[1][1] - model_path[0][1])
             for i in range(1, len(model_path)):
                 tmp = direction
-                direction = abs(model_path[i-1][0] - model_path[i][0]) + \
-                    2 * abs(model_path[i-1][1] - model_path[i][1])
+                direction = (model_path[i][0] - model_path[i-1][0],
+                             model_path[i][1] - model_path[i-1][1])
                 if tmp != direction:
                     shrunk_path.append(model_path[i-1])
             shrunk_path.append(model_path[len(model_path) - 1])
@@ -251,10 +807,31 @@ class LPAStarPathFinder:
         Returns:
             Tuple[int, int]: A key used to insert vertex to the priority queue
         """
-        return min(self.g[i][j], self.rhs[i][j]) + \
-            self.map.get_heurisitcs_cost((i, j),
-                                         self.goal), min(self.g[i][j],
-                                                         self.rhs[i][j])
+        h = self.map.get_heurisitcs_cost((i, j), self.goal)
+        if self.landmarks is not None:
+            h = max(h, self.landmarks.bound((i, j)))
+        return min(self.g[i][j], self.rhs[i][j]) + h, \
+            min(self.g[i][j], self.rhs[i][j])
+
+    def __precedes(self,
+                   key: Tuple[float, float],
+                   other: Tuple[float, float]) -> bool:
+        """ Compares two keys. First components which only differ by
+            rounding errors are equal, so ties on the optimal path are
+            broken by the second components.
+
+        Args:
+            key (Tuple[float, float]):
+                A key
+            other (Tuple[float, float]):
+                The key to compare with
+
+        Returns:
+            bool: True if **key** is lower than **other**
+        """
+        if abs(key[0] - other[0]) > 1e-9 * max(1.0, abs(other[0])):
+            return key[0] < other[0]
+        return key[1] < other[1]
 
     def __update_vertex(self, v: Tuple[int, int]) -> None:
         """ Updates the rhs-value of the vertex and reinserts it
@@ -267,15 +844,174 @@ class LPAStarPathFinder:
                 A vertex to update.
         """
         i, j = v
-        if v != self.start:
-            self.rhs[i][j] = min(list(map(lambda x: self.g[x[0]][x[1]]
-                                          + self.map.get_transition_cost(x, v),
-                                          self.map.get_neighbours(v))))
+        self.__compute_rhs(v)
         self.discover_order.remove(v)
         if self.g[i][j] != self.rhs[i][j]:
             self.discover_order.insert(self.__calculate_key(i, j), v)
 
-    def compute_shortest_path(self) -> List[Tuple[int, int]]:
+        stats = self.stats
+        if stats is not None:
+            stats.vertex_updates += 1
+            stats.queue_removes += 1
+            if self.g[i][j] != self.rhs[i][j]:
+                stats.queue_inserts += 1
+            for callback in self.metrics.hooks["update"]:
+                callback(v)
+
+    def __compute_rhs(self, v: Tuple[int, int]) -> None:
+        """ Computes the rhs-value of the vertex and its best parent.
+            The rhs-value of the start vertex is always 0.
+
+        Args:
+            v (Tuple[int, int]):
+                A vertex to compute the rhs-value of.
+        """
+        if v == self.start:
+            return
+        i, j = v
+        # rhs(v) = min(g(s') + c(s', v)), s' being the best parent.
+        rhs, parent = float("inf"), None
+        g = self.g
+        for neighbour in self.map.get_neighbours(v):
+            cost = g[neighbour[0]][neighbour[1]] + \
+                self.map.get_transition_cost(neighbour, v)
+            if cost < rhs:
+                rhs, parent = cost, neighbour
+        # No neighbour gives a finite cost, as around infinite
+        # obstacle costs: the vertex is unreachable.
+        if parent is None:
+            self.rhs[i][j] = self.infinity
+            self.parents[i][j] = -1
+            return
+        self.rhs[i][j] = rhs
+        self.parents[i][j] = 3 * (parent[0] - i + 1) + parent[1] - j + 1
+
+    def update_vertices(self, changed: Iterable[Tuple[int, int]]) -> None:
+        """ Updates the vertices whose cost has changed. All the edges
+            of such a vertex change, so its neighbours are updated too.
+            Cached paths crossing these vertices are invalidated.
+            Nothing is updated before the first **reset**, which
+            starts from the current map.
+
+        Deferred changes are updated first.
+
+        Args:
+            changed (Iterable[Tuple[int, int]]):
+                Vertices whose cost has changed.
+        """
+        if self.g is None:
+            return
+        changed = list(changed)
+        if self.pending:
+            changed.extend(self.pending)
+            self.pending.clear()
+        if self.cache is not None and changed:
+            self.cache.invalidate(changed, self.map.version,
+                                  self.__decreased(changed))
+        if self.__costs is not None and changed:
+            i, j = np.asarray(changed, dtype=np.int64).T
+            self.__costs[i, j] = self.map.cell_costs[i, j]
+        if self.landmarks is not None and changed:
+            self.landmarks.invalidate(changed)
+        to_update = set()
+        for v in changed:
+            to_update.add(v)
+            to_update.update(self.map.get_neighbours(v))
+        for v in to_update:
+            self.__update_vertex(v)
+
+    def __defer(self, changed: List[Tuple[int, int]]) -> bool:
+        """ Defers the changes if none of them can affect the path
+            followed by the agent: the changed vertices are off the
+            path, tested against a bitmap of its vertices, and their
+            cost has increased since the last update. The path keeps
+            its cost and every other path is not cheaper than before,
+            so it stays optimal and LPA* is not run. The deferred
+            vertices are updated with the next change which can affect
+            the path.
+
+        Args:
+            changed (List[Tuple[int, int]]):
+                Vertices whose cost has changed.
+
+        Returns:
+            bool: True if the changes are deferred
+        """
+        if not self.__path:
+            return False
+        i, j = np.asarray(changed, dtype=np.int64).T
+        if self.__path_cells[i, j].any() or self.__decreased(changed):
+            return False
+        self.pending.update(changed)
+        if self.cache is not None:
+            self.cache.invalidate(changed, self.map.version, False)
+        if self.stats is not None:
+            self.stats.deferred_vertices += len(changed)
+        return True
+
+    def __decreased(self, changed: List[Tuple[int, int]]) -> bool:
+        """ Tells if the cost of a changed vertex has decreased since
+            the last update. Without cost snapshot, as on tiled maps,
+            any change may be a decrease.
+
+        Args:
+            changed (List[Tuple[int, int]]):
+                Vertices whose cost has changed.
+
+        Returns:
+            bool: True if the cost of a vertex may have decreased
+        """
+        if self.__costs is None:
+            return True
+        i, j = np.asarray(changed, dtype=np.int64).reshape(-1, 2).T
+        return bool((self.map.cell_costs[i, j] < self.__costs[i, j]).any())
+
+    def set_terrain(self,
+                    terrain: Any,
+                    origin: Tuple[int, int] = (0, 0)) -> None:
+        """ Updates the traversal costs of the map (see
+            **GMap.set_terrain**). Only the vertices whose cost has
+            changed are updated and the path is recalculated at the
+            next period of **find_path**.
+
+        Args:
+            terrain (np.ndarray):
+                A grid of traversal cost multipliers indexed by **[i, j]**
+            origin=(0, 0) (Tuple[int, int]):
+                The vertex of the map where **terrain[0, 0]** is placed
+        """
+        changed = self.map.set_terrain(terrain, origin)
+        if changed and self.start is not None:
+            self.update_vertices(changed)
+            self.replan = True
+
+    def enable_metrics(self,
+                       metrics: "PlannerMetrics" = None
+                       ) -> "PlannerMetrics":
+        """ Starts recording counters and timers of the planner.
+
+        Args:
+            metrics=None (PlannerMetrics):
+                Metrics to accumulate in, new ones if not provided.
+
+        Returns:
+            PlannerMetrics: The metrics attached to the planner
+        """
+        if metrics is None:
+            from lpastar_pf.metrics import PlannerMetrics
+            metrics = PlannerMetrics()
+        self.metrics = metrics
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        """ Stops recording counters and timers of the planner.
+        """
+        self.metrics = None
+        self.stats = None
+
+    def compute_shortest_path(self,
+                              path_type: str = "list",
+                              origin: Tuple[int, int] = None) -> Any:
         """ Computes the shortest path using the advantages of
             LPA* algorithm. While the distance to the goal vertex
             (g-value) is not optimal and can be updated (g-value
@@ -283,6 +1019,18 @@ class LPAStarPathFinder:
             the vertex on the top of the priorirty queue and then
             we update its neighbours.
 
+        Args:
+            path_type="list" (str):
+                **"list"** returns the list of vertices from the agent
+                to the goal. **"generator"** returns a generator which
+                lazily yields the vertices from the goal back to the
+                agent. **"array"** returns a **L x 2** NumPy array of
+                real life coordinates from the agent to the goal.
+            origin=None (Tuple[int, int]):
+                The vertex where the path begins, the agent's vertex
+                by default. The path begins at the start vertex if
+                **origin** is not on it.
+
         Raises:
             PathDoesNotExistException: Raises if there is no path
             from start to goal.
@@ -291,15 +1039,60 @@ class LPAStarPathFinder:
             Iterable[Tuple[int, int]]: Returns the path where each
             two consecutive points are neigbours.
         """
-        while ((self.discover_order.top_key()
-                < self.__calculate_key(*self.goal)) or
-                (self.rhs[self.goal[0]][self.goal[1]]
-                    != self.g[self.goal[0]][self.goal[1]])):
-            v = None
+        if self.metrics is None:
+            self.__search()
+            return self.__extract_path(path_type, origin)
+
+        # A direct call records its own stats, a call from
+        # find_path records in the stats of the period.
+        owner = self.stats is None
+        if owner:
+            self.stats = self.metrics.start()
+        stats = self.stats
+        try:
+            begin = time.perf_counter_ns()
+            self.__search()
+            end = time.perf_counter_ns()
+            stats.plan_ns += end - begin
+            path = self.__extract_path(path_type, origin)
+            stats.extraction_ns += time.perf_counter_ns() - end
+            return path
+        finally:
+            if owner:
+                self.metrics.finish(stats)
+                self.stats = None
+
+    def __search(self) -> None:
+        """ Runs LPA* until the goal vertex is consistent and
+            its key is not greater than the top key of the queue.
+            Stale landmarks are refreshed first, and the queue is
+            reordered with the new heuristics.
+        """
+        if self.landmarks is not None and self.landmarks.stale:
+            self.landmarks.refresh()
+            self.discover_order.rekey(lambda v: self.__calculate_key(*v))
+        if self.__fresh:
+            self.__fresh = False
+            if self.initial_search == "bidirectional":
+                self.__search_bidirectional()
+                return
+        goal_i, goal_j = self.goal
+        while True:
             try:
-                v = self.discover_order.pop()
+                if not self.__precedes(self.discover_order.top_key(),
+                                       self.__calculate_key(*self.goal)) \
+                        and self.rhs[goal_i][goal_j] \
+                        == self.g[goal_i][goal_j]:
+                    break
+                _, v = self.discover_order.pop()
             except EmptyQueueException:
                 break
+            stats = self.stats
+            if stats is not None:
+                stats.expansions += 1
+                stats.queue_pops += 1
+                for callback in self.metrics.hooks["expand"]:
+                    callback(v)
             i, j = v
             if self.g[i][j] > self.rhs[i][j]:
                 self.g[i][j] = self.rhs[i][j]
@@ -311,36 +1104,127 @@ class LPAStarPathFinder:
                     self.__update_vertex(neighbour)
                 self.__update_vertex(v)
 
+    def __search_bidirectional(self) -> None:
+        """ Runs the bidirectional search from the start vertex to the
+            goal vertex, then seeds LPA* with its result: the g-values
+            of the vertices expanded by the forward search and of the
+            path are exact. The rhs-values of these vertices and of
+            their neighbours are computed from them and the inconsistent
+            ones are queued, so the next incremental search resumes the
+            forward search where it has stopped.
+        """
+        from lpastar_pf.bidirectional import bidirectional_search
+        try:
+            path, expanded, expansions = bidirectional_search(
+                self.map, self.start, self.goal)
+        except PathDoesNotExistException:
+            # The goal keeps an infinite g-value and LPA* takes over.
+            return
+
+        for (i, j), cost in expanded.items():
+            self.g[i][j] = cost
+        for k in range(1, len(path)):
+            if path[k] not in expanded:
+                (i, j), (pi, pj) = path[k], path[k - 1]
+                self.g[i][j] = self.g[pi][pj] + \
+                    self.map.get_transition_cost(path[k - 1], path[k])
+
+        seeded = set(expanded)
+        seeded.update(path)
+        for v in list(seeded):
+            seeded.update(self.map.get_neighbours(v))
+        self.discover_order = self.__new_queue()
+        for v in seeded:
+            self.__compute_rhs(v)
+            if self.g[v[0]][v[1]] != self.rhs[v[0]][v[1]]:
+                self.discover_order.insert(self.__calculate_key(*v), v)
+
+        if self.stats is not None:
+            self.stats.expansions += expansions
+
+    def __extract_path(self,
+                       path_type: str = "list",
+                       origin: Tuple[int, int] = None) -> Any:
+        """ Walks back the best parents from the goal vertex to the
+            agent's vertex, or to the start vertex if the agent is not
+            on the path. The walk is linear in the length of the path.
+
+        Args:
+            path_type="list" (str):
+                One of **"list"**, **"generator"** or **"array"**,
+                see **compute_shortest_path**.
+            origin=None (Tuple[int, int]):
+                The vertex where the path begins, see
+                **compute_shortest_path**.
+
+        Raises:
+            PathDoesNotExistException: Raises if there is no path
+            from start to goal.
+
+        Returns:
+            Any: The path in the requested format.
+        """
         if self.g[self.goal[0]][self.goal[1]] == self.infinity:
             raise PathDoesNotExistException("Cannot go from "
                                             + str(self.start)
                                             + " to "
                                             + str(self.goal))
 
-        s = self.goal
-        cur_vertex = self.map.coors_to_indexes(self.agent.get_position()[0],
-                                               self.agent.get_position()[1])
-        path = [s]
-        while s != cur_vertex:
-            neighbours = self.map.get_neighbours(s)
-            pred = neighbours[0]
-            min_pred = self.g[pred[0]][pred[1]] + \
-                self.map.get_transition_cost(pred, s)
-            for neighbour in neighbours:
-                x = self.g[neighbour[0]][neighbour[1]] + \
-                    self.map.get_transition_cost(neighbour, s)
-                if x < min_pred:
-                    min_pred = x
-                    pred = neighbour
-            path.insert(0, pred)
-            s = pred
+        if path_type == "generator":
+            return self.__walk_parents(origin)
 
+        path = list(self.__walk_parents(origin))
+        path.reverse()
+        if path_type == "array":
+            return self.map.indexes_to_coors_batch(path)
         return path
 
+    def __walk_parents(self, origin: Tuple[int, int] = None) \
+            -> Iterator[Tuple[int, int]]:
+        """ Yields the vertices of the path from the goal back to the
+            **origin** vertex or to the start vertex.
+
+        Args:
+            origin=None (Tuple[int, int]):
+                The vertex where the walk stops, the agent's vertex
+                by default.
+
+        Raises:
+            PathDoesNotExistException: Raises if a vertex of the path
+            has no parent, or if the parents make a cycle.
+
+        Yields:
+            Tuple[int, int]: The vertices of the path, goal first.
+        """
+        if origin is None:
+            x, y, _ = self.agent.get_position()
+            origin = self.map.coors_to_indexes(x, y)
+
+        # Every vertex of the path but the goal has a parent.
+        if self.storage == "sparse":
+            length = len(self.parents)
+        else:
+            length = self.map.columns * self.map.rows
+
+        s = self.goal
+        yield s
+        for _ in range(length):
+            if s == self.start or s == origin:
+                return
+            direction = self.parents[s[0]][s[1]]
+            if direction < 0:
+                break
+            s = (s[0] + direction // 3 - 1, s[1] + direction % 3 - 1)
+            yield s
+        raise PathDoesNotExistException("Broken path from "
+                                        + str(self.goal)
+                                        + " to "
+                                        + str(self.start))
+
     def __pause(self) -> None:
         """ Pauses current process for **period** milliseconds
         """
-        time.sleep(self.period / 1000.0)
+        self.clock.sleep(self.period / 1000.0)
 
     def __param_getter(self, param_name: str, params: Dict[str, Any]) -> Any:
         """ A function which is used to extract data
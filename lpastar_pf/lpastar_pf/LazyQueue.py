@@ -0,0 +1,172 @@
+from lpastar_pf.pf_exceptions import EmptyQueueException
+from typing import Callable, Tuple
+import heapq
+
+
+class LazyQueue:
+
+    """ A priority queue of vertices keyed by pairs of floats which
+    never searches an entry to remove it. Each vertex has a version
+    stamp: removing a vertex only forgets its stamp, inserting it
+    pushes a new entry **(k1, k2, code, stamp)** with a new stamp. The
+    entries whose stamp is not the one of their vertex are stale, they
+    are skipped when they reach the top of the heap. A vertex **(i, j)**
+    is encoded as the integer **i * rows + j**, so entries are ordered
+    as in PriorityQueue.
+
+    Stale entries cost memory and make the heap deeper, so the heap is
+    compacted, rebuilt from the live entries only, when there are more
+    than **ratio** stale entries per live one.
+
+    Attributes
+    ----------
+    rows: int
+        The number of rows of the map, vertices must have
+        **0 <= j < rows**.
+    ratio: float
+        The ratio of stale entries to live ones which triggers a
+        compaction.
+    h: List[Tuple[float, float, int, int]]
+        The heap of live and stale entries.
+    stamps: Dict[int, int]
+        The stamp of the live entry of each queued vertex code.
+    stale: int
+        The number of stale entries in the heap.
+    compactions: int
+        The number of compactions.
+
+    Methods
+    -------
+
+    insert(key, value):
+        Inserts a vertex, or changes its key if it is queued.
+    pop():
+        Removes the vertex with the lowest key.
+    top_key():
+        Gets the lowest key.
+    remove(value):
+        Removes a vertex if it is queued.
+    rekey(key):
+        Recomputes the keys of all vertices.
+    __drop_stale():
+        Pops the stale entries at the top of the heap.
+    __compact():
+        Rebuilds the heap from the live entries.
+    """
+
+    def __init__(self, rows: int, ratio: float = 1.0) -> None:
+        """ Initializes an empty queue.
+
+        Args:
+            rows (int):
+                The number of rows of the map.
+            ratio=1.0 (float):
+                The ratio of stale entries to live ones which
+                triggers a compaction.
+        """
+        self.rows = rows
+        self.ratio = ratio
+        self.h = []
+        self.stamps = {}
+        self.stale = 0
+        self.compactions = 0
+        self.__next_stamp = 0
+
+    def __len__(self) -> int:
+        return len(self.stamps)
+
+    def insert(self, key: Tuple[float, float],
+               value: Tuple[int, int]) -> None:
+        """ Inserts **value** with **key**. If it is already queued its
+            previous entry becomes stale.
+
+        Args:
+            key (Tuple[float, float]):
+                The key of the vertex.
+            value (Tuple[int, int]):
+                The vertex.
+        """
+        code = value[0] * self.rows + value[1]
+        if code in self.stamps:
+            self.stale += 1
+        self.__next_stamp += 1
+        self.stamps[code] = self.__next_stamp
+        heapq.heappush(self.h, (key[0], key[1], code, self.__next_stamp))
+        if self.stale > self.ratio * len(self.stamps):
+            self.__compact()
+
+    def pop(self) -> Tuple[Tuple[float, float], Tuple[int, int]]:
+        """ Removes the vertex with the lowest key.
+
+        Raises:
+            EmptyQueueException: Raises if the queue is empty.
+
+        Returns:
+            Tuple[Tuple[float, float], Tuple[int, int]]: The key and
+            the vertex
+        """
+        self.__drop_stale()
+        if not self.h:
+            raise EmptyQueueException("Can't pop, the queue is empty")
+        first, second, code, _ = heapq.heappop(self.h)
+        del self.stamps[code]
+        return (first, second), divmod(code, self.rows)
+
+    def top_key(self) -> Tuple[float, float]:
+        """ Gets the lowest key.
+
+        Raises:
+            EmptyQueueException: Raises if the queue is empty.
+
+        Returns:
+            Tuple[float, float]: The lowest key
+        """
+        self.__drop_stale()
+        if not self.h:
+            raise EmptyQueueException("Can't get top key, the queue is empty")
+        return self.h[0][0], self.h[0][1]
+
+    def remove(self, value: Tuple[int, int]) -> None:
+        """ Removes **value** if it is queued, its entry becomes stale.
+
+        Args:
+            value (Tuple[int, int]):
+                The vertex.
+        """
+        if self.stamps.pop(value[0] * self.rows + value[1], None) is not None:
+            self.stale += 1
+            if self.stale > self.ratio * len(self.stamps):
+                self.__compact()
+
+    def rekey(self, key: Callable[[Tuple[int, int]],
+                                  Tuple[float, float]]) -> None:
+        """ Recomputes the keys of all vertices with **key** and
+            rebuilds the heap from the live entries.
+
+        Args:
+            key (Callable[[Tuple[int, int]], Tuple[float, float]]):
+                The key of a vertex.
+        """
+        self.h = [key(divmod(code, self.rows)) + (code, stamp)
+                  for code, stamp in self.stamps.items()]
+        heapq.heapify(self.h)
+        self.stale = 0
+
+    def __drop_stale(self) -> None:
+        """ Pops the stale entries at the top of the heap.
+        """
+        h = self.h
+        stamps = self.stamps
+        while h and stamps.get(h[0][2]) != h[0][3]:
+            heapq.heappop(h)
+            self.stale -= 1
+
+    def __compact(self) -> None:
+        """ Rebuilds the heap from the live entries.
+        """
+        stamps = self.stamps
+        self.h = [entry for entry in self.h
+                  if stamps.get(entry[2]) == entry[3]]
+        heapq.heapify(self.h)
+        self.stale = 0
+        self.compactions += 1
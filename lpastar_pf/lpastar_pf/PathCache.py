@@ -0,0 +1,142 @@
+from typing import Iterable, List, Tuple
+from collections import OrderedDict
+
+
+class PathCache:
+
+    """ A LRU cache of paths keyed by start vertex, goal vertex and
+    map version. A path is only returned for the version of the map
+    it has been stamped with, which is bumped by one on every change.
+    When the cost of some vertices increases, the paths which cross
+    them are removed and the other ones are stamped with the new
+    version: the cost of their edges has not changed and no other path
+    has become cheaper, so they are still shortest paths. When the cost
+    of a vertex decreases, a cheaper path may cross it, so all the
+    paths are removed.
+
+    Attributes
+    ----------
+    capacity: int
+        The maximal number of cached paths.
+    entries: OrderedDict
+        Map version, path and set of vertices of the path by
+        **(start, goal)**, least recently used first.
+    hits: int
+        Number of queries answered by the cache.
+    misses: int
+        Number of queries not answered by the cache.
+
+    Methods
+    -------
+
+    get(start, goal, version):
+        Gets a cached path.
+    put(start, goal, version, path):
+        Caches a path.
+    invalidate(changed, version, decreased):
+        Removes the paths which may no longer be shortest.
+    clear():
+        Removes all the paths.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """ Initializes an empty cache.
+
+        Args:
+            capacity (int):
+                The maximal number of cached paths.
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self,
+            start: Tuple[int, int],
+            goal: Tuple[int, int],
+            version: int) -> List[Tuple[int, int]]:
+        """ Gets the path from **start** to **goal** cached for this
+            version of the map.
+
+        Args:
+            start (Tuple[int, int]):
+                The start vertex
+            goal (Tuple[int, int]):
+                The goal vertex
+            version (int):
+                The current version of the map
+
+        Returns:
+            List[Tuple[int, int]]: A copy of the path, None if
+            it is not cached
+        """
+        entry = self.entries.get((start, goal))
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end((start, goal))
+        self.hits += 1
+        return list(entry[1])
+
+    def put(self,
+            start: Tuple[int, int],
+            goal: Tuple[int, int],
+            version: int,
+            path: List[Tuple[int, int]]) -> None:
+        """ Caches the path from **start** to **goal** for this version
+            of the map and evicts the least recently used path if the
+            cache is full.
+
+        Args:
+            start (Tuple[int, int]):
+                The start vertex
+            goal (Tuple[int, int]):
+                The goal vertex
+            version (int):
+                The current version of the map
+            path (List[Tuple[int, int]]):
+                The path from **start** to **goal**
+        """
+        if self.capacity <= 0:
+            return
+        path = tuple(path)
+        self.entries[(start, goal)] = (version, path, frozenset(path))
+        self.entries.move_to_end((start, goal))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def invalidate(self,
+                   changed: Iterable[Tuple[int, int]],
+                   version: int,
+                   decreased: bool = True) -> None:
+        """ Removes the paths which cross a changed vertex and stamps
+            the other ones with the new version of the map. Paths older
+            than the previous version have missed some changes, they
+            are removed too. If the cost of a changed vertex has
+            decreased, all the paths are removed.
+
+        Args:
+            changed (Iterable[Tuple[int, int]]):
+                Vertices whose cost has changed
+            version (int):
+                The new version of the map
+            decreased=True (bool):
+                True if the cost of a changed vertex may have decreased
+        """
+        if decreased:
+            self.entries.clear()
+            return
+        changed = set(changed)
+        for key, (stamp, path, vertices) in list(self.entries.items()):
+            if stamp >= version - 1 and vertices.isdisjoint(changed):
+                self.entries[key] = (version, path, vertices)
+            else:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        """ Removes all the paths.
+        """
+        self.entries.clear()
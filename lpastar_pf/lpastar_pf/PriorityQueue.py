@@ -1,5 +1,6 @@
 from lpastar_pf.extensions import comparable_t
 from lpastar_pf.pf_exceptions import EmptyQueueException
+from typing import Callable
 import heapq
 
 
@@ -34,3 +35,7 @@ class PriorityQueue:
         self.h[pos] = self.h[-1]
         self.h.pop()
         heapq.heapify(self.h)
+
+    def rekey(self, key: Callable[[comparable_t], comparable_t]) -> None:
+        self.h = [(key(value), value) for _, value in self.h]
+        heapq.heapify(self.h)
@@ -0,0 +1,322 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.pf_exceptions import PathDoesNotExistException
+from typing import Dict, Iterator, List, Tuple
+from math import sqrt, inf
+import heapq
+import numpy as np
+
+
+class RecedingHorizon:
+
+    """ A planner which replans exactly only inside a window around the
+    agent and uses a cached coarse cost-to-go beyond it. The cost of a
+    plan is bounded by the size of the window, whatever the size of the
+    map is.
+
+    The map is divided in **block x block** coarse cases whose cost is
+    the mean cost of their free vertices, infinite if they are all
+    occupied: the exact window goes around the obstacles of partially
+    free coarse cases. The coarse cost-to-go is computed
+    once with Dijkstra from the goal when the goal is set. When the map
+    changes, a new one is computed in the background: **step** runs at
+    most **budget** iterations of the refresh, and the cached field is
+    used until the refresh has finished. A change during a refresh
+    does not restart it, which would never finish if the map changed
+    at every scan: the refresh runs to its end and a single new one
+    then takes every change made meanwhile into account.
+
+    Attributes
+    ----------
+    map: GMap
+        The map to plan on.
+    window: int
+        Half size of the exact planning window, in cases.
+    block: int
+        Size of a coarse case, in cases.
+    budget: int
+        Number of coarse vertices settled by each **step**.
+    goal: Tuple[int, int]
+        The goal vertex.
+    cost_to_go: np.ndarray
+        Cached coarse cost-to-go of each coarse case.
+
+    Methods
+    -------
+
+    set_goal(goal):
+        Sets the goal and computes the coarse cost-to-go.
+    invalidate(changed):
+        Starts or schedules the background refresh of the coarse
+        cost-to-go.
+    step():
+        Runs one budgeted step of the background refresh.
+    plan(start):
+        Plans from **start** to the goal.
+    __coarse_costs():
+        Computes the cost of each coarse case.
+    __refresh(costs):
+        Computes the coarse cost-to-go, yielding every **budget**
+        settled coarse cases.
+    __search_window(start):
+        Runs Dijkstra from **start** inside the window.
+    __continuation(block):
+        Follows the coarse cost-to-go from a coarse case to the goal.
+    """
+
+    def __init__(self, _map: GMap, window: int, block: int = 8,
+                 budget: int = 1000) -> None:
+        """ Initializes the planner without goal.
+
+        Args:
+            _map (GMap):
+                The map to plan on.
+            window (int):
+                Half size of the exact planning window, in cases.
+            block=8 (int):
+                Size of a coarse case, in cases.
+            budget=1000 (int):
+                Number of coarse vertices settled by each **step**.
+        """
+        self.map = _map
+        self.window = window
+        self.block = block
+        self.budget = budget
+        self.goal = None
+        self.cost_to_go = None
+        self.__job = None
+        self.__pending = False
+
+    def set_goal(self, goal: Tuple[int, int]) -> None:
+        """ Sets the goal and computes the coarse cost-to-go
+            synchronously.
+
+        Args:
+            goal (Tuple[int, int]):
+                The goal vertex.
+        """
+        self.goal = goal
+        self.__job = None
+        self.__pending = False
+        for _ in self.__refresh(self.__coarse_costs()):
+            pass
+
+    def invalidate(self, changed: List[Tuple[int, int]]) -> None:
+        """ Starts the background refresh of the coarse cost-to-go if
+            some vertices have changed. If a refresh is running, it is
+            not restarted: a new one starts when it has finished. The
+            cached field is kept until the refresh has finished.
+
+        Args:
+            changed (List[Tuple[int, int]]):
+                Vertices whose cost has changed.
+        """
+        if changed and self.goal is not None:
+            if self.__job is None:
+                self.__job = self.__refresh(self.__coarse_costs())
+            else:
+                self.__pending = True
+
+    def step(self) -> bool:
+        """ Runs one budgeted step of the background refresh.
+
+        Returns:
+            bool: True if the cached cost-to-go is up to date.
+        """
+        if self.__job is None:
+            return True
+        if not next(self.__job, False):
+            self.__job = None
+            if self.__pending:
+                # The changes made during the refresh are taken into
+                # account by the next one.
+                self.__pending = False
+                self.__job = self.__refresh(self.__coarse_costs())
+        return self.__job is None
+
+    def plan(self, start: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """ Plans from **start** to the goal. The path is exact inside
+            the window: it minimizes the cost to reach a vertex of the
+            window border plus the coarse cost-to-go of this vertex, or
+            the cost to reach the goal if it is inside the window.
+            Beyond the window the path is made of the centers of the
+            coarse cases leading to the goal, which are not neighbours.
+
+        Args:
+            start (Tuple[int, int]):
+                The vertex of the agent.
+
+        Raises:
+            PathDoesNotExistException: Raises if the goal can't be
+            reached from the window.
+
+        Returns:
+            List[Tuple[int, int]]: The path from **start** to the goal.
+        """
+        g, parents, border = self.__search_window(start)
+
+        best, best_cost = None, inf
+        if self.goal in g:
+            best, best_cost = self.goal, g[self.goal]
+        for v in border:
+            cost = g[v] + self.cost_to_go[v[0] // self.block,
+                                          v[1] // self.block]
+            if cost < best_cost:
+                best, best_cost = v, cost
+
+        if best is None:
+            raise PathDoesNotExistException("Cannot go from "
+                                            + str(start)
+                                            + " to "
+                                            + str(self.goal))
+
+        path = [best]
+        while path[-1] != start:
+            path.append(parents[path[-1]])
+        path.reverse()
+
+        if best != self.goal:
+            path.extend(self.__continuation((best[0] // self.block,
+                                             best[1] // self.block)))
+        return path
+
+    def __coarse_costs(self) -> np.ndarray:
+        """ Computes the cost of each coarse case as the mean cost of
+            its free vertices: an obstacle does not make its whole
+            block expensive, or infinite with an infinite obstacle
+            cost. A block without free vertex is impassable.
+
+        Returns:
+            np.ndarray: The costs of the coarse cases
+        """
+        columns, rows = self.map.cell_costs.shape
+        coarse_columns = -(-columns // self.block)
+        coarse_rows = -(-rows // self.block)
+        padded = np.zeros((coarse_columns * self.block,
+                           coarse_rows * self.block))
+        free = np.zeros(padded.shape, dtype=bool)
+        free[:columns, :rows] = ~self.map.occupancy
+        padded[free] = self.map.cell_costs[free[:columns, :rows]]
+        shape = (coarse_columns, self.block, coarse_rows, self.block)
+        total = padded.reshape(shape).sum(axis=(1, 3))
+        count = free.reshape(shape).sum(axis=(1, 3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(count > 0, total / count, inf)
+
+    def __refresh(self, costs: np.ndarray) -> Iterator[bool]:
+        """ Computes the coarse cost-to-go with Dijkstra from the coarse
+            case of the goal. Yields every **budget** settled coarse
+            cases and replaces **cost_to_go** when finished.
+
+        Args:
+            costs (np.ndarray):
+                The costs of the coarse cases when the refresh started.
+
+        Yields:
+            bool: True when the budget of a step is spent.
+        """
+        coarse_columns, coarse_rows = costs.shape
+        cost_to_go = np.full(costs.shape, inf)
+        source = (self.goal[0] // self.block, self.goal[1] // self.block)
+        cost_to_go[source] = 0.0
+        queue = [(0.0, source)]
+        settled = 0
+        while queue:
+            d, (i, j) = heapq.heappop(queue)
+            if d > cost_to_go[i, j]:
+                continue
+            settled += 1
+            if settled % self.budget == 0:
+                yield True
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    u, w = i + di, j + dj
+                    if (di == 0 and dj == 0) or u < 0 or w < 0 or \
+                            u >= coarse_columns or w >= coarse_rows:
+                        continue
+                    cost = d + self.block * sqrt(abs(di) + abs(dj)) * \
+                        (costs[i, j] + costs[u, w]) / 2
+                    if cost < cost_to_go[u, w]:
+                        cost_to_go[u, w] = cost
+                        heapq.heappush(queue, (cost, (u, w)))
+        self.cost_to_go = cost_to_go
+
+    def __search_window(self, start: Tuple[int, int]) \
+            -> Tuple[Dict[Tuple[int, int], float],
+                     Dict[Tuple[int, int], Tuple[int, int]],
+                     List[Tuple[int, int]]]:
+        """ Runs Dijkstra from **start** restricted to the window.
+
+        Args:
+            start (Tuple[int, int]):
+                The vertex of the agent.
+
+        Returns:
+            Tuple[Dict, Dict, List]: The costs of the reached vertices,
+            their parents and the reached vertices of the window border
+            which have neighbours outside of the window.
+        """
+        i_min = max(0, start[0] - self.window)
+        i_max = min(self.map.columns - 1, start[0] + self.window)
+        j_min = max(0, start[1] - self.window)
+        j_max = min(self.map.rows - 1, start[1] + self.window)
+
+        g = {start: 0.0}
+        parents = {}
+        queue = [(0.0, start)]
+        closed = set()
+        while queue:
+            d, v = heapq.heappop(queue)
+            if v in closed:
+                continue
+            closed.add(v)
+            for u in self.map.get_neighbours(v):
+                if not (i_min <= u[0] <= i_max and j_min <= u[1] <= j_max):
+                    continue
+                cost = d + self.map.get_transition_cost(v, u)
+                if cost < g.get(u, inf):
+                    g[u] = cost
+                    parents[u] = v
+                    heapq.heappush(queue, (cost, u))
+
+        border = [v for v in g
+                  if (v[0] == i_min and i_min > 0)
+                  or (v[0] == i_max and i_max < self.map.columns - 1)
+                  or (v[1] == j_min and j_min > 0)
+                  or (v[1] == j_max and j_max < self.map.rows - 1)]
+        return g, parents, border
+
+    def __continuation(self, block: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """ Follows the steepest descent of the coarse cost-to-go from
+            **block** to the coarse case of the goal.
+
+        Args:
+            block (Tuple[int, int]):
+                The coarse case to start from.
+
+        Returns:
+            List[Tuple[int, int]]: Centers of the coarse cases on the way,
+            followed by the goal.
+        """
+        coarse_columns, coarse_rows = self.cost_to_go.shape
+        points = []
+        current = block
+        while self.cost_to_go[current] > 0:
+            i, j = current
+            following = min(((i + di, j + dj)
+                             for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                             if 0 <= i + di < coarse_columns
+                             and 0 <= j + dj < coarse_rows),
+                            key=lambda b: self.cost_to_go[b])
+            if self.cost_to_go[following] >= self.cost_to_go[current]:
+                break
+            current = following
+            points.append((min(current[0] * self.block + self.block // 2,
+                               self.map.columns - 1),
+                           min(current[1] * self.block + self.block // 2,
+                               self.map.rows - 1)))
+        if points and points[-1][0] // self.block == \
+                self.goal[0] // self.block and \
+                points[-1][1] // self.block == self.goal[1] // self.block:
+            points.pop()
+        points.append(self.goal)
+        return points
@@ -0,0 +1,274 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.pf_exceptions import PathDoesNotExistException
+from typing import Iterable, List, Set, Tuple
+from math import ceil, inf
+import heapq
+import numpy as np
+
+
+# The safe intervals of a vertex which is never predicted occupied.
+ALWAYS_SAFE = ((0.0, inf),)
+
+
+class SafeIntervalPlanner:
+
+    """ Safe interval path planning (SIPP) around predicted moving
+    obstacles. Moving obstacles are scanned with a velocity and are
+    assumed to keep it for **horizon** seconds. Their predicted squares
+    are rasterized every **tick**, the time the agent needs to cross a
+    free case straight, so each vertex gets a few safe intervals: the
+    periods of time when no obstacle is predicted on it. A* then
+    searches the states **(vertex, safe interval)** and minimizes the
+    arrival time: the agent may wait on a vertex while it is safe to
+    let an obstacle pass. After the horizon every vertex is safe and
+    the search is a plain A*.
+
+    Times are counted in ticks from the last prediction. The duration
+    of a transition is its cost on the map divided by
+    **free_case_value**, so the terrain slows the agent down and
+    obstacles of the map are avoided as by LPA*.
+
+    Attributes
+    ----------
+    map: GMap
+        The map of the static obstacles.
+    horizon: float
+        The duration of the predictions, in seconds.
+    tick: float
+        The time the agent needs to cross a free case, in seconds.
+    goal: Tuple[int, int]
+        The goal vertex.
+    obstacles: np.ndarray
+        The **N x 5** moving obstacles of the last prediction in
+        **[x, y, w, vx, vy]** format.
+    stamp: float
+        The time of the last prediction, in seconds.
+    intervals: Dict[Tuple[int, int], Tuple[Tuple[float, float], ...]]
+        The safe intervals of the vertices which are predicted
+        occupied, in ticks.
+
+    Methods
+    -------
+
+    set_goal(goal):
+        Sets the goal vertex.
+    predict(obstacles, stamp):
+        Predicts the moving obstacles and computes the safe intervals.
+    deviates(obstacles, stamp):
+        Tells if scanned moving obstacles are not where predicted.
+    plan(start):
+        Plans from **start** to the goal with the arrival times.
+    leg(schedule):
+        Gets the part of a planned path which is followed without
+        waiting.
+    __rasterize(obstacles, elapsed):
+        Gets the vertices covered by the obstacles after some time.
+    """
+
+    def __init__(self, _map: GMap, horizon: float, speed: float) -> None:
+        """ Initializes the planner without goal nor prediction.
+
+        Args:
+            _map (GMap):
+                The map of the static obstacles.
+            horizon (float):
+                The duration of the predictions, in seconds.
+            speed (float):
+                The speed of the agent, in map units per second.
+        """
+        self.map = _map
+        self.horizon = horizon
+        self.tick = _map.resolution / speed
+        self.goal = None
+        self.obstacles = np.empty((0, 5))
+        self.stamp = 0.0
+        self.intervals = {}
+
+    def set_goal(self, goal: Tuple[int, int]) -> None:
+        """ Sets the goal vertex.
+
+        Args:
+            goal (Tuple[int, int]):
+                The goal vertex.
+        """
+        self.goal = goal
+
+    def predict(self,
+                obstacles: Iterable[Tuple[float, float, float,
+                                          float, float]],
+                stamp: float) -> None:
+        """ Predicts the squares of the moving obstacles at every tick
+            of the horizon and computes the safe intervals of the
+            vertices they cover. A vertex covered at tick **k** is
+            unsafe from **k - 1/2** to **k + 1/2**, consecutive unsafe
+            ticks are merged. The present tick is not predicted, the
+            agent leaves its vertex before the next one.
+
+        Args:
+            obstacles (Iterable[Tuple[float, float, float, float, float]]):
+                Moving obstacles in **[x, y, w, vx, vy]** format, where
+                **(vx, vy)** is the velocity in map units per second.
+            stamp (float):
+                The time of the scan, in seconds.
+        """
+        self.obstacles = np.asarray(list(obstacles),
+                                    dtype=float).reshape(-1, 5)
+        self.stamp = stamp
+        unsafe = {}
+        if len(self.obstacles) > 0:
+            for k in range(1, int(ceil(self.horizon / self.tick)) + 1):
+                for v in self.__rasterize(self.obstacles, k * self.tick):
+                    unsafe.setdefault(v, []).append(k)
+
+        self.intervals = {}
+        for v, ticks in unsafe.items():
+            intervals = []
+            begin = 0.0
+            for k in sorted(set(ticks)):
+                if k - 0.5 > begin:
+                    intervals.append((begin, k - 0.5))
+                begin = k + 0.5
+            intervals.append((begin, inf))
+            self.intervals[v] = tuple(intervals)
+
+    def deviates(self,
+                 obstacles: Iterable[Tuple[float, float, float,
+                                           float, float]],
+                 stamp: float) -> bool:
+        """ Tells if the scanned moving obstacles do not cover the
+            vertices predicted at the time of the scan. Obstacles which
+            keep their velocity never deviate, so the path is only
+            replanned when a prediction is wrong.
+
+        Args:
+            obstacles (Iterable[Tuple[float, float, float, float, float]]):
+                Moving obstacles in **[x, y, w, vx, vy]** format.
+            stamp (float):
+                The time of the scan, in seconds.
+
+        Returns:
+            bool: True if the predictions must be recomputed
+        """
+        obstacles = np.asarray(list(obstacles), dtype=float).reshape(-1, 5)
+        if len(obstacles) != len(self.obstacles) or \
+                stamp - self.stamp > self.horizon:
+            return True
+        return self.__rasterize(self.obstacles, stamp - self.stamp) != \
+            self.__rasterize(obstacles, 0.0)
+
+    def plan(self,
+             start: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
+        """ Plans from **start** to the goal with A* over the states
+            **(vertex, safe interval)**. A transition from a vertex to
+            a neighbour leaves the vertex within its safe interval and
+            arrives in a safe interval of the neighbour, as early as
+            possible: the agent waits on the vertex if the neighbour is
+            not safe yet. The goal is only reached in its last safe
+            interval, since the agent stays there. Obstacles are not
+            checked while the agent is moving between two vertices.
+
+        Args:
+            start (Tuple[int, int]):
+                The vertex of the agent.
+
+        Raises:
+            PathDoesNotExistException: Raises if the goal can't be
+            reached from **start**.
+
+        Returns:
+            List[Tuple[Tuple[int, int], float]]: The vertices of the
+            path from **start** to the goal with their arrival time in
+            seconds since the prediction.
+        """
+        free = self.map.free_case_value
+
+        def heuristics(v: Tuple[int, int]) -> float:
+            return self.map.get_heurisitcs_cost(v, self.goal) / free
+
+        first = self.intervals.get(start, ALWAYS_SAFE)
+        # The agent is on its vertex now, even if it is predicted
+        # occupied later.
+        index = next((k for k, (_, end) in enumerate(first) if end > 0.0),
+                     len(first) - 1)
+        state = (start, index)
+        arrivals = {state: 0.0}
+        parents = {state: None}
+        queue = [(heuristics(start), 0.0, state)]
+        while queue:
+            _, time, state = heapq.heappop(queue)
+            if time > arrivals[state]:
+                continue
+            v, index = state
+            # The agent stays on the goal, so it must be safe forever.
+            if v == self.goal and \
+                    self.intervals.get(v, ALWAYS_SAFE)[index][1] == inf:
+                schedule = []
+                while state is not None:
+                    schedule.append((state[0], arrivals[state] * self.tick))
+                    state = parents[state]
+                schedule.reverse()
+                return schedule
+
+            end = self.intervals.get(v, ALWAYS_SAFE)[index][1]
+            for u in self.map.get_neighbours(v):
+                duration = self.map.get_transition_cost(v, u) / free
+                if duration == inf:
+                    continue
+                for k, (begin, until) in enumerate(
+                        self.intervals.get(u, ALWAYS_SAFE)):
+                    arrival = max(time + duration, begin)
+                    if arrival > until or arrival - duration > end:
+                        continue
+                    if arrival < arrivals.get((u, k), inf):
+                        arrivals[(u, k)] = arrival
+                        parents[(u, k)] = state
+                        heapq.heappush(queue, (arrival + heuristics(u),
+                                               arrival, (u, k)))
+
+        raise PathDoesNotExistException("Cannot go from "
+                                        + str(start)
+                                        + " to "
+                                        + str(self.goal))
+
+    def leg(self, schedule: List[Tuple[Tuple[int, int], float]]
+            ) -> List[Tuple[int, int]]:
+        """ Gets the vertices of **schedule** up to the first one where
+            the agent has to wait. The agent stops there and the path
+            is replanned from it at the next period.
+
+        Args:
+            schedule (List[Tuple[Tuple[int, int], float]]):
+                A path planned by **plan**.
+
+        Returns:
+            List[Tuple[int, int]]: The vertices followed without waiting
+        """
+        free = self.map.free_case_value
+        path = [schedule[0][0]]
+        for k in range(1, len(schedule)):
+            (v, time), (u, arrival) = schedule[k - 1], schedule[k]
+            duration = self.map.get_transition_cost(v, u) / free
+            if arrival - time > (duration + 1e-9) * self.tick:
+                break
+            path.append(u)
+        return path
+
+    def __rasterize(self, obstacles: np.ndarray,
+                    elapsed: float) -> Set[Tuple[int, int]]:
+        """ Gets the vertices covered by the squares of **obstacles**
+            after **elapsed** seconds at their velocity.
+
+        Args:
+            obstacles (np.ndarray):
+                **N x 5** obstacles in **[x, y, w, vx, vy]** format.
+            elapsed (float):
+                The time since the obstacles were scanned, in seconds.
+
+        Returns:
+            Set[Tuple[int, int]]: The covered vertices
+        """
+        squares = np.column_stack((obstacles[:, :2]
+                                   + elapsed * obstacles[:, 3:5],
+                                   obstacles[:, 2]))
+        return set(map(tuple, self.map.convert_obstacles_to_graph(
+            squares).tolist()))
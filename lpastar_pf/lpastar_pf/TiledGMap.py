@@ -0,0 +1,716 @@
+from typing import Iterable, Dict, Tuple, Any, List
+from lpastar_pf.pf_exceptions import MapInitializationException
+from lpastar_pf.pf_exceptions import ImpossibleTransitionException
+from collections import OrderedDict
+from math import sqrt
+import os
+import numpy as np
+
+
+class Tile:
+
+    """ A square chunk of **size x size** cases of a TiledGMap.
+
+    Attributes
+    ----------
+    static: np.ndarray
+        Boolean grid of the obstacles which never move.
+    dynamic: np.ndarray
+        Boolean grid of the obstacles reported by the last scan.
+    terrain: np.ndarray
+        Traversal cost multiplier of each case, 1 by default.
+    """
+
+    __slots__ = ("static", "dynamic", "terrain")
+
+    def __init__(self, size: int) -> None:
+        """ Initializes a free tile.
+
+        Args:
+            size (int):
+                The number of cases of a side of the tile.
+        """
+        self.static = np.zeros((size, size), dtype=bool)
+        self.dynamic = np.zeros((size, size), dtype=bool)
+        self.terrain = np.ones((size, size), dtype=float)
+
+    def occupancy(self) -> np.ndarray:
+        """ Combines the static and dynamic obstacles.
+
+        Returns:
+            np.ndarray: Boolean grid of the obstacle cases
+        """
+        return self.static | self.dynamic
+
+
+class TiledGMap():
+    """ A map divided in square tiles of **tile_size x tile_size**
+    cases which are created lazily, when obstacles or terrain are put
+    on them. A case of a tile which does not exist is free and costs
+    **free_case_value**, so the memory follows the explored region and
+    the map does not need to be bounded: without **width** and
+    **height** the indices **(i, j)** can be any integers, negative
+    ones included.
+
+    At most **max_tiles** tiles are kept in memory. When there are more,
+    the least recently used tiles farther than **tile_keep_radius**
+    tiles from every agent are evicted. They are spilled to
+    **tile_spill_directory** and reloaded when they are read again if
+    the directory is set, dropped otherwise. The obstacles and terrain
+    of a dropped tile are forgotten, so its non default cases are
+    reported as changed by the next layer update.
+
+    The map has the interface of GMap used by LPAStarPathFinder, so the
+    planner searches across tile boundaries transparently. There is no
+    inflation layer nor cost decay: the cost of a free case is
+    **free_case_value * terrain**.
+
+    Attributes
+    ----------
+    resolution: int
+        The dimension of the square case representable
+        by a vertex.
+    rows: int
+        Number of cases' rows, None if the map is unbounded.
+    columns: int
+        Number of cases' columns, None if the map is unbounded.
+    free_case_value: int
+        A multiplier for a transition from free case
+        to the another free case.
+    obstacle_case_value: int
+        A multiplier for a transition from or
+        to the obstacle case.
+    heuristics_multiplier: int
+        A multiplier for a heuristics transition cost.
+    tile_size: int
+        The number of cases of a side of a tile.
+    max_tiles: int
+        The number of tiles kept in memory before eviction.
+    tile_keep_radius: int
+        Tiles at most this number of tiles away from an agent
+        are never evicted.
+    tile_spill_directory: str
+        The directory where evicted tiles are saved, None to
+        drop them.
+    tiles: OrderedDict
+        Tiles in memory by key **(i // tile_size, j // tile_size)**,
+        least recently used first.
+    spilled: set
+        Keys of the tiles saved in **tile_spill_directory**.
+    agents: List[Tuple[int, int]]
+        Keys of the tiles of the agents.
+    version: int
+        A counter bumped every time the cost of some vertices changes.
+
+    Methods
+    -------
+
+    convert_obstacles_to_graph(obstacles):
+        Converts real life obstacles to graph obstacles.
+    coors_to_indexes(x, y):
+        Converts real life coordinates to their graph representation.
+    indexes_to_coors(i, j):
+        Converts graph indices to the real life coordinates.
+    coors_to_indexes_batch(coors, clip):
+        Converts an array of real life coordinates to graph indices.
+    indexes_to_coors_batch(indexes):
+        Converts an array of graph indices to real life coordinates.
+    get_transition_cost(_from, _to):
+        Gets the edge cost from vertex **_from** to the vertex **_to**.
+    get_neighbours(vertex):
+        Gets neighbours of the **vertex**.
+    get_heurisitcs_cost(_from, _to):
+        Gets the heuristics cost from **_from** to **_to**.
+    get_resolution():
+        Gets the resolution.
+    get_obstacles():
+        Gets the obstacles of the tiles in memory.
+    set_obstacles(obstacles):
+        Sets obstacles of the dynamic layer.
+    set_static_obstacles(obstacles):
+        Sets obstacles of the static layer.
+    set_terrain(terrain, origin):
+        Sets the traversal costs of a region of the map.
+    set_agents(vertices):
+        Sets the vertices of the agents and evicts far tiles.
+    __set_layer(name, groups, keys):
+        Replaces a layer of some tiles.
+    __group(obstacles):
+        Groups graph indices by tile.
+    __inside(indexes):
+        Tests which indices are inside the bounds of the map.
+    __tile(key, create):
+        Gets a tile, reloading or creating it if needed.
+    __evict():
+        Evicts least recently used tiles far from the agents.
+    __drain_dropped():
+        Returns the changed vertices of the dropped tiles.
+    __spill_path(key):
+        Gets the file where a tile is spilled.
+    """
+
+    def __init__(self,
+                 params: Dict[str, Any],
+                 obstacles: Iterable[Tuple[float, float, float]] = None,
+                 static_obstacles: Iterable[Tuple[float, float, float]]
+                 = None
+                 ) -> None:
+        """ Extracts data from the **params** dictionary. **width** and
+        **height** are optional and bound the map. Initializes obstacles
+        and static obstacles if provided.
+
+        Args:
+            params (Dict[str, Any]):
+                A dictionary with attributes to initialize.
+            obstacles=None (Iterable[Tuple[float, float, float]]):
+                A list of real life obstacles of the dynamic layer.
+            static_obstacles=None (Iterable[Tuple[float, float, float]]):
+                A list of real life obstacles of the static layer.
+
+        Raises:
+            MapInitializationException: Occurs when a required
+            parameter is missing.
+        """
+        for name in ("resolution", "free_case_value",
+                     "obstacle_case_value", "heuristics_multiplier"):
+            if name not in params:
+                raise MapInitializationException(
+                    "Parameter required, but not provided: " + name)
+        self.resolution = params["resolution"]
+        self.free_case_value = params["free_case_value"]
+        self.obstacle_case_value = params["obstacle_case_value"]
+        self.heuristics_multiplier = params["heuristics_multiplier"]
+
+        self.width = params.get("width")
+        self.height = params.get("height")
+        self.columns = None if self.width is None \
+            else int(self.width / self.resolution)
+        self.rows = None if self.height is None \
+            else int(self.height / self.resolution)
+
+        self.tile_size = params.get("tile_size", 64)
+        self.max_tiles = params.get("max_tiles", 1024)
+        self.tile_keep_radius = params.get("tile_keep_radius", 2)
+        self.tile_spill_directory = params.get("tile_spill_directory")
+        if self.tile_spill_directory is not None:
+            os.makedirs(self.tile_spill_directory, exist_ok=True)
+
+        self.version = 0
+        self.tiles = OrderedDict()
+        self.spilled = set()
+        self.agents = []
+        self.__dynamic_tiles = set()
+        self.__dropped = []
+
+        if static_obstacles is not None:
+            self.set_static_obstacles(
+                self.convert_obstacles_to_graph(static_obstacles))
+        if obstacles is not None:
+            self.set_obstacles(self.convert_obstacles_to_graph(obstacles))
+
+    def convert_obstacles_to_graph(self,
+                                   obstacles:
+                                   Iterable[Tuple[float, float, float]]
+                                   ) -> np.ndarray:
+        """ Converts real life obstacles to theirs' graph representation.
+            Each obstacle covers the square of cases under its width.
+            Obstacles are clipped to the map if it is bounded.
+
+        Args:
+            obstacles (Iterable[Tuple[float, float, float]]):
+                Real life obstacles in **[x, y, w]** format, or
+                **[x, y, w, vx, vy]** for moving obstacles
+
+        Returns:
+            np.ndarray: A **N x 2** array of indices **(i, j)**
+        """
+        # The velocities of moving obstacles are ignored.
+        if not isinstance(obstacles, np.ndarray):
+            obstacles = [obstacle[:3] for obstacle in obstacles]
+        elif obstacles.ndim == 2:
+            obstacles = obstacles[:, :3]
+        obstacles = np.asarray(obstacles, dtype=float).reshape(-1, 3)
+        centers = obstacles[:, :2]
+        w = obstacles[:, 2:3] / 2
+
+        top_left = self.coors_to_indexes_batch(centers - w)
+        bottom_right = self.coors_to_indexes_batch(centers + w)
+        sizes = np.maximum(bottom_right - top_left + 1, 0)
+        counts = sizes[:, 0] * sizes[:, 1]
+        owners = np.repeat(np.arange(len(obstacles)), counts)
+        offsets = np.arange(counts.sum()) - \
+            np.repeat(np.cumsum(counts) - counts, counts)
+        heights = sizes[owners, 1]
+        indexes = np.stack((top_left[owners, 0] + offsets // heights,
+                            top_left[owners, 1] + offsets % heights),
+                           axis=1)
+        return indexes[self.__inside(indexes)]
+
+    def coors_to_indexes_batch(self,
+                               coors: np.ndarray,
+                               clip: bool = True) -> np.ndarray:
+        """ Converts an array of real life coordinates to the indices
+            of the graph's vertices in a single array operation.
+
+        Args:
+            coors (np.ndarray):
+                A **N x 2** array of real life coordinates **(x, y)**
+            clip=True (bool):
+                Clips the indices to the bounds of the map if True and
+                the map is bounded
+
+        Returns:
+            np.ndarray: A **N x 2** array of indices **(i, j)**
+        """
+        indexes = np.floor(np.asarray(coors, dtype=float).reshape(-1, 2)
+                           / self.resolution).astype(np.int64)
+        if clip and self.columns is not None:
+            np.clip(indexes[:, 0], 0, self.columns - 1, out=indexes[:, 0])
+        if clip and self.rows is not None:
+            np.clip(indexes[:, 1], 0, self.rows - 1, out=indexes[:, 1])
+        return indexes
+
+    def indexes_to_coors_batch(self, indexes: np.ndarray) -> np.ndarray:
+        """ Converts an array of indices of the graph's vertices to the
+            real life coordinates in a single array operation.
+
+        Args:
+            indexes (np.ndarray):
+                A **N x 2** array of indices **(i, j)**
+
+        Returns:
+            np.ndarray: A **N x 2** array of real life coordinates
+        """
+        return np.asarray(indexes, dtype=float).reshape(-1, 2) \
+            * self.resolution
+
+    def coors_to_indexes(self, x: float, y: float) -> Tuple[int, int]:
+        """ Converts real life coordinates to the indices of the graph's vertex
+
+        Args:
+            x (float):
+                Real life x coordinate
+            y (float):
+                Real life y coordinate
+
+        Returns:
+            Tuple[int, int]: Indices of the graph's vertex
+            which corresponds to the **(x, y)**
+        """
+        return int(x // self.resolution), int(y // self.resolution)
+
+    def indexes_to_coors(self, i: int, j: int) -> Tuple[float, float]:
+        """ Converts indices of the graph's vertex to the real life coordinates
+
+        Args:
+            i (int):
+                First index of the vertex
+            j (int):
+                Second index of the vertex
+
+        Returns:
+            Tuple[float, float]: Real life coordinates
+        """
+        return float(i * self.resolution), float(j * self.resolution)
+
+    def get_transition_cost(self,
+                            _from: Tuple[int, int],
+                            _to: Tuple[int, int]) -> float:
+        """ Gets a transition cost between **_from** and **_to** vertex if
+            and only if they are neighbours. Cases of tiles which do not
+            exist are free. Spilled tiles are reloaded, and the least
+            recently used tiles are evicted again beyond **max_tiles**.
+
+        Args:
+            _from (Tuple[int, int]):
+                A vertex to go from
+            _to (Tuple[int, int]):
+                A vertex to go to
+
+        Raises:
+            ImpossibleTransitionException: Exception occurs,
+            when **_from** and **_to** are not neighbours.
+
+        Returns:
+            float: A transition cost from **_from** to **_to**
+        """
+        if abs(_from[0] - _to[0]) > 1 or abs(_from[1] - _to[1]) > 1:
+            raise ImpossibleTransitionException("Impossible transition from "
+                                                + str(_from) + " to "
+                                                + str(_to))
+
+        size = self.tile_size
+        costs = []
+        for i, j in (_from, _to):
+            tile = self.__tile((i // size, j // size))
+            if tile is None:
+                costs.append(self.free_case_value)
+                continue
+            case = (i % size, j % size)
+            if tile.static[case] or tile.dynamic[case]:
+                costs = None
+                break
+            costs.append(self.free_case_value * tile.terrain[case])
+        # A search reloads spilled tiles, it must not keep more than
+        # **max_tiles** of them until the next layer update.
+        if len(self.tiles) > self.max_tiles:
+            self.__evict()
+        if costs is None:
+            return self.obstacle_case_value
+        return (costs[0] + costs[1]) / 2 * \
+            sqrt(abs(_from[1] - _to[1]) + abs(_from[0] - _to[0]))
+
+    def get_neighbours(self,
+                       vertex: Tuple[int, int]) -> Iterable[Tuple[int, int]]:
+        """ Gets all neighbours of the **vertex** inside the bounds
+            of the map, if any.
+
+        Args:
+            vertex (Tuple[int, int]):
+                The vertex to get neighbours of
+
+        Returns:
+            Iterable[Tuple[int, int]]: Neighbours of the **vertex**
+        """
+        i, j = vertex
+        neighbours = []
+        for di in (-1, 0, 1):
+            u = i + di
+            if self.columns is not None and not 0 <= u < self.columns:
+                continue
+            for dj in (-1, 0, 1):
+                w = j + dj
+                if (di == 0 and dj == 0) or \
+                        (self.rows is not None and not 0 <= w < self.rows):
+                    continue
+                neighbours.append((u, w))
+        return neighbours
+
+    def get_heurisitcs_cost(self,
+                            _from: Tuple[int, int],
+                            _to: Tuple[int, int]) -> float:
+        """ Gets heuristics cost to go from **_from** to **_to**
+
+        Args:
+            _from (Tuple[int, int]):
+                A vertex to go from
+            _to (Tuple[int, int]):
+                A vertex to go to
+
+        Returns:
+            float: The heuristics cost from **_from** to **_to**
+        """
+        return self.heuristics_multiplier * \
+            sqrt((_from[1] - _to[1]) ** 2 + (_from[0] - _to[0]) ** 2)
+
+    def get_resolution(self) -> int:
+        """ Gets the resolution
+
+        Returns:
+            int: The resolution of the map
+        """
+        return self.resolution
+
+    def get_obstacles(self) -> Iterable[Tuple[int, int]]:
+        """ Gets the static and dynamic obstacles of the tiles in memory.
+
+        Returns:
+            Iterable[Tuple[int, int]]: A list of obstacles
+        """
+        obstacles = []
+        for (ti, tj), tile in self.tiles.items():
+            for i, j in np.argwhere(tile.occupancy()):
+                obstacles.append((int(ti * self.tile_size + i),
+                                  int(tj * self.tile_size + j)))
+        return obstacles
+
+    obstacles = property(get_obstacles)
+
+    def set_obstacles(self,
+                      _obstacles: Iterable[Tuple[int, int]]
+                      ) -> List[Tuple[int, int]]:
+        """ Puts new list of obstacles on the dynamic layer of the map.
+            Tiles touched by the obstacles are created if needed.
+
+        Args:
+            _obstacles (Iterable[Tuple[int, int]]):
+                A new list of obstacles to put on the map
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed,
+            including the vertices of dropped tiles
+        """
+        groups = self.__group(_obstacles)
+        changed = self.__set_layer("dynamic", groups,
+                                   self.__dynamic_tiles | set(groups))
+        self.__dynamic_tiles = set(groups)
+        return changed
+
+    def set_static_obstacles(self,
+                             _obstacles: Iterable[Tuple[int, int]]
+                             ) -> List[Tuple[int, int]]:
+        """ Puts new list of obstacles on the static layer of the map.
+            All the known tiles are visited, spilled ones included, so
+            it is meant to be called once.
+
+        Args:
+            _obstacles (Iterable[Tuple[int, int]]):
+                A new list of static obstacles to put on the map
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed,
+            including the vertices of dropped tiles
+        """
+        groups = self.__group(_obstacles)
+        return self.__set_layer("static", groups,
+                                set(self.tiles) | self.spilled | set(groups))
+
+    def set_terrain(self,
+                    terrain: np.ndarray,
+                    origin: Tuple[int, int] = (0, 0)
+                    ) -> List[Tuple[int, int]]:
+        """ Sets the traversal cost multipliers of the vertices covered
+            by **terrain** placed at **origin**. Tiles are created
+            if needed.
+            Null and negative costs are rejected, the heuristic is not
+            scaled: it stays admissible as long as
+            **heuristics_multiplier** does not exceed the cheapest
+            case cost, **free_case_value** times the minimal terrain.
+
+        Args:
+            terrain (np.ndarray):
+                A grid of traversal cost multipliers indexed by **[i, j]**
+            origin=(0, 0) (Tuple[int, int]):
+                The vertex of the map where **terrain[0, 0]** is placed
+
+        Raises:
+            MapInitializationException: Occurs when **terrain** does not
+            fit in the bounds of the map or contains costs which
+            are not strictly positive
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        terrain = np.asarray(terrain, dtype=float)
+        if terrain.ndim != 2 or not self.__inside(np.array(
+                [origin, (origin[0] + terrain.shape[0] - 1,
+                          origin[1] + terrain.shape[1] - 1)])).all():
+            raise MapInitializationException(
+                "Terrain of shape " + str(terrain.shape) + " at "
+                + str(origin) + " does not fit in the map")
+        # A null cost would make a free detour as cheap as the
+        # straight path, NaN compares false as well.
+        if not (terrain > 0).all():
+            raise MapInitializationException(
+                "Terrain costs must be strictly positive")
+
+        size = self.tile_size
+        i0, j0 = origin
+        i1, j1 = i0 + terrain.shape[0], j0 + terrain.shape[1]
+        changed = self.__drain_dropped()
+        for ti in range(i0 // size, (i1 - 1) // size + 1):
+            for tj in range(j0 // size, (j1 - 1) // size + 1):
+                tile = self.__tile((ti, tj), create=True)
+                # Intersection of the patch and the tile, in map indices.
+                a, b = max(i0, ti * size), min(i1, (ti + 1) * size)
+                c, d = max(j0, tj * size), min(j1, (tj + 1) * size)
+                local = (slice(a - ti * size, b - ti * size),
+                         slice(c - tj * size, d - tj * size))
+                patch = terrain[a - i0:b - i0, c - j0:d - j0]
+                moved = np.argwhere((tile.terrain[local] != patch)
+                                    & ~tile.occupancy()[local])
+                tile.terrain[local] = patch
+                changed.extend((int(a + i), int(c + j)) for i, j in moved)
+        self.__evict()
+        if changed:
+            self.version += 1
+        return changed
+
+    def set_agents(self, vertices: Iterable[Tuple[int, int]]) -> None:
+        """ Sets the vertices of the agents. Tiles close to them are
+            never evicted, far ones are evicted if there are more
+            than **max_tiles** tiles in memory.
+
+        Args:
+            vertices (Iterable[Tuple[int, int]]):
+                The vertices of the agents
+        """
+        self.agents = [(i // self.tile_size, j // self.tile_size)
+                       for i, j in vertices]
+        self.__evict()
+
+    def __set_layer(self,
+                    name: str,
+                    groups: Dict[Tuple[int, int], np.ndarray],
+                    keys: Iterable[Tuple[int, int]]
+                    ) -> List[Tuple[int, int]]:
+        """ Replaces a layer of the tiles of **keys** with the obstacles
+            of **groups**.
+
+        Args:
+            name (str):
+                **"static"** or **"dynamic"**
+            groups (Dict[Tuple[int, int], np.ndarray]):
+                Local indices of the obstacles by tile
+            keys (Iterable[Tuple[int, int]]):
+                The tiles whose layer must be replaced
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        size = self.tile_size
+        changed = []
+        for key in keys:
+            local = groups.get(key)
+            tile = self.__tile(key, create=local is not None)
+            if tile is None:
+                continue
+            before = tile.occupancy()
+            layer = np.zeros((size, size), dtype=bool)
+            if local is not None:
+                layer[local[:, 0], local[:, 1]] = True
+            setattr(tile, name, layer)
+            moved = np.argwhere(before != tile.occupancy())
+            changed.extend((int(key[0] * size + i), int(key[1] * size + j))
+                           for i, j in moved)
+        self.__evict()
+        changed = self.__drain_dropped() + changed
+        if changed:
+            self.version += 1
+        return changed
+
+    def __group(self,
+                _obstacles: Iterable[Tuple[int, int]]
+                ) -> Dict[Tuple[int, int], np.ndarray]:
+        """ Groups graph obstacles by tile. Obstacles outside of the
+            bounds of the map are ignored.
+
+        Args:
+            _obstacles (Iterable[Tuple[int, int]]):
+                Graph representation of the obstacles
+
+        Returns:
+            Dict[Tuple[int, int], np.ndarray]: **N x 2** arrays of
+            indices local to the tile, by tile key
+        """
+        indexes = np.asarray(_obstacles if isinstance(_obstacles, np.ndarray)
+                             else list(_obstacles),
+                             dtype=np.int64).reshape(-1, 2)
+        indexes = indexes[self.__inside(indexes)]
+        keys = indexes // self.tile_size
+        local = indexes % self.tile_size
+        groups = {}
+        if len(indexes) == 0:
+            return groups
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        for n, key in enumerate(unique):
+            groups[(int(key[0]), int(key[1]))] = local[inverse == n]
+        return groups
+
+    def __inside(self, indexes: np.ndarray) -> np.ndarray:
+        """ Tests which indices are inside the bounds of the map.
+
+        Args:
+            indexes (np.ndarray):
+                A **N x 2** array of indices **(i, j)**
+
+        Returns:
+            np.ndarray: A boolean mask of the indices inside the map
+        """
+        inside = np.ones(len(indexes), dtype=bool)
+        if self.columns is not None:
+            inside &= (indexes[:, 0] >= 0) & (indexes[:, 0] < self.columns)
+        if self.rows is not None:
+            inside &= (indexes[:, 1] >= 0) & (indexes[:, 1] < self.rows)
+        return inside
+
+    def __tile(self, key: Tuple[int, int], create: bool = False) -> Tile:
+        """ Gets the tile of **key** and marks it as recently used.
+            A spilled tile is reloaded from the disk.
+
+        Args:
+            key (Tuple[int, int]):
+                The key of the tile
+            create=False (bool):
+                Creates the tile if it does not exist
+
+        Returns:
+            Tile: The tile, None if it does not exist and
+            **create** is False
+        """
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        if key in self.spilled:
+            tile = Tile.__new__(Tile)
+            with np.load(self.__spill_path(key)) as data:
+                tile.static = data["static"]
+                tile.dynamic = data["dynamic"]
+                tile.terrain = data["terrain"]
+            os.remove(self.__spill_path(key))
+            self.spilled.discard(key)
+        elif create:
+            tile = Tile(self.tile_size)
+        else:
+            return None
+        self.tiles[key] = tile
+        return tile
+
+    def __evict(self) -> None:
+        """ Evicts the least recently used tiles farther than
+            **tile_keep_radius** tiles from every agent until there are
+            at most **max_tiles** tiles in memory. Evicted tiles are
+            spilled to the disk or dropped.
+        """
+        excess = len(self.tiles) - self.max_tiles
+        if excess <= 0:
+            return
+        radius = self.tile_keep_radius
+        victims = []
+        for key in self.tiles:
+            if len(victims) == excess:
+                break
+            if all(max(abs(key[0] - a[0]), abs(key[1] - a[1])) > radius
+                   for a in self.agents):
+                victims.append(key)
+
+        size = self.tile_size
+        for key in victims:
+            tile = self.tiles.pop(key)
+            if self.tile_spill_directory is not None:
+                np.savez(self.__spill_path(key), static=tile.static,
+                         dynamic=tile.dynamic, terrain=tile.terrain)
+                self.spilled.add(key)
+                continue
+            # A dropped tile is forgotten: its cases become free.
+            self.__dynamic_tiles.discard(key)
+            moved = np.argwhere(tile.occupancy() | (tile.terrain != 1.0))
+            self.__dropped.extend((int(key[0] * size + i),
+                                   int(key[1] * size + j))
+                                  for i, j in moved)
+
+    def __drain_dropped(self) -> List[Tuple[int, int]]:
+        """ Returns the vertices of the tiles dropped since the last
+            call, whose cost has changed.
+
+        Returns:
+            List[Tuple[int, int]]: Vertices whose cost has changed
+        """
+        dropped, self.__dropped = self.__dropped, []
+        return dropped
+
+    def __spill_path(self, key: Tuple[int, int]) -> str:
+        """ Gets the file where a tile is spilled.
+
+        Args:
+            key (Tuple[int, int]):
+                The key of the tile
+
+        Returns:
+            str: The path of the file
+        """
+        return os.path.join(self.tile_spill_directory,
+                            "tile_" + str(key[0]) + "_" + str(key[1])
+                            + ".npz")
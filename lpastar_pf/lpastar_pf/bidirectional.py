@@ -0,0 +1,90 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.pf_exceptions import PathDoesNotExistException
+from typing import Dict, List, Tuple
+from math import inf
+import heapq
+
+
+def bidirectional_search(_map: GMap,
+                         start: Tuple[int, int],
+                         goal: Tuple[int, int]
+                         ) -> Tuple[List[Tuple[int, int]],
+                                    Dict[Tuple[int, int], float],
+                                    int]:
+    """ Searches the shortest path from **start** to **goal** from both
+        ends at once. Both searches are guided by the same average
+        potential **p(v) = (h(v, goal) - h(v, start)) / 2**, added by
+        the forward search and subtracted by the backward search, so
+        the sum of their keys at a vertex is the cost of the best path
+        through it. The side with the lowest top key is expanded first.
+        **best** is the cost of the best path found through a vertex
+        reached from both sides. No path through unexpanded vertices
+        can be cheaper than the sum of the top keys, so the search
+        stops as soon as this sum reaches **best**.
+
+    Args:
+        _map (GMap):
+            The map
+        start (Tuple[int, int]):
+            The start vertex
+        goal (Tuple[int, int]):
+            The goal vertex
+
+    Raises:
+        PathDoesNotExistException: Raises if there is no path
+        from start to goal.
+
+    Returns:
+        Tuple[List, Dict, int]: The path from **start** to **goal**,
+        the costs from **start** of the vertices expanded by the
+        forward search and the number of expanded vertices
+    """
+    def potential(v: Tuple[int, int]) -> float:
+        return (_map.get_heurisitcs_cost(v, goal)
+                - _map.get_heurisitcs_cost(v, start)) / 2
+
+    signs = (1.0, -1.0)
+    costs = ({start: 0.0}, {goal: 0.0})
+    parents = ({}, {})
+    closed = ({}, {})
+    queues = ([(potential(start), start)], [(-potential(goal), goal)])
+    best, meeting = (0.0, start) if start == goal else (inf, None)
+    expansions = 0
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        _, v = heapq.heappop(queues[side])
+        if v in closed[side]:
+            continue
+        cost = costs[side][v]
+        closed[side][v] = cost
+        expansions += 1
+        for u in _map.get_neighbours(v):
+            if u in closed[side]:
+                continue
+            # Both searches run on the same non-oriented graph.
+            new_cost = cost + _map.get_transition_cost(v, u)
+            if new_cost < costs[side].get(u, inf):
+                costs[side][u] = new_cost
+                parents[side][u] = v
+                heapq.heappush(queues[side],
+                               (new_cost + signs[side] * potential(u), u))
+            through = costs[side].get(u, inf) + costs[1 - side].get(u, inf)
+            if through < best:
+                best, meeting = through, u
+
+    if meeting is None:
+        raise PathDoesNotExistException("Cannot go from "
+                                        + str(start)
+                                        + " to "
+                                        + str(goal))
+
+    path = [meeting]
+    while path[-1] != start:
+        path.append(parents[0][path[-1]])
+    path.reverse()
+    while path[-1] != goal:
+        path.append(parents[1][path[-1]])
+    return path, closed[0], expansions
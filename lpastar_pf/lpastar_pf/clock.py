@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+import time
+
+
+class AClock(ABC):
+
+    """ The time of **find_path**: its timeout, its period and its
+    minimal replanning period are measured with **now_ns** and it
+    pauses with **sleep**, so they behave the same in wall-clock and in
+    virtual time. The time spent computing is measured apart, with the
+    performance counter of the system.
+
+    Methods
+    -------
+
+    now_ns():
+        Gets the current time.
+    sleep(seconds):
+        Waits for some time.
+    """
+
+    @abstractmethod
+    def now_ns(self) -> int:
+        """ Gets the current time.
+
+        Returns:
+            int: The time in nanoseconds, from an arbitrary origin
+        """
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """ Waits for **seconds**.
+
+        Args:
+            seconds (float):
+                The duration, in seconds
+        """
+        pass
+
+
+class WallClock(AClock):
+
+    """ The time of the system, optionally accelerated: at **speed**
+    2, a second of the clock lasts half a wall-clock second, for the
+    timeout as for the sleeps.
+
+    Attributes
+    ----------
+    speed: float
+        The number of clock seconds per wall-clock second.
+    origin: int
+        The wall-clock time the clock was created, in nanoseconds.
+    """
+
+    def __init__(self, speed: float = 1.0) -> None:
+        """ Starts the clock at the current time.
+
+        Args:
+            speed=1.0 (float):
+                The number of clock seconds per wall-clock second
+        """
+        self.speed = speed
+        self.origin = time.time_ns()
+
+    def now_ns(self) -> int:
+        if self.speed == 1.0:
+            return time.time_ns()
+        return self.origin + int((time.time_ns() - self.origin)
+                                 * self.speed)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds / self.speed)
+
+
+class VirtualClock(AClock):
+
+    """ A stepped clock: its time only advances when it sleeps, at
+    once, so a loop paced by **sleep** runs as fast as it computes.
+    A sleep lasts at least **min_step**, so a loop with a null period
+    still sees time pass and reaches its timeout, as it would on a
+    wall clock. The listeners are called with the duration of each
+    sleep, a simulation advances its world there.
+
+    Attributes
+    ----------
+    time_ns: int
+        The current time, in nanoseconds.
+    min_step: float
+        The minimal duration of a sleep, in seconds.
+    listeners: List[Callable[[float], None]]
+        Called after each sleep with its duration in seconds.
+    """
+
+    def __init__(self, start_ns: int = 0, min_step: float = 0.001) -> None:
+        """ Starts the clock at **start_ns**.
+
+        Args:
+            start_ns=0 (int):
+                The initial time, in nanoseconds
+            min_step=0.001 (float):
+                The minimal duration of a sleep, in seconds
+
+        Raises:
+            ValueError: The minimal step is not positive
+        """
+        if min_step <= 0:
+            raise ValueError("The minimal step must be positive")
+        self.time_ns = start_ns
+        self.min_step = min_step
+        self.listeners = []
+
+    def now_ns(self) -> int:
+        return self.time_ns
+
+    def sleep(self, seconds: float) -> None:
+        seconds = max(seconds, self.min_step)
+        self.time_ns += int(round(seconds * 1e9))
+        for listener in self.listeners:
+            listener(seconds)
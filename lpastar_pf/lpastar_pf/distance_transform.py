@@ -0,0 +1,93 @@
+from typing import Tuple
+import numpy as np
+
+
+def distance_transform(obstacles: np.ndarray, cap: int) -> np.ndarray:
+    """ Computes the euclidean distance, in cases, from each case of the
+        grid to the nearest obstacle. The transform is separable: the
+        distance to the nearest obstacle of the same column is computed
+        first, then the squared distances are combined along the rows.
+        Both passes are vectorized over the whole grid and each one
+        costs **O(cap)** array operations, so the distances are exact
+        up to **cap** and infinite beyond.
+
+    Args:
+        obstacles (np.ndarray):
+            A boolean grid of obstacles
+        cap (int):
+            The maximal distance computed, in cases
+
+    Returns:
+        np.ndarray: A float grid of distances to the nearest obstacle
+    """
+    columns, rows = obstacles.shape
+    # An empty grid, as a new map, is infinitely far from any obstacle.
+    if not obstacles.any():
+        return np.full((columns, rows), np.inf)
+    column_distance = np.where(obstacles, 0.0, np.inf)
+    for k in range(1, cap + 1):
+        if k >= rows:
+            break
+        column_distance[:, k:] = np.minimum(
+            column_distance[:, k:],
+            np.where(obstacles[:, :rows - k], float(k), np.inf))
+        column_distance[:, :rows - k] = np.minimum(
+            column_distance[:, :rows - k],
+            np.where(obstacles[:, k:], float(k), np.inf))
+
+    squared = column_distance ** 2
+    distance = squared.copy()
+    for k in range(1, cap + 1):
+        if k >= columns:
+            break
+        distance[k:, :] = np.minimum(distance[k:, :],
+                                     squared[:columns - k, :] + k ** 2)
+        distance[:columns - k, :] = np.minimum(distance[:columns - k, :],
+                                               squared[k:, :] + k ** 2)
+
+    distance = np.sqrt(distance)
+    distance[distance > cap] = np.inf
+    return distance
+
+
+def update_distance_transform(distance: np.ndarray,
+                              obstacles: np.ndarray,
+                              changed: np.ndarray,
+                              cap: int) -> Tuple[slice, slice]:
+    """ Updates **distance** in place after the obstacles have changed
+        in the **changed** cases. Only the bounding box of the changes
+        grown by **cap** can see a different distance, it is recomputed
+        from the obstacles of this box grown by **cap** once more.
+
+    Args:
+        distance (np.ndarray):
+            A float grid of distances returned by **distance_transform**
+        obstacles (np.ndarray):
+            The new boolean grid of obstacles
+        changed (np.ndarray):
+            Indices **(i, j)** of the cases which have changed
+        cap (int):
+            The maximal distance computed, in cases
+
+    Returns:
+        Tuple[slice, slice]: The region of the grid which has been updated
+    """
+    columns, rows = obstacles.shape
+    if len(changed) == 0:
+        return slice(0, 0), slice(0, 0)
+
+    i_min, j_min = changed.min(axis=0)
+    i_max, j_max = changed.max(axis=0)
+    region = (slice(max(0, i_min - cap), min(columns, i_max + cap + 1)),
+              slice(max(0, j_min - cap), min(rows, j_max + cap + 1)))
+    window = (slice(max(0, i_min - 2 * cap),
+                    min(columns, i_max + 2 * cap + 1)),
+              slice(max(0, j_min - 2 * cap),
+                    min(rows, j_max + 2 * cap + 1)))
+
+    local = distance_transform(obstacles[window], cap)
+    distance[region] = local[region[0].start - window[0].start:
+                             region[0].stop - window[0].start,
+                             region[1].start - window[1].start:
+                             region[1].stop - window[1].start]
+    return region
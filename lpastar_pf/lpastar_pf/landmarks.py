@@ -0,0 +1,246 @@
+from lpastar_pf.GMap import GMap
+from typing import Iterable, Tuple
+from math import sqrt
+import numpy as np
+
+
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def cost_field(_map: GMap, source: Tuple[int, int]) -> np.ndarray:
+    """ Computes the cost of the shortest path from **source** to every
+        vertex of the map, with the transition costs of
+        **GMap.get_transition_cost**. The grid is relaxed with array
+        operations until nothing changes: each pass sweeps every row
+        and every column in both directions at once, a sweep being a
+        running minimum over the cumulated edge costs, then relaxes the
+        diagonal edges by one step. The number of passes follows the
+        number of turns of the paths, not their length.
+
+        Infinite edge costs, as with an infinite
+        **obstacle_case_value**, are relaxed as a finite sentinel
+        higher than any path of finite edges: infinities would make
+        the sweeps compute **inf - inf**. The vertices whose cost
+        reaches the sentinel are unreachable and get an infinite cost.
+
+    Args:
+        _map (GMap):
+            The map
+        source (Tuple[int, int]):
+            The source vertex
+
+    Returns:
+        np.ndarray: A **columns x rows** grid of path costs
+    """
+    occupancy = _map.occupancy
+    costs = _map.cell_costs
+    obstacle = float(_map.obstacle_case_value)
+    weights = []
+
+    def edges(a: Tuple[slice, slice], b: Tuple[slice, slice],
+              length: float) -> np.ndarray:
+        cost = (costs[a] + costs[b]) / 2 * length
+        cost[occupancy[a] | occupancy[b]] = obstacle
+        weights.append(cost)
+        return cost
+
+    straight = []
+    for axis in (0, 1):
+        first = [slice(None), slice(None)]
+        second = [slice(None), slice(None)]
+        first[axis] = slice(None, -1)
+        second[axis] = slice(1, None)
+        straight.append((tuple(second),
+                         edges(tuple(first), tuple(second), 1.0)))
+
+    diagonals = []
+    for di, dj in DIAGONALS:
+        a = (slice(max(0, -di), costs.shape[0] - max(0, di)),
+             slice(max(0, -dj), costs.shape[1] - max(0, dj)))
+        b = (slice(max(0, di), costs.shape[0] - max(0, -di)),
+             slice(max(0, dj), costs.shape[1] - max(0, -dj)))
+        diagonals.append((a, b, edges(a, b, sqrt(2))))
+
+    sentinel = sum(float(cost[np.isfinite(cost)].sum())
+                   for cost in weights) + 1.0
+    for cost in weights:
+        cost[~np.isfinite(cost)] = sentinel
+
+    # Cumulated costs of the edges along the columns and the rows.
+    along = []
+    for axis, (second, cost) in enumerate(straight):
+        cumulated = np.zeros(costs.shape)
+        np.cumsum(cost, axis=axis, out=cumulated[second])
+        along.append(cumulated)
+
+    field = np.full(costs.shape, np.inf)
+    field[source] = 0.0
+    while True:
+        previous = field.copy()
+        for axis, cumulated in enumerate(along):
+            field = np.minimum(field, cumulated + np.minimum.accumulate(
+                field - cumulated, axis=axis))
+            field = np.minimum(field, np.flip(np.minimum.accumulate(
+                np.flip(field + cumulated, axis=axis), axis=axis),
+                axis=axis) - cumulated)
+        for a, b, cost in diagonals:
+            np.minimum(field[b], field[a] + cost, out=field[b])
+        if np.array_equal(field, previous):
+            field[field >= sentinel] = np.inf
+            return field
+
+
+class Landmarks:
+
+    """ ALT heuristics: the cost of the shortest path between two
+    vertices is at least the difference of their costs from any
+    landmark, by the triangle inequality. The cost fields of a few
+    landmarks spread over the map are precomputed and stored in single
+    precision, then the bound of a vertex costs one array operation.
+    Bounds are lowered by the rounding error of the fields so they
+    stay admissible. Unreachable vertices are stored with a finite cost
+    higher than twice any reachable one, so differences never compute
+    **inf - inf**, and a bound above every reachable cost is infinite.
+
+    The fields stay admissible while costs only increase, they are
+    marked stale when a cost decreases and recomputed by **refresh**
+    before the next search.
+
+    Attributes
+    ----------
+    map: GMap
+        The map.
+    count: int
+        The number of landmarks.
+    vertices: List[Tuple[int, int]]
+        The landmarks.
+    fields: np.ndarray
+        A **count x columns x rows** array of path costs
+        from the landmarks.
+    stale: bool
+        True if the fields must be recomputed.
+    goal: Tuple[int, int]
+        The goal vertex of the bounds.
+
+    Methods
+    -------
+
+    refresh():
+        Selects the landmarks and computes their fields if stale.
+    set_goal(goal):
+        Sets the goal vertex of the bounds.
+    bound(vertex):
+        Gets the lower bound of the cost from a vertex to the goal.
+    invalidate(changed):
+        Marks the fields stale if the cost of a vertex has decreased.
+    """
+
+    def __init__(self, _map: GMap, count: int) -> None:
+        """ Initializes stale landmarks, the fields are computed
+            by the first **refresh**.
+
+        Args:
+            _map (GMap):
+                The map.
+            count (int):
+                The number of landmarks.
+        """
+        self.map = _map
+        self.count = count
+        self.vertices = []
+        self.fields = None
+        self.stale = True
+        self.goal = None
+        self.__costs = None
+        self.__to_goal = None
+        self.__slack = 0.0
+        self.__reachable = np.inf
+
+    def refresh(self) -> None:
+        """ Selects the landmarks and computes their fields if they are
+            stale. The landmarks are chosen farthest first: each one is
+            the free vertex whose cost from the previous ones is the
+            highest, the first one being the farthest from the center.
+        """
+        if not self.stale:
+            return
+        columns, rows = self.map.cell_costs.shape
+        farthest = cost_field(self.map, (columns // 2, rows // 2))
+        self.vertices = []
+        fields = []
+        for _ in range(self.count):
+            candidates = np.where(self.map.occupancy
+                                  | ~np.isfinite(farthest), -np.inf,
+                                  farthest)
+            vertex = np.unravel_index(np.argmax(candidates),
+                                      candidates.shape)
+            vertex = (int(vertex[0]), int(vertex[1]))
+            field = cost_field(self.map, vertex)
+            self.vertices.append(vertex)
+            fields.append(field)
+            farthest = field if len(fields) == 1 \
+                else np.minimum(farthest, field)
+
+        fields = np.stack(fields)
+        finite = np.isfinite(fields)
+        highest = float(fields[finite].max()) if finite.any() else 0.0
+        unreachable = 2 * highest + 1
+        self.fields = np.where(finite, fields, unreachable) \
+            .astype(np.float32)
+        self.__slack = 2 * float(np.spacing(np.float32(unreachable)))
+        # Reachable differences are at most **highest**, the others
+        # at least **unreachable - highest**.
+        self.__reachable = 1.5 * highest + 0.5
+        self.__costs = self.map.cell_costs.copy()
+        self.stale = False
+        if self.goal is not None:
+            self.set_goal(self.goal)
+
+    def set_goal(self, goal: Tuple[int, int]) -> None:
+        """ Sets the goal vertex of the bounds.
+
+        Args:
+            goal (Tuple[int, int]):
+                The goal vertex.
+        """
+        self.goal = goal
+        if self.fields is not None:
+            self.__to_goal = self.fields[:, goal[0], goal[1]].copy()
+
+    def bound(self, vertex: Tuple[int, int]) -> float:
+        """ Gets the lower bound of the cost from **vertex** to the goal:
+            the highest difference of their costs from a landmark.
+
+        Args:
+            vertex (Tuple[int, int]):
+                The vertex.
+
+        Returns:
+            float: The lower bound
+        """
+        gap = float(np.abs(self.__to_goal
+                           - self.fields[:, vertex[0], vertex[1]]).max())
+        if gap > self.__reachable:
+            # One of the vertices is reachable from a landmark and not
+            # the other one: there is no path between them.
+            return np.inf
+        return max(gap - self.__slack, 0.0)
+
+    def invalidate(self, changed: Iterable[Tuple[int, int]]) -> bool:
+        """ Marks the fields stale if the cost of a changed vertex is
+            lower than when they have been computed.
+
+        Args:
+            changed (Iterable[Tuple[int, int]]):
+                Vertices whose cost has changed.
+
+        Returns:
+            bool: True if the fields are stale
+        """
+        if self.stale:
+            return True
+        indexes = np.asarray(list(changed), dtype=np.int64).reshape(-1, 2)
+        i, j = indexes[:, 0], indexes[:, 1]
+        if (self.map.cell_costs[i, j] < self.__costs[i, j]).any():
+            self.stale = True
+        return self.stale
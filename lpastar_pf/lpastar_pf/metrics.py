@@ -0,0 +1,219 @@
+from typing import Any, Callable, Dict, List
+import json
+
+
+class PlannerStats:
+
+    """ Counters and timers of one planning call. A call is a period
+    of **find_path** (scan, update, search, extraction) or a direct
+    call of **compute_shortest_path**.
+
+    Attributes
+    ----------
+    expansions: int
+        Number of vertices popped from the priority queue.
+    vertex_updates: int
+        Number of **__update_vertex** calls.
+    queue_inserts: int
+        Number of insertions in the priority queue.
+    queue_pops: int
+        Number of pops from the priority queue.
+    queue_removes: int
+        Number of removals from the priority queue.
+    changed_vertices: int
+        Number of vertices whose cost has changed.
+    sent_waypoints: int
+        Number of waypoints sent to the agent.
+    deferred_vertices: int
+        Number of changed vertices whose update is deferred.
+    scan_ns: int
+        Time spent to scan and update the map, in nanoseconds.
+    plan_ns: int
+        Time spent in the LPA* search, in nanoseconds.
+    extraction_ns: int
+        Time spent to extract the path, in nanoseconds.
+
+    Methods
+    -------
+
+    as_dict():
+        Returns the counters and timers as a dictionary.
+    add(other):
+        Adds the counters and timers of **other**.
+    """
+
+    __slots__ = ("expansions", "vertex_updates", "queue_inserts",
+                 "queue_pops", "queue_removes", "changed_vertices",
+                 "sent_waypoints", "deferred_vertices", "scan_ns",
+                 "plan_ns", "extraction_ns")
+
+    def __init__(self) -> None:
+        """ Initializes all counters and timers to zero.
+        """
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> Dict[str, int]:
+        """ Returns the counters and timers as a dictionary.
+
+        Returns:
+            Dict[str, int]: Counter or timer name to its value
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def add(self, other: "PlannerStats") -> None:
+        """ Adds the counters and timers of **other** to these ones.
+
+        Args:
+            other (PlannerStats):
+                Stats to accumulate
+        """
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class PlannerMetrics:
+
+    """ Cumulative metrics of a planner. The planner only records
+    metrics when an instance is attached to it with
+    **LPAStarPathFinder.enable_metrics**, otherwise instrumentation
+    points are skipped with a single test.
+
+    Attributes
+    ----------
+    calls: int
+        Number of finished planning calls.
+    totals: PlannerStats
+        Counters and timers accumulated over all calls.
+    last: PlannerStats
+        Counters and timers of the last finished call.
+    hooks: Dict[str, List[Callable]]
+        Callbacks by event. **"expand"** callbacks receive the
+        expanded vertex, **"update"** callbacks receive the updated
+        vertex and **"call"** callbacks receive the PlannerStats of
+        the finished call.
+
+    Methods
+    -------
+
+    add_hook(event, callback):
+        Registers a callback for an event.
+    start():
+        Starts a new planning call.
+    finish(stats):
+        Accumulates the stats of a finished call.
+    to_prometheus(prefix):
+        Exports the cumulative metrics in Prometheus text format.
+    to_json():
+        Exports the metrics in JSON.
+    """
+
+    EVENTS = ("expand", "update", "call")
+
+    def __init__(self) -> None:
+        """ Initializes empty metrics without hooks.
+        """
+        self.calls = 0
+        self.totals = PlannerStats()
+        self.last = None
+        self.hooks = {event: [] for event in self.EVENTS}
+
+    def add_hook(self, event: str, callback: Callable[[Any], None]) -> None:
+        """ Registers a callback for an event. Hooks run inside the
+            search loop, they must be fast.
+
+        Args:
+            event (str):
+                One of **"expand"**, **"update"** or **"call"**
+            callback (Callable[[Any], None]):
+                A function to call with the vertex or the stats
+
+        Raises:
+            ValueError: Occurs when the event is unknown
+        """
+        if event not in self.hooks:
+            raise ValueError("Unknown metrics event: " + event)
+        self.hooks[event].append(callback)
+
+    def start(self) -> PlannerStats:
+        """ Starts a new planning call.
+
+        Returns:
+            PlannerStats: The stats to fill during the call
+        """
+        return PlannerStats()
+
+    def finish(self, stats: PlannerStats) -> None:
+        """ Accumulates the stats of a finished call and runs
+            the **"call"** hooks.
+
+        Args:
+            stats (PlannerStats):
+                The stats of the finished call
+        """
+        self.calls += 1
+        self.totals.add(stats)
+        self.last = stats
+        for callback in self.hooks["call"]:
+            callback(stats)
+
+    def to_prometheus(self, prefix: str = "lpastar_pf") -> str:
+        """ Exports the cumulative metrics in the Prometheus text
+            exposition format.
+
+        Args:
+            prefix="lpastar_pf" (str):
+                A prefix of the metric names
+
+        Returns:
+            str: The metrics, one sample per line
+        """
+        totals = self.totals
+        lines = []
+
+        def counter(name: str,
+                    description: str,
+                    samples: List[Any]) -> None:
+            lines.append("# HELP " + prefix + "_" + name + " "
+                         + description)
+            lines.append("# TYPE " + prefix + "_" + name + " counter")
+            for labels, value in samples:
+                lines.append(prefix + "_" + name + labels + " "
+                             + str(value))
+
+        counter("calls_total", "Number of planning calls.",
+                [("", self.calls)])
+        counter("expansions_total", "Number of expanded vertices.",
+                [("", totals.expansions)])
+        counter("vertex_updates_total", "Number of vertex updates.",
+                [("", totals.vertex_updates)])
+        counter("changed_vertices_total",
+                "Number of vertices whose cost has changed.",
+                [("", totals.changed_vertices)])
+        counter("sent_waypoints_total",
+                "Number of waypoints sent to the agent.",
+                [("", totals.sent_waypoints)])
+        counter("deferred_vertices_total",
+                "Number of changed vertices whose update is deferred.",
+                [("", totals.deferred_vertices)])
+        counter("queue_operations_total", "Number of queue operations.",
+                [('{operation="insert"}', totals.queue_inserts),
+                 ('{operation="pop"}', totals.queue_pops),
+                 ('{operation="remove"}', totals.queue_removes)])
+        counter("phase_seconds_total", "Time spent by phase.",
+                [('{phase="scan"}', totals.scan_ns / 1e9),
+                 ('{phase="plan"}', totals.plan_ns / 1e9),
+                 ('{phase="extraction"}', totals.extraction_ns / 1e9)])
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        """ Exports the metrics in JSON.
+
+        Returns:
+            str: A JSON object with **calls**, **totals** and **last**
+        """
+        return json.dumps({
+            "calls": self.calls,
+            "totals": self.totals.as_dict(),
+            "last": None if self.last is None else self.last.as_dict()
+        })
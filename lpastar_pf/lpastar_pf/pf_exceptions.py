@@ -21,3 +21,8 @@ class PathDoesNotExistException(RuntimeError):
 class TimeoutException(RuntimeError):
     def __init__(self, arg):
         self.args = arg
+
+
+class ReplayException(RuntimeError):
+    def __init__(self, arg):
+        self.args = arg
@@ -0,0 +1,420 @@
+""" Profiles LPAStarPathFinder with a sampling profiler, on a recorded
+session or on a synthetic scenario, without modifying the planner.
+The time is attributed to the phases of a period and the stacks are
+written in the collapsed format of flamegraph.pl, which speedscope
+and most flamegraph tools also read.
+
+Usage:
+    PYTHONPATH=. python -m lpastar_pf.profiling [--session PATH]
+        [--size N] [--steps N] [--seed S] [--interval MS]
+        [--output PATH]
+"""
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+from lpastar_pf.clock import VirtualClock
+from lpastar_pf.pf_exceptions import TimeoutException
+from typing import Dict, Iterable, List, Tuple
+import argparse
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+# Frames are attributed to the phase of the innermost frame which
+# matches a (module, function) pair, "*" matches any name.
+PHASES = (
+    ("scan", (("GMap", "convert_obstacles_to_graph"),
+              ("BeliefGrid", "*"), ("*", "scan"), ("*", "scan_rays"))),
+    ("diff", (("GMap", "set_obstacles"), ("GMap", "set_dynamic_layer"),
+              ("GMap", "set_static_obstacles"), ("GMap", "rasterize"),
+              ("GMap", "__update_layers"), ("GMap", "__update_costs"),
+              ("distance_transform", "*"))),
+    ("update_vertex", (("LPAStarPathFinder", "__update_vertex"),
+                       ("LPAStarPathFinder", "__compute_rhs"),
+                       ("LPAStarPathFinder", "update_vertices"))),
+    ("queue", (("PriorityQueue", "*"), ("CompactQueue", "*"),
+               ("LazyQueue", "*"))),
+    ("heuristics", (("GMap", "get_heurisitcs_cost"),
+                    ("LPAStarPathFinder", "__calculate_key"),
+                    ("landmarks", "*"))),
+    ("search", (("LPAStarPathFinder", "compute_shortest_path"),
+                ("LPAStarPathFinder", "__search"),
+                ("LPAStarPathFinder", "__search_bidirectional"),
+                ("bidirectional", "*"))),
+    ("extraction", (("LPAStarPathFinder", "__extract_path"),
+                    ("LPAStarPathFinder", "__walk_parents"),
+                    ("LPAStarPathFinder", "__shrink_path"),
+                    ("LPAStarPathFinder", "__follow"),
+                    ("LPAStarPathFinder", "__mark_path"))),
+)
+
+Frame = Tuple[str, str]
+
+
+def phase_of(stack: Iterable[Frame]) -> str:
+    """ Gets the phase of a sampled stack.
+
+    Args:
+        stack (Iterable[Tuple[str, str]]):
+            The **(module, function)** frames, from the outermost to
+            the innermost
+
+    Returns:
+        str: The phase of the innermost frame which belongs to one,
+        **"other"** if none does
+    """
+    for module, function in reversed(list(stack)):
+        for phase, frames in PHASES:
+            for pattern in ((module, function), (module, "*"),
+                            ("*", function)):
+                if pattern in frames:
+                    return phase
+    return "other"
+
+
+class SamplingProfiler:
+
+    """ A statistical profiler which samples the stack of the thread
+    which starts it from a background thread, every **interval**
+    seconds. The planner runs unmodified and at almost full speed, as
+    the cost of a sample does not depend on the work being profiled.
+    Only the frames below the caller of **start** are kept.
+
+    Attributes
+    ----------
+    interval: float
+        The sampling interval, in seconds.
+    stacks: Dict[Tuple[Tuple[str, str], ...], int]
+        The number of samples of each stack of **(module, function)**
+        frames, from the outermost to the innermost.
+    elapsed: float
+        The profiled wall-clock time, in seconds.
+
+    Methods
+    -------
+
+    start():
+        Starts sampling the calling thread.
+    stop():
+        Stops sampling.
+    phases():
+        Gets the number of samples of each phase.
+    summary():
+        Gets the share and the estimated time of each phase.
+    write_collapsed(path):
+        Writes the stacks for flamegraph tools.
+    __run():
+        Samples until stopped, in the background thread.
+    __sample(frame):
+        Records the stack of a frame.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """ Initializes an empty profile.
+
+        Args:
+            interval=0.001 (float):
+                The sampling interval, in seconds
+        """
+        self.interval = interval
+        self.stacks = {}
+        self.elapsed = 0.0
+        self.__thread = None
+        self.__target = None
+        self.__root = None
+        self.__stopped = threading.Event()
+        self.__switch = None
+        self.__begin = None
+
+    def start(self) -> None:
+        """ Starts sampling the calling thread. The interpreter switches
+            threads more often while sampling, so the samples are taken
+            on time.
+        """
+        self.__target = threading.get_ident()
+        self.__root = sys._getframe(1)
+        self.__stopped.clear()
+        self.__switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.__switch, self.interval / 4))
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__begin = time.perf_counter()
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """ Stops sampling and restores the switch interval.
+        """
+        self.__stopped.set()
+        self.__thread.join()
+        self.elapsed += time.perf_counter() - self.__begin
+        sys.setswitchinterval(self.__switch)
+        self.__root = None
+
+    def phases(self) -> Dict[str, int]:
+        """ Gets the number of samples of each phase.
+
+        Returns:
+            Dict[str, int]: The samples by phase, **"other"** included
+        """
+        phases = {phase: 0 for phase, _ in PHASES}
+        phases["other"] = 0
+        for stack, count in self.stacks.items():
+            phases[phase_of(stack)] += count
+        return phases
+
+    def summary(self) -> List[Tuple[str, int, float, float]]:
+        """ Gets the share and the estimated time of each phase, from
+            the most to the least sampled.
+
+        Returns:
+            List[Tuple[str, int, float, float]]: The phase, its
+            samples, its share of the samples and its estimated time
+            in seconds
+        """
+        phases = self.phases()
+        total = max(sum(phases.values()), 1)
+        return sorted(((phase, count, count / total,
+                        self.elapsed * count / total)
+                       for phase, count in phases.items()),
+                      key=lambda row: -row[1])
+
+    def write_collapsed(self, path: str) -> None:
+        """ Writes one line per stack, its frames separated by
+            semicolons and followed by its number of samples.
+
+        Args:
+            path (str):
+                The path of the output file
+        """
+        with open(path, "w") as stream:
+            for stack, count in sorted(self.stacks.items()):
+                stream.write(";".join(module + ":" + function
+                                      for module, function in stack)
+                             + " %d\n" % count)
+
+    def __run(self) -> None:
+        """ Samples the target thread until stopped.
+        """
+        while not self.__stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.__target)
+            if frame is not None:
+                self.__sample(frame)
+
+    def __sample(self, frame) -> None:
+        """ Records the stack of **frame** up to the caller of
+            **start**, excluded, unless it is empty or in the profiler.
+
+        Args:
+            frame (FrameType):
+                The innermost frame of the target thread
+        """
+        stack = []
+        code = None
+        while frame is not None and frame is not self.__root:
+            code = frame.f_code
+            stack.append((os.path.splitext(
+                os.path.basename(code.co_filename))[0], code.co_name))
+            frame = frame.f_back
+        # The profiler itself is not profiled.
+        if frame is None or not stack or \
+                code in (SamplingProfiler.start.__code__,
+                         SamplingProfiler.stop.__code__):
+            return
+        stack = tuple(reversed(stack))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+
+class SyntheticAgent(GAgent):
+
+    """ An agent which moves by **speed** toward its next waypoint each
+    time the sensor scans, without worker process.
+
+    Attributes
+    ----------
+    position: Tuple[float, float, float]
+        The position of the agent.
+    speed: float
+        The distance covered between two scans.
+    trajectory: List[Tuple[float, float]]
+        The followed waypoints.
+    index: int
+        The index of the next waypoint.
+    """
+
+    def __init__(self, position: Tuple[float, float, float],
+                 speed: float) -> None:
+        super().__init__()
+        self.position = position
+        self.speed = speed
+        self.trajectory = []
+        self.index = 0
+
+    def follow_trajectory(self, points: Iterable[Tuple[float, float]]) -> None:
+        self.trajectory = list(points)
+        self.index = 0
+
+    def update_trajectory(self,
+                          points: Iterable[Tuple[float, float]],
+                          start: int) -> None:
+        self.trajectory = list(points)
+        self.index = min(self.index, start)
+
+    def stop_trajectory(self) -> None:
+        self.trajectory = []
+
+    def get_position(self) -> Tuple[float, float, float]:
+        return self.position
+
+    def advance(self) -> None:
+        """ Moves toward the next waypoint.
+        """
+        x, y, alpha = self.position
+        budget = self.speed
+        while budget > 0 and self.index < len(self.trajectory):
+            tx, ty = self.trajectory[self.index]
+            distance = np.hypot(tx - x, ty - y)
+            if distance <= budget:
+                x, y = tx, ty
+                budget -= distance
+                self.index += 1
+            else:
+                alpha = float(np.arctan2(ty - y, tx - x))
+                x += (tx - x) * budget / distance
+                y += (ty - y) * budget / distance
+                budget = 0
+        self.position = (x, y, alpha)
+
+
+class SyntheticSensor(ASensor):
+
+    """ A sensor which sees square obstacles bouncing in the world,
+    within **sensor_range** of the agent. It moves the agent and the
+    obstacles at each scan, as a period of a real robot would.
+
+    Attributes
+    ----------
+    agent: SyntheticAgent
+        The agent to move.
+    obstacles: np.ndarray
+        The obstacles in **[x, y, w, vx, vy]** format.
+    size: Tuple[float, float]
+        The width and the height of the world.
+    sensor_range: float
+        The distance up to which obstacles are seen.
+    """
+
+    def __init__(self, agent: SyntheticAgent, obstacles: np.ndarray,
+                 size: Tuple[float, float], sensor_range: float) -> None:
+        self.agent = agent
+        self.obstacles = obstacles
+        self.size = size
+        self.sensor_range = sensor_range
+
+    def scan(self, origin: Tuple[float, float, float]) -> \
+            List[Tuple[float, float, float]]:
+        self.agent.advance()
+        positions = self.obstacles[:, :2] + self.obstacles[:, 3:]
+        bounced = (positions < 0) | (positions > self.size)
+        self.obstacles[:, 3:][bounced] *= -1
+        self.obstacles[:, :2] = np.clip(positions, 0, self.size)
+        x, y, _ = self.agent.get_position()
+        seen = np.hypot(self.obstacles[:, 0] - x,
+                        self.obstacles[:, 1] - y) <= self.sensor_range
+        return [tuple(obstacle) for obstacle in self.obstacles[seen, :3]]
+
+
+def synthetic_scenario(size: int, seed: int, steps: int = 3000
+                       ) -> Tuple[LPAStarPathFinder, Tuple[float, float]]:
+    """ Builds a synthetic mission across a **size x size * 2 / 3**
+        cases world, with walls which leave a gap at alternate ends
+        and obstacles bouncing around. The path finder runs in
+        virtual time, with a period of 100 ms.
+
+    Args:
+        size (int):
+            The number of columns of the world
+        seed (int):
+            The seed of the obstacles
+        steps=3000 (int):
+            The number of periods after which the mission times out
+
+    Returns:
+        Tuple[LPAStarPathFinder, Tuple[float, float]]: The path
+        finder, and the goal to give to its **find_path**
+    """
+    resolution = 10
+    columns, rows = size, max(size * 2 // 3, 3)
+    width, height = columns * resolution, rows * resolution
+    params = {
+        "width": width,
+        "height": height,
+        "resolution": resolution,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "period": 100,
+        "timeout": steps / 10
+    }
+    rng = np.random.default_rng(seed)
+    count = max(columns * rows // 400, 1)
+    obstacles = np.column_stack((
+        rng.uniform(0, width, count), rng.uniform(0, height, count),
+        np.full(count, 2.0 * resolution),
+        rng.uniform(-resolution / 4, resolution / 4, (count, 2))))
+    agent = SyntheticAgent((resolution / 2, resolution / 2, 0.0),
+                           resolution)
+    sensor = SyntheticSensor(agent, obstacles, (width, height),
+                             15 * resolution)
+    path_finder = LPAStarPathFinder(agent, sensor, params,
+                                    clock=VirtualClock())
+    walls = []
+    for k, i in enumerate(range(columns // 4, columns, columns // 4 or 1)):
+        gap = range(rows - 4, rows) if k % 2 == 0 else range(4)
+        walls += [(i, j) for j in range(rows) if j not in gap]
+    path_finder.map.set_static_obstacles(walls)
+    return path_finder, (width - resolution / 2, height - resolution / 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--session", default=None,
+                        help="a recorded session to replay")
+    parser.add_argument("--size", type=int, default=60,
+                        help="columns of the synthetic world")
+    parser.add_argument("--steps", type=int, default=3000,
+                        help="periods of the synthetic mission at most")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="sampling interval, in milliseconds")
+    parser.add_argument("--output", default="profile.folded",
+                        help="collapsed stacks for flamegraph tools")
+    args = parser.parse_args()
+
+    profiler = SamplingProfiler(args.interval / 1000)
+    if args.session is not None:
+        from lpastar_pf.replay import replay_session
+        profiler.start()
+        replay_session(args.session)
+        profiler.stop()
+    else:
+        path_finder, goal = synthetic_scenario(args.size, args.seed,
+                                               args.steps)
+        profiler.start()
+        try:
+            path_finder.find_path(goal)
+        except TimeoutException:
+            pass
+        profiler.stop()
+
+    profiler.write_collapsed(args.output)
+    print("%-14s %8s %7s %9s" % ("phase", "samples", "share", "time (s)"))
+    for phase, count, share, seconds in profiler.summary():
+        print("%-14s %8d %6.1f%% %9.3f" % (phase, count, 100 * share,
+                                           seconds))
+    print("%d samples in %.3f s, stacks written to %s"
+          % (sum(profiler.stacks.values()), profiler.elapsed, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+from lpastar_pf.ARaySensor import ARaySensor
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+from lpastar_pf.clock import VirtualClock
+from lpastar_pf.pf_exceptions import ReplayException
+from typing import Any, Dict, Iterable, List, Tuple
+import gzip
+import json
+import time
+import numpy as np
+
+
+class SessionRecorder:
+
+    """ Records a path finding session to a compact log file: a gzip
+    compressed file with one JSON event per line. The first event holds
+    the parameters and the static obstacles of the path finder, then
+    every goal, scan, agent position and trajectory is recorded in the
+    order of the calls.
+
+    Attributes
+    ----------
+    stream: gzip.GzipFile
+        The log file.
+    path_finder: LPAStarPathFinder
+        The recorded path finder.
+    begin: int
+        Time of the beginning of the record, in nanoseconds.
+
+    Methods
+    -------
+
+    attach(path_finder, params):
+        Starts recording the agent and the sensor of a path finder.
+    find_path(goal):
+        Records the goal, runs find_path of the path finder and flushes
+        the log file.
+    write(event):
+        Writes an event to the log file.
+    close():
+        Closes the log file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """ Opens the log file.
+
+        Args:
+            path (str):
+                The path of the log file.
+        """
+        self.stream = gzip.open(path, "wt")
+        self.path_finder = None
+        self.begin = time.time_ns()
+
+    def attach(self,
+               path_finder: LPAStarPathFinder,
+               params: Dict[str, Any]) -> None:
+        """ Replaces the agent and the sensor of **path_finder** with
+            recording proxies and records the session header.
+
+        Args:
+            path_finder (LPAStarPathFinder):
+                The path finder to record.
+            params (Dict[str, Any]):
+                The parameters the path finder has been created with.
+        """
+        self.path_finder = path_finder
+        path_finder.agent = RecordingAgent(path_finder.agent, self)
+        path_finder.sensor = RecordingSensor(path_finder.sensor, self)
+        self.write({
+            "type": "session",
+            "params": params,
+            "static": np.argwhere(path_finder.map.static_layer).tolist()
+        })
+
+    def find_path(self, goal: Tuple[float, float]) -> None:
+        """ Records the goal and runs **find_path** of the recorded
+            path finder. The log file is flushed afterwards, even if
+            the path finding fails, so that the goals recorded so far
+            can be read back when the session is not closed.
+
+        Args:
+            goal (Tuple[float, float]):
+                The goal of the path finding.
+        """
+        self.write({"type": "goal", "goal": list(goal)})
+        try:
+            self.path_finder.find_path(goal)
+        finally:
+            self.stream.flush()
+
+    def write(self, event: Dict[str, Any]) -> None:
+        """ Writes an event to the log file with its time.
+
+        Args:
+            event (Dict[str, Any]):
+                The event to write.
+        """
+        event["t"] = time.time_ns() - self.begin
+        self.stream.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        """ Flushes and closes the log file.
+        """
+        self.stream.close()
+
+
+class RecordingSensor(ARaySensor):
+
+    """ A sensor proxy which records every scan of the sensor it wraps.
+    The rays are recorded too when the wrapped sensor is an
+    ARaySensor.
+
+    Attributes
+    ----------
+    sensor: ASensor
+        The recorded sensor.
+    recorder: SessionRecorder
+        The recorder to write to.
+    """
+
+    def __init__(self, sensor: ASensor, recorder: SessionRecorder) -> None:
+        self.sensor = sensor
+        self.recorder = recorder
+
+    def scan(self, origin: Tuple[float, float, float]) -> \
+            Iterable[Tuple[float, float, float]]:
+        obstacles = [list(obstacle) for obstacle in self.sensor.scan(origin)]
+        self.recorder.write({"type": "scan",
+                             "origin": list(origin),
+                             "obstacles": obstacles})
+        return [tuple(obstacle) for obstacle in obstacles]
+
+    def scan_rays(self, origin: Tuple[float, float, float]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        endpoints, hits = self.sensor.scan_rays(origin)
+        endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2)
+        hits = np.asarray(hits, dtype=bool).reshape(-1)
+        self.recorder.write({"type": "rays",
+                             "origin": list(origin),
+                             "endpoints": endpoints.tolist(),
+                             "hits": hits.tolist()})
+        return endpoints, hits
+
+
+class RecordingAgent(GAgent):
+
+    """ An agent proxy which records every position and trajectory of
+    the agent it wraps. Movements are delegated to the wrapped agent.
+
+    Attributes
+    ----------
+    agent: GAgent
+        The recorded agent.
+    recorder: SessionRecorder
+        The recorder to write to.
+    """
+
+    def __init__(self, agent: GAgent, recorder: SessionRecorder) -> None:
+        self.agent = agent
+        self.recorder = recorder
+
+    @property
+    def worker(self):
+        return self.agent.worker
+
+    def follow_trajectory(self, points: Iterable[Tuple[float, float]]) -> None:
+        points = [list(point) for point in points]
+        self.recorder.write({"type": "trajectory", "points": points})
+        self.agent.follow_trajectory([tuple(point) for point in points])
+
+    def update_trajectory(self,
+                          points: List[Tuple[float, float]],
+                          start: int) -> None:
+        points = [list(point) for point in points]
+        self.recorder.write({"type": "trajectory", "points": points})
+        self.agent.update_trajectory([tuple(point) for point in points],
+                                     start)
+
+    def stop_trajectory(self) -> None:
+        self.agent.stop_trajectory()
+
+    def get_position(self) -> Tuple[float, float, float]:
+        position = tuple(self.agent.get_position())
+        self.recorder.write({"type": "position", "position": list(position)})
+        return position
+
+    def move(self, x: float, y: float) -> None:
+        self.agent.move(x, y)
+
+    def stop(self) -> None:
+        self.agent.stop()
+
+
+class SessionLog:
+
+    """ A recorded session read back from a log file. Events are kept
+    by type, each replayed component consumes the events of its type
+    in the recorded order.
+
+    Attributes
+    ----------
+    params: Dict[str, Any]
+        The parameters of the recorded path finder.
+    static: List[Tuple[int, int]]
+        The static obstacles of the recorded path finder.
+    events: Dict[str, List[Dict[str, Any]]]
+        The events by type.
+
+    Methods
+    -------
+
+    next(event_type):
+        Returns the next event of a type.
+    """
+
+    def __init__(self, path: str) -> None:
+        """ Reads the log file. A log whose recorder has not been
+            closed, after a crash for instance, is read up to its last
+            complete event.
+
+        Args:
+            path (str):
+                The path of the log file.
+
+        Raises:
+            ReplayException: Occurs when the log has no session header.
+        """
+        self.events = {"goal": [], "scan": [], "rays": [], "position": [],
+                       "trajectory": []}
+        self.__cursors = {event_type: 0 for event_type in self.events}
+        self.params = None
+        self.static = []
+        with gzip.open(path, "rt") as stream:
+            try:
+                for line in stream:
+                    if not line.endswith("\n"):
+                        break
+                    event = json.loads(line)
+                    if event["type"] == "session":
+                        self.params = event["params"]
+                        self.static = [tuple(v) for v in event["static"]]
+                    else:
+                        self.events[event["type"]].append(event)
+            except EOFError:
+                # The end-of-stream marker is only written by close.
+                pass
+        if self.params is None:
+            raise ReplayException("No session header in " + path)
+
+    def next(self, event_type: str) -> Dict[str, Any]:
+        """ Returns the next event of **event_type**.
+
+        Args:
+            event_type (str):
+                One of **"goal"**, **"scan"**, **"rays"**,
+                **"position"** or **"trajectory"**.
+
+        Raises:
+            ReplayException: Occurs when all the events of this
+            type have been consumed.
+
+        Returns:
+            Dict[str, Any]: The event
+        """
+        cursor = self.__cursors[event_type]
+        if cursor >= len(self.events[event_type]):
+            raise ReplayException("No more " + event_type + " events")
+        self.__cursors[event_type] = cursor + 1
+        return self.events[event_type][cursor]
+
+
+class ReplaySensor(ARaySensor):
+
+    """ A sensor which returns the recorded scans and rays.
+
+    Attributes
+    ----------
+    log: SessionLog
+        The recorded session.
+    """
+
+    def __init__(self, log: SessionLog) -> None:
+        self.log = log
+
+    def scan(self, origin: Tuple[float, float, float]) -> \
+            Iterable[Tuple[float, float, float]]:
+        return [tuple(obstacle)
+                for obstacle in self.log.next("scan")["obstacles"]]
+
+    def scan_rays(self, origin: Tuple[float, float, float]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        event = self.log.next("rays")
+        return np.asarray(event["endpoints"], dtype=float).reshape(-1, 2), \
+            np.asarray(event["hits"], dtype=bool)
+
+
+class ReplayAgent(GAgent):
+
+    """ An agent which returns the recorded positions and keeps the
+    trajectories it is given instead of moving.
+
+    Attributes
+    ----------
+    log: SessionLog
+        The recorded session.
+    trajectories: List[List[Tuple[float, float]]]
+        The trajectories given to the agent during the replay.
+    """
+
+    def __init__(self, log: SessionLog) -> None:
+        super().__init__()
+        self.log = log
+        self.trajectories = []
+
+    def follow_trajectory(self, points: Iterable[Tuple[float, float]]) -> None:
+        self.trajectories.append([tuple(point) for point in points])
+
+    def stop_trajectory(self) -> None:
+        pass
+
+    def get_position(self) -> Tuple[float, float, float]:
+        return tuple(self.log.next("position")["position"])
+
+
+def replay_session(path: str) -> Tuple[ReplayAgent, List[List[Any]]]:
+    """ Replays a recorded session through a new LPAStarPathFinder as
+        fast as possible: the path finder runs in virtual time, with
+        the recorded period, timeout and minimal replanning period.
+        The replay is deterministic, so it can be profiled and the
+        trajectories can be compared to the recorded ones.
+
+    Args:
+        path (str):
+            The path of the log file.
+
+    Returns:
+        Tuple[ReplayAgent, List[List[Any]]]: The replay agent, which
+        holds the replayed trajectories, and the recorded trajectories
+    """
+    log = SessionLog(path)
+    agent = ReplayAgent(log)
+    path_finder = LPAStarPathFinder(agent, ReplaySensor(log), log.params,
+                                    clock=VirtualClock())
+    path_finder.map.set_static_obstacles(log.static)
+    for event in log.events["goal"]:
+        path_finder.find_path(tuple(event["goal"]))
+
+    recorded = [[tuple(point) for point in event["points"]]
+                for event in log.events["trajectory"]]
+    return agent, recorded
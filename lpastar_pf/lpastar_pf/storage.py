@@ -0,0 +1,174 @@
+from typing import Any, Tuple
+import sys
+
+
+class SparseRow(dict):
+
+    """ A row of a SparseGrid: a hash map from the row **j** of a vertex
+    to its value, where vertices which have never been written
+    implicitly hold **default**.
+
+    Attributes
+    ----------
+    default: Any
+        The value of the vertices which have never been written.
+
+    Methods
+    -------
+
+    __missing__(j):
+        Returns **default** without storing it.
+    """
+
+    def __init__(self, default: Any) -> None:
+        """ Initializes an empty row.
+
+        Args:
+            default (Any):
+                The value of the vertices which have never been written.
+        """
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, j: int) -> Any:
+        """ Returns **default** for a vertex which has never
+            been written.
+
+        Args:
+            j (int):
+                The row of the vertex
+
+        Returns:
+            Any: **default**
+        """
+        return self.default
+
+
+class SparseGrid(dict):
+
+    """ A grid stored as hash maps: a hash map from the column **i** of
+    a vertex to a SparseRow. Vertices which have never been written
+    implicitly hold **default** and take no memory, so the memory
+    follows the explored region. It is indexed like the dense grids,
+    as a list of lists: **grid[i][j]**.
+
+    Attributes
+    ----------
+    default: Any
+        The value of the vertices which have never been written.
+
+    Methods
+    -------
+
+    __missing__(i):
+        Adds an empty row for the column **i**.
+    __len__():
+        Gets the number of written vertices.
+    nbytes():
+        Approximates the memory used by the grid.
+    """
+
+    def __init__(self, default: Any) -> None:
+        """ Initializes an empty grid.
+
+        Args:
+            default (Any):
+                The value of the vertices which have never been written.
+        """
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, i: int) -> SparseRow:
+        """ Adds an empty row for a column which has never been
+            accessed, so it can be written.
+
+        Args:
+            i (int):
+                The column
+
+        Returns:
+            SparseRow: The empty row
+        """
+        row = self[i] = SparseRow(self.default)
+        return row
+
+    def __len__(self) -> int:
+        """ Gets the number of vertices which have been written.
+
+        Returns:
+            int: A number of vertices
+        """
+        return sum(dict.__len__(row) for row in self.values())
+
+    def nbytes(self) -> int:
+        """ Approximates the memory used by the grid: the hash tables,
+            the keys and the values.
+
+        Returns:
+            int: A number of bytes
+        """
+        total = sys.getsizeof(self)
+        for i, row in self.items():
+            total += sys.getsizeof(i) + sys.getsizeof(row)
+            for j, value in row.items():
+                total += sys.getsizeof(j) + sys.getsizeof(value)
+        return total
+
+
+def allocate_grid(shape: Tuple[int, int],
+                  default: Any,
+                  sparse: bool) -> Any:
+    """ Allocates a grid of vertex values. A dense grid is a list of
+        lists rather than a NumPy array: the search reads and writes
+        single values, and Python lists are several times faster at
+        that than NumPy scalar indexing.
+
+    Args:
+        shape (Tuple[int, int]):
+            The shape of the grid, **columns x rows**
+        default (Any):
+            The initial value of every vertex
+        sparse (bool):
+            Allocates a SparseGrid if True, a dense grid otherwise
+
+    Returns:
+        Any: A grid indexed by **[i][j]**
+    """
+    if sparse:
+        return SparseGrid(default)
+    columns, rows = shape
+    return [[default] * rows for _ in range(columns)]
+
+
+def reset_grid(grid: Any, default: Any) -> None:
+    """ Sets every vertex of a grid returned by **allocate_grid** back
+        to **default**, without allocating it again.
+
+    Args:
+        grid (Any):
+            A dense or sparse grid
+        default (Any):
+            The value of every vertex
+    """
+    if isinstance(grid, SparseGrid):
+        grid.clear()
+        return
+    for row in grid:
+        row[:] = [default] * len(row)
+
+
+def grid_nbytes(grid: Any) -> int:
+    """ Gets the memory used by a grid returned by **allocate_grid**.
+        The values of a dense grid are counted as references, most of
+        them are shared.
+
+    Args:
+        grid (Any):
+            A dense or sparse grid
+
+    Returns:
+        int: A number of bytes
+    """
+    if isinstance(grid, SparseGrid):
+        return grid.nbytes()
+    return sys.getsizeof(grid) + sum(sys.getsizeof(row) for row in grid)
@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture
+def params():
+    return {
+        "width": 300,
+        "height": 200,
+        "resolution": 10,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "period": 0,
+        "timeout": 5
+    }
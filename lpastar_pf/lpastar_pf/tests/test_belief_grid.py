@@ -0,0 +1,176 @@
+import pytest
+import numpy as np
+from lpastar_pf.ARaySensor import ARaySensor
+from lpastar_pf.BeliefGrid import BeliefGrid
+from lpastar_pf.GMap import GMap
+from lpastar_pf.clock import VirtualClock
+from lpastar_pf.pf_exceptions import MapInitializationException
+from lpastar_pf.pf_exceptions import TimeoutException
+from .test_lpa_star_algo import MockAgent, MockSensor
+
+
+class ScriptedRaySensor(ARaySensor):
+
+    def __init__(self, scans):
+        self.scans = scans
+
+    def scan(self, origin):
+        return []
+
+    def scan_rays(self, origin):
+        endpoints, hits = self.scans.pop(0) if len(self.scans) > 1 \
+            else self.scans[0]
+        return np.array(endpoints, dtype=float).reshape(-1, 2), \
+            np.array(hits, dtype=bool)
+
+
+def sampled_cells(origin, end, resolution):
+    # Cases under points taken every 1/1000 of the ray.
+    t = np.linspace(0.0, 1.0, 1001)[:, None]
+    points = np.asarray(origin) + t * (np.asarray(end) - origin)
+    return set(map(tuple, np.floor(points / resolution).astype(int)))
+
+
+def test_traverse_follows_the_rays(params):
+    belief = BeliefGrid(GMap(params))
+    origin = (15.0, 15.0)
+    endpoints = np.array([[95.0, 15.0], [15.0, 15.0], [83.0, 47.0],
+                          [2.0, 191.0], [151.0, 4.0]])
+    cells, rays, last = belief.traverse(origin, endpoints)
+    for k, end in enumerate(endpoints):
+        crossed = [tuple(c) for c in cells[rays == k]]
+        first = np.floor(np.asarray(origin) / 10).astype(int)
+        final = np.floor(end / 10).astype(int)
+        assert len(crossed) == np.abs(final - first).sum() + 1
+        assert crossed[0] == tuple(first)
+        assert tuple(cells[(rays == k) & last][0]) == tuple(final)
+        assert sampled_cells(origin, end, 10) <= set(crossed)
+    assert last.sum() == len(endpoints)
+
+
+def test_integrate_clears_and_marks(params):
+    belief = BeliefGrid(GMap(params))
+    belief.occupied[3, 1] = True
+    changed = belief.integrate((15.0, 15.0), [[95.0, 15.0]], [True])
+    assert sorted(map(tuple, changed)) == [(3, 1), (9, 1)]
+    assert np.argwhere(belief.occupied).tolist() == [[9, 1]]
+    # The same scan changes nothing.
+    changed = belief.integrate((15.0, 15.0), [[95.0, 15.0]], [True])
+    assert len(changed) == 0
+
+
+def test_hit_wins_over_crossed_case(params):
+    belief = BeliefGrid(GMap(params))
+    changed = belief.integrate((15.0, 15.0), [[55.0, 15.0], [95.0, 15.0]],
+                               [True, False])
+    assert [tuple(c) for c in changed] == [(5, 1)]
+    assert belief.occupied[5, 1]
+
+
+def test_rays_out_of_the_map(params):
+    belief = BeliefGrid(GMap(params))
+    changed = belief.integrate((15.0, 15.0), [[-45.0, 15.0],
+                                              [15.0, 400.0]], [True, True])
+    assert len(changed) == 0
+    assert not belief.occupied.any()
+
+
+def test_set_dynamic_layer(params):
+    _map = GMap(params)
+    layer = np.zeros((_map.columns, _map.rows), dtype=bool)
+    layer[4, 5] = True
+    assert _map.set_dynamic_layer(layer) == [(4, 5)]
+    assert _map.set_dynamic_layer(layer) == []
+    with pytest.raises(MapInitializationException):
+        _map.set_dynamic_layer(layer[1:])
+
+
+def test_belief_mode_needs_a_ray_sensor(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["belief_grid"] = True
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)), MockSensor([]),
+                          params)
+
+
+def test_belief_remembers_what_is_out_of_sight(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["belief_grid"] = True
+    params["period"] = 100
+    # A wall is seen once, then the sensor sees nothing, then a ray
+    # crosses the wall.
+    wall = [[125.0, 5.0 + 10 * k] for k in range(20)]
+    scans = [(wall, [True] * 20), ([], [])] * 2 + \
+        [([[135.0, 105.0]], [False])]
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    ScriptedRaySensor(scans), params,
+                                    clock=VirtualClock())
+    changes = []
+    set_layer = path_finder.map.set_dynamic_layer
+
+    def counted(layer):
+        changes.append(layer.sum())
+        return set_layer(layer)
+
+    path_finder.map.set_dynamic_layer = counted
+    with pytest.raises(TimeoutException):
+        path_finder.find_path((285.0, 105.0))
+    # The map changes when the wall is seen, and when it is crossed.
+    assert changes == [20, 19]
+    assert not path_finder.map.dynamic_layer[12, 10]
+    assert path_finder.map.dynamic_layer[12, 9]
+
+
+def test_hysteresis(params):
+    belief = BeliefGrid(GMap(params), hit=0.85, miss=-0.4, limit=3.5,
+                        occupied_threshold=1.5, free_threshold=-0.5)
+    origin, end = (15.0, 15.0), [[55.0, 15.0]]
+    assert len(belief.integrate(origin, end, [True])) == 0
+    assert belief.integrate(origin, end, [True]).tolist() == [[5, 1]]
+    # Between the thresholds, a miss does not clear the case.
+    for _ in range(5):
+        assert len(belief.integrate(origin, end, [False])) == 0
+    assert belief.occupied[5, 1]
+    assert belief.integrate(origin, end, [False]).tolist() == [[5, 1]]
+    assert belief.log_odds[5, 1] == pytest.approx(2 * 0.85 - 6 * 0.4)
+
+
+def test_log_odds_must_cross_thresholds(params):
+    _map = GMap(params)
+    with pytest.raises(MapInitializationException):
+        BeliefGrid(_map, miss=0.4)
+    with pytest.raises(MapInitializationException):
+        BeliefGrid(_map, occupied_threshold=-0.1, free_threshold=0.1)
+    with pytest.raises(MapInitializationException):
+        BeliefGrid(_map, limit=2.0, occupied_threshold=2.0)
+
+
+def noisy_wall_changes(params, seed):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["belief_grid"] = True
+    params["period"] = 100
+    params["metrics"] = True
+    rng = np.random.default_rng(seed)
+    # A third of the rays miss the upper half of a wall and go beyond.
+    scans = []
+    for _ in range(50):
+        missed = rng.random(10) < 0.3
+        scans.append(([[185.0 if m else 125.0, 5.0 + 10 * k]
+                       for k, m in enumerate(missed)], ~missed))
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    ScriptedRaySensor(scans), params,
+                                    clock=VirtualClock())
+    with pytest.raises(TimeoutException):
+        path_finder.find_path((285.0, 105.0))
+    return path_finder.metrics.totals.changed_vertices
+
+
+# The second band is the one of the shipped ROS configuration.
+@pytest.mark.parametrize("occupied, free", [(1.5, -0.5), (0.7, -0.7)])
+def test_log_odds_filter_noise(params, occupied, free):
+    binary = noisy_wall_changes(dict(params), 3)
+    params.update(log_odds_hit=0.85, log_odds_miss=-0.4, log_odds_limit=3.5,
+                  log_odds_occupied=occupied, log_odds_free=free)
+    filtered = noisy_wall_changes(params, 3)
+    assert filtered == 10
+    assert binary > 5 * filtered
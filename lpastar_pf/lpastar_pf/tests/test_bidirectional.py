@@ -0,0 +1,81 @@
+import pytest
+from lpastar_pf.GMap import GMap
+from lpastar_pf.bidirectional import bidirectional_search
+from lpastar_pf.pf_exceptions import MapInitializationException
+from lpastar_pf.pf_exceptions import PathDoesNotExistException
+from .test_lpa_star_algo import MockAgent, MockSensor
+from .test_landmarks import maze
+
+
+@pytest.fixture
+def params(params):
+    params["metrics"] = True
+    return params
+
+
+def cost(_map, path):
+    return sum(_map.get_transition_cost(path[k], path[k + 1])
+               for k in range(len(path) - 1))
+
+
+def plan(params, mode, walls, start=(5.0, 195.0), goal=(295.0, 5.0)):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["initial_search"] = mode
+    path_finder = LPAStarPathFinder(MockAgent(start + (0.0,)),
+                                    MockSensor([]), params)
+    path_finder.map.set_static_obstacles(walls)
+    path_finder.reset(goal)
+    return path_finder, path_finder.compute_shortest_path()
+
+
+def test_search(params):
+    _map = GMap(params)
+    _map.set_static_obstacles(maze())
+    path, expanded, expansions = bidirectional_search(_map, (0, 19), (29, 0))
+    assert path[0] == (0, 19) and path[-1] == (29, 0)
+    assert 0 < len(expanded) <= expansions
+    reference, _ = plan(params, "lpastar", maze())
+    assert cost(_map, path) == pytest.approx(
+        cost(reference.map, reference.compute_shortest_path()))
+
+
+def test_same_start_and_goal(params):
+    path, _, _ = bidirectional_search(GMap(params), (4, 4), (4, 4))
+    assert path == [(4, 4)]
+
+
+def test_fewer_expansions(params):
+    params["heuristics_multiplier"] = 0
+    expansions = []
+    for mode in ("lpastar", "bidirectional"):
+        path_finder, path = plan(params, mode, [], (55.0, 105.0),
+                                 (245.0, 105.0))
+        assert len(path) == 20
+        expansions.append(path_finder.metrics.last.expansions)
+    assert expansions[1] < expansions[0]
+
+
+def test_incremental_after_bidirectional(params):
+    path_finder, _ = plan(params, "bidirectional", [])
+    reference, _ = plan(params, "lpastar", [])
+    wall = [(15, j) for j in range(0, 15)]
+    for planner in (path_finder, reference):
+        planner.update_vertices(planner.map.set_obstacles(wall))
+    path = path_finder.compute_shortest_path()
+    assert path[0] == (0, 19) and path[-1] == (29, 0)
+    assert not any(v in wall for v in path)
+    assert cost(path_finder.map, path) == pytest.approx(
+        cost(reference.map, reference.compute_shortest_path()))
+
+
+def test_no_path(params):
+    params["obstacle_case_value"] = float("inf")
+    _map = GMap(params)
+    _map.set_static_obstacles([(10, j) for j in range(20)])
+    with pytest.raises(PathDoesNotExistException):
+        bidirectional_search(_map, (0, 0), (29, 0))
+
+
+def test_unknown_initial_search(params):
+    with pytest.raises(MapInitializationException):
+        plan(params, "unidirectional", [])
@@ -0,0 +1,116 @@
+import time
+import pytest
+from lpastar_pf.clock import VirtualClock, WallClock
+from lpastar_pf.pf_exceptions import TimeoutException
+from .test_lpa_star_algo import MockAgent, MockSensor, ScriptedSensor, \
+    WalkingAgent
+
+
+@pytest.fixture
+def params(params):
+    params["period"] = 500
+    params["timeout"] = 60
+    return params
+
+
+class CountingSensor(MockSensor):
+
+    def __init__(self, clock):
+        super().__init__([])
+        self.clock = clock
+        self.times = []
+
+    def scan(self, origin):
+        self.times.append(self.clock.now_ns())
+        return []
+
+
+def test_virtual_clock():
+    clock = VirtualClock(start_ns=5)
+    slept = []
+    clock.listeners.append(slept.append)
+    clock.sleep(0.25)
+    clock.sleep(0.0)
+    # A null sleep still lasts the minimal step.
+    assert clock.now_ns() == 5 + 250000000 + 1000000
+    assert slept == [0.25, 0.001]
+    with pytest.raises(ValueError):
+        VirtualClock(min_step=0.0)
+
+
+def test_accelerated_wall_clock():
+    clock = WallClock(speed=20.0)
+    begin, wall = clock.now_ns(), time.perf_counter()
+    clock.sleep(1.0)
+    assert time.perf_counter() - wall < 0.5
+    assert clock.now_ns() - begin >= 0.9e9
+
+
+def test_find_path_in_virtual_time(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from .test_landmarks import maze
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    clock = VirtualClock()
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [[]]),
+                                    params, clock=clock)
+    path_finder.map.set_static_obstacles(maze())
+    begin = time.perf_counter()
+    path_finder.find_path((285.0, 105.0))
+    # The periods of 500 ms are not waited for.
+    assert time.perf_counter() - begin < 1.0
+    assert clock.now_ns() >= 6 * 500000000
+
+
+def test_timeout_in_virtual_time(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["timeout"] = 5
+    clock = VirtualClock()
+    sensor = CountingSensor(clock)
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)), sensor,
+                                    params, clock=clock)
+    with pytest.raises(TimeoutException):
+        path_finder.find_path((285.0, 105.0))
+    # One scan per period until the timeout, as in wall-clock time.
+    assert sensor.times == [k * 500000000 for k in range(11)]
+
+
+def test_timeout_without_period_in_virtual_time(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["period"] = 0
+    params["timeout"] = 1
+    clock = VirtualClock()
+    # The goal is reachable but the agent never moves.
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    MockSensor([]), params, clock=clock)
+    begin = time.perf_counter()
+    with pytest.raises(TimeoutException):
+        path_finder.find_path((285.0, 105.0))
+    assert time.perf_counter() - begin < 10.0
+    assert clock.now_ns() >= 1000000000
+
+
+def test_min_replan_period_in_virtual_time(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from .test_landmarks import maze
+    params["period"] = 100
+    params["min_replan_period"] = 1000
+    params["timeout"] = 5
+    clock = VirtualClock()
+    # A wall which appears and disappears asks for a replan at every
+    # period, the agent stays still.
+    scans = [[(125.0, 105.0, 10.0)] if k % 2 else [] for k in range(60)]
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    MockSensor([]), params, clock=clock)
+    path_finder.sensor.scan = lambda origin: scans.pop(0)
+    path_finder.map.set_static_obstacles(maze())
+    planned = []
+    compute = path_finder.compute_shortest_path
+
+    def timed_compute():
+        planned.append(clock.now_ns())
+        return compute()
+
+    path_finder.compute_shortest_path = timed_compute
+    with pytest.raises(TimeoutException):
+        path_finder.find_path((285.0, 105.0))
+    assert planned == [k * 1000000000 for k in range(6)]
@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from lpastar_pf.distance_transform import distance_transform
+from lpastar_pf.distance_transform import update_distance_transform
+
+
+def brute_force_distance(obstacles, cap):
+    distance = np.full(obstacles.shape, np.inf)
+    sources = np.argwhere(obstacles)
+    for i in range(obstacles.shape[0]):
+        for j in range(obstacles.shape[1]):
+            if len(sources) > 0:
+                d = np.sqrt(((sources - (i, j)) ** 2).sum(axis=1)).min()
+                if d <= cap:
+                    distance[i, j] = d
+    return distance
+
+
+@pytest.fixture
+def obstacles():
+    rng = np.random.default_rng(7)
+    return rng.random((40, 30)) < 0.03
+
+
+@pytest.mark.parametrize("cap", [0, 1, 3, 6])
+def test_distance_transform(obstacles, cap):
+    assert np.array_equal(distance_transform(obstacles, cap),
+                          brute_force_distance(obstacles, cap))
+
+
+def test_update_distance_transform(obstacles):
+    distance = distance_transform(obstacles, 4)
+    new_obstacles = obstacles.copy()
+    new_obstacles[20, 15] = not new_obstacles[20, 15]
+    new_obstacles[22, 3] = not new_obstacles[22, 3]
+    changed = np.argwhere(new_obstacles != obstacles)
+    region = update_distance_transform(distance, new_obstacles, changed, 4)
+    assert region == (slice(16, 27), slice(0, 20))
+    assert np.array_equal(distance, distance_transform(new_obstacles, 4))
+
+
+def test_update_without_changes(obstacles):
+    distance = distance_transform(obstacles, 4)
+    region = update_distance_transform(distance, obstacles,
+                                       np.empty((0, 2), dtype=int), 4)
+    assert distance[region].size == 0
+
+
+def test_empty_grid():
+    obstacles = np.zeros((30, 20), dtype=bool)
+    assert np.array_equal(distance_transform(obstacles, 4),
+                          brute_force_distance(obstacles, 4))
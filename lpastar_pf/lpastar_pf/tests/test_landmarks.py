@@ -0,0 +1,115 @@
+import heapq
+import pytest
+import numpy as np
+from lpastar_pf.GMap import GMap
+from lpastar_pf.landmarks import Landmarks, cost_field
+from .test_lpa_star_algo import MockAgent, MockSensor
+
+
+def maze():
+    walls = [(8, j) for j in range(0, 17)] + \
+        [(16, j) for j in range(3, 20)] + \
+        [(24, j) for j in range(0, 17)]
+    return walls
+
+
+def dijkstra(_map, source):
+    costs = {source: 0.0}
+    queue = [(0.0, source)]
+    while queue:
+        cost, v = heapq.heappop(queue)
+        if cost > costs[v]:
+            continue
+        for u in _map.get_neighbours(v):
+            c = cost + _map.get_transition_cost(v, u)
+            if c < costs.get(u, np.inf):
+                costs[u] = c
+                heapq.heappush(queue, (c, u))
+    return costs
+
+
+def test_cost_field(params):
+    _map = GMap(params)
+    rng = np.random.default_rng(3)
+    _map.set_static_obstacles(rng.integers(0, (30, 20), (120, 2)))
+    _map.set_terrain(rng.uniform(1.0, 4.0, (30, 20)))
+    field = cost_field(_map, (4, 7))
+    for v, cost in dijkstra(_map, (4, 7)).items():
+        assert field[v] == pytest.approx(cost)
+
+
+def test_bounds_are_admissible(params):
+    _map = GMap(params)
+    _map.set_static_obstacles(maze())
+    landmarks = Landmarks(_map, 4)
+    landmarks.refresh()
+    landmarks.set_goal((29, 0))
+    assert len(landmarks.vertices) == 4
+    assert landmarks.fields.dtype == np.float32
+    for v, cost in dijkstra(_map, (29, 0)).items():
+        assert landmarks.bound(v) <= cost
+
+
+def test_infinite_obstacle_cost(params):
+    params["obstacle_case_value"] = float("inf")
+    _map = GMap(params)
+    # The wall at i = 16 closes the right side of the maze.
+    _map.set_static_obstacles(maze() + [(16, j) for j in range(3)])
+    field = cost_field(_map, (4, 7))
+    reached = dijkstra(_map, (4, 7))
+    assert field[20, 10] == np.inf
+    for v, cost in reached.items():
+        assert field[v] == pytest.approx(cost)
+
+    landmarks = Landmarks(_map, 4)
+    landmarks.refresh()
+    landmarks.set_goal((12, 0))
+    assert np.isfinite(landmarks.fields).all()
+    assert landmarks.bound((20, 10)) == np.inf
+    for v, cost in dijkstra(_map, (12, 0)).items():
+        assert landmarks.bound(v) <= cost
+
+
+def test_invalidate_on_decrease_only(params):
+    _map = GMap(params)
+    _map.set_static_obstacles(maze())
+    _map.set_obstacles([(3, 3)])
+    landmarks = Landmarks(_map, 2)
+    landmarks.refresh()
+    assert not landmarks.invalidate(_map.set_obstacles([(3, 3), (4, 4)]))
+    assert landmarks.invalidate(_map.set_obstacles([(4, 4)]))
+    landmarks.refresh()
+    assert not landmarks.stale
+
+
+def test_fewer_expansions(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    expansions = []
+    paths = []
+    for count in (0, 4):
+        params["landmarks"] = count
+        params["metrics"] = True
+        path_finder = LPAStarPathFinder(MockAgent((5.0, 195.0, 0.0)),
+                                        MockSensor([]), params)
+        path_finder.map.set_static_obstacles(maze())
+        path_finder.reset((295.0, 5.0))
+        paths.append(path_finder.compute_shortest_path())
+        expansions.append(path_finder.metrics.last.expansions)
+    assert paths[0][-1] == paths[1][-1] == (29, 0)
+    assert len(paths[0]) == len(paths[1])
+    assert expansions[1] < expansions[0]
+
+
+def test_replan_after_removal(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["landmarks"] = 2
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 195.0, 0.0)),
+                                    MockSensor([]), params)
+    path_finder.map.set_obstacles(maze())
+    path_finder.reset((295.0, 5.0))
+    long_path = path_finder.compute_shortest_path()
+    changed = path_finder.map.set_obstacles([])
+    path_finder.update_vertices(changed)
+    assert path_finder.landmarks.stale
+    path = path_finder.compute_shortest_path()
+    assert len(path) == 30 < len(long_path)
@@ -0,0 +1,95 @@
+import random
+import pytest
+from lpastar_pf.LazyQueue import LazyQueue
+from lpastar_pf.PriorityQueue import PriorityQueue
+from lpastar_pf.pf_exceptions import EmptyQueueException
+
+
+@pytest.fixture
+def queue():
+    queue = LazyQueue(40)
+    for key, vertex in (((2.0, 1.0), (25, 34)), ((4.0, 0.0), (26, 34)),
+                        ((0.0, 5.0), (27, 34)), ((10.0, 1.0), (28, 34)),
+                        ((3.0, 0.0), (29, 34)), ((8.0, 2.0), (30, 34))):
+        queue.insert(key, vertex)
+    return queue
+
+
+def test_pop_in_order(queue):
+    assert len(queue) == 6
+    assert queue.pop() == ((0.0, 5.0), (27, 34))
+    assert queue.pop() == ((2.0, 1.0), (25, 34))
+    assert queue.top_key() == (3.0, 0.0)
+    assert len(queue) == 4
+
+
+def test_remove_leaves_stale_entries(queue):
+    queue.remove((27, 34))
+    queue.remove((30, 34))
+    queue.remove((0, 0))
+    assert len(queue) == 4
+    assert queue.stale == 2
+    assert len(queue.h) == 6
+    assert queue.top_key() == (2.0, 1.0)
+    assert queue.stale == 1
+    assert [queue.pop()[1] for _ in range(4)] == \
+        [(25, 34), (29, 34), (26, 34), (28, 34)]
+    assert queue.stale == 0
+    with pytest.raises(EmptyQueueException):
+        queue.pop()
+    with pytest.raises(EmptyQueueException):
+        queue.top_key()
+
+
+def test_insert_queued_vertex(queue):
+    queue.insert((1.0, 0.0), (28, 34))
+    queue.insert((9.0, 0.0), (27, 34))
+    assert len(queue) == 6
+    assert queue.stale == 2
+    assert queue.pop() == ((1.0, 0.0), (28, 34))
+    assert queue.pop()[1] == (25, 34)
+
+
+def test_compaction():
+    queue = LazyQueue(10, ratio=1.0)
+    for j in range(10):
+        queue.insert((float(j), 0.0), (0, j))
+    for j in range(5):
+        queue.remove((0, j))
+    assert queue.compactions == 0
+    queue.remove((0, 5))
+    assert queue.compactions == 1
+    assert queue.stale == 0
+    assert len(queue.h) == 4
+    assert queue.pop() == ((6.0, 0.0), (0, 6))
+
+
+def test_rekey(queue):
+    queue.remove((25, 34))
+    queue.rekey(lambda v: (float(-v[0]), 0.0))
+    assert queue.stale == 0
+    assert len(queue.h) == 5
+    assert queue.pop() == ((-30.0, 0.0), (30, 34))
+
+
+def test_same_order_as_priority_queue():
+    rng = random.Random(5)
+    lazy = LazyQueue(10, ratio=0.25)
+    heap = PriorityQueue()
+    for _ in range(3000):
+        vertex = (rng.randrange(10), rng.randrange(10))
+        key = (float(rng.randrange(6)), float(rng.randrange(3)))
+        r = rng.random()
+        if r < 0.6:
+            for queue in (lazy, heap):
+                queue.remove(vertex)
+                queue.insert(key, vertex)
+        elif r < 0.8:
+            lazy.remove(vertex)
+            heap.remove(vertex)
+        elif len(heap.h) > 0:
+            assert lazy.pop() == heap.pop()
+    assert lazy.compactions > 0
+    while len(heap.h) > 0:
+        assert lazy.pop() == heap.pop()
+    assert len(lazy) == 0
@@ -1,2 +1,343 @@
+import pytest
+import numpy as np
+from lpastar_pf.GAgent import GAgent
+from lpastar_pf.ASensor import ASensor
+
+
+class MockAgent(GAgent):
+
+    def __init__(self, position):
+        super().__init__()
+        self.position = position
+        self.trajectories = []
+
+    def get_position(self):
+        return self.position
+
+    def follow_trajectory(self, points):
+        self.trajectories.append(list(points))
+
+    def stop_trajectory(self):
+        pass
+
+
+class WalkingAgent(MockAgent):
+
+    def __init__(self, position):
+        super().__init__(position)
+        self.trajectory = []
+        self.index = 0
+
+    def follow_trajectory(self, points):
+        super().follow_trajectory(points)
+        self.trajectory = list(points)
+        self.index = 0
+
+    def update_trajectory(self, points, start):
+        self.trajectories.append(list(points))
+        self.trajectory = list(points)
+        self.index = min(self.index, start)
+
+    def walk(self):
+        # The next waypoint is reached at each period.
+        if self.trajectory:
+            x, y = self.trajectory[self.index]
+            self.position = (x, y, 0.0)
+            self.index = min(self.index + 1, len(self.trajectory) - 1)
+
+
+class MockSensor(ASensor):
+
+    def __init__(self, obstacles):
+        self.obstacles = obstacles
+
+    def scan(self, origin):
+        return self.obstacles
+
+
+@pytest.fixture
+def path_finder(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    return LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                             MockSensor([]),
+                             params)
+
+
 def test_basic():
     assert True
+
+
+def test_straight_path(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path = path_finder.compute_shortest_path()
+    assert path[0] == (0, 10)
+    assert path[-1] == (25, 10)
+    assert len(path) == 26
+
+
+def test_path_around_obstacle(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path_finder.compute_shortest_path()
+    changed = path_finder.map.set_obstacles([(12, j) for j in range(5, 16)])
+    path_finder.update_vertices(changed)
+    path = path_finder.compute_shortest_path()
+    assert path[-1] == (25, 10)
+    assert not any(path_finder.map.occupancy[v] for v in path)
+
+
+def test_path_avoids_slow_terrain(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path_finder.compute_shortest_path()
+    path_finder.set_terrain(np.full((6, 5), 10.0), origin=(10, 8))
+    path = path_finder.compute_shortest_path()
+    assert path[-1] == (25, 10)
+    assert not any(10 <= i < 16 and 8 <= j < 13 for i, j in path)
+
+
+def test_path_follows_parents(path_finder):
+    path_finder.map.set_static_obstacles([(12, j) for j in range(3, 18)])
+    path_finder.reset((255.0, 105.0))
+    path = path_finder.compute_shortest_path()
+    cost = sum(path_finder.map.get_transition_cost(path[k], path[k + 1])
+               for k in range(len(path) - 1))
+    assert cost == pytest.approx(path_finder.g[25][10])
+    assert all(abs(path[k][0] - path[k + 1][0]) <= 1 and
+               abs(path[k][1] - path[k + 1][1]) <= 1
+               for k in range(len(path) - 1))
+
+
+def test_path_types(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path = path_finder.compute_shortest_path()
+    generator = path_finder.compute_shortest_path(path_type="generator")
+    assert next(generator) == (25, 10)
+    assert list(generator) == path[-2::-1]
+    array = path_finder.compute_shortest_path(path_type="array")
+    assert array.shape == (26, 2)
+    assert tuple(array[0]) == (0.0, 100.0)
+    assert tuple(array[-1]) == (250.0, 100.0)
+
+
+def test_path_from_agent_position(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path_finder.compute_shortest_path()
+    path_finder.agent.position = (105.0, 105.0, 0.0)
+    path = path_finder.compute_shortest_path()
+    assert path[0] == (10, 10)
+    assert len(path) == 16
+
+
+def test_sparse_storage(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..storage import SparseGrid
+    params["storage"] = "sparse"
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    MockSensor([]), params)
+    path_finder.map.set_static_obstacles([(12, j) for j in range(3, 18)])
+    path_finder.reset((255.0, 105.0))
+    path = path_finder.compute_shortest_path()
+    assert isinstance(path_finder.g, SparseGrid)
+    assert len(path_finder.g) < path_finder.map.rows * path_finder.map.columns
+
+    params["storage"] = "dense"
+    dense = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                              MockSensor([]), params)
+    dense.map.set_static_obstacles([(12, j) for j in range(3, 18)])
+    dense.reset((255.0, 105.0))
+    assert dense.compute_shortest_path() == path
+    assert dense.g[25][10] == pytest.approx(path_finder.g[25][10])
+
+
+def test_unknown_storage(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..pf_exceptions import MapInitializationException
+    params["storage"] = "compressed"
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                          MockSensor([]), params)
+
+
+def test_deferred_allocation(path_finder):
+    assert path_finder.g is None and path_finder.rhs is None
+    # Changes before the first reset are taken from the map by reset.
+    path_finder.update_vertices(path_finder.map.set_obstacles([(12, 10)]))
+    path_finder.reset((255.0, 105.0))
+    assert (len(path_finder.g), len(path_finder.g[0])) == (30, 20)
+    path = path_finder.compute_shortest_path()
+    assert path[-1] == (25, 10) and (12, 10) not in path
+
+
+def test_lazy_imports():
+    import os
+    import subprocess
+    import sys
+    optional = ["multiprocessing", "lpastar_pf.TiledGMap",
+                "lpastar_pf.RecedingHorizon", "lpastar_pf.PathCache",
+                "lpastar_pf.landmarks", "lpastar_pf.bidirectional",
+                "lpastar_pf.metrics", "lpastar_pf.SafeIntervalPlanner",
+                "lpastar_pf.BeliefGrid", "lpastar_pf.tour",
+                "lpastar_pf.replay", "lpastar_pf.profiling"]
+    code = "import sys\n" \
+        "from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder\n" \
+        "print(' '.join(m for m in %r if m in sys.modules))" % optional
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    loaded = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True,
+                            cwd=root).stdout.split()
+    assert loaded == []
+
+
+class ScriptedSensor(MockSensor):
+
+    def __init__(self, agent, scans):
+        super().__init__([])
+        self.agent = agent
+        self.scans = scans
+
+    def scan(self, origin):
+        self.agent.walk()
+        return self.scans.pop(0) if len(self.scans) > 1 else self.scans[0]
+
+
+def walk(params, scans):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from .test_landmarks import maze
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    params["metrics"] = True
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, scans),
+                                    params)
+    path_finder.map.set_static_obstacles(maze())
+    path_finder.find_path((285.0, 105.0))
+    return agent, path_finder
+
+
+def test_unchanged_trajectory_is_not_resent(params):
+    # A far away obstacle changes at every period, the path does not.
+    scans = [[(35.0, 15.0 + 10 * (k % 2), 10.0)] for k in range(20)]
+    agent, path_finder = walk(params, scans)
+    assert len(agent.trajectories) == 1
+    assert path_finder.metrics.calls > 2
+    assert path_finder.metrics.totals.sent_waypoints == \
+        len(agent.trajectories[0])
+
+
+def test_changed_trajectory_is_sent_as_delta(params):
+    # An obstacle appears on the path after a few periods.
+    scans = [[]] * 3 + [[(235.0, 135.0, 10.0)]]
+    agent, path_finder = walk(params, scans)
+    assert len(agent.trajectories) == 2
+    first, second = agent.trajectories
+    # The waypoints already reached are kept, only the detour is sent.
+    assert second[:4] == first[:4] and second != first
+    assert path_finder.metrics.totals.sent_waypoints < \
+        len(first) + len(second)
+    assert agent.position[:2] == (280.0, 100.0)
+
+
+def test_min_replan_period(params):
+    params["min_replan_period"] = 60000
+    scans = [[]] * 3 + [[(235.0, 135.0, 10.0)]]
+    agent, path_finder = walk(params, scans)
+    assert len(agent.trajectories) == 1
+    assert path_finder.replan
+
+
+def test_lazy_updates_defer_off_path_increases(params):
+    # Obstacles pile up far from the path.
+    scans = [[(35.0, 15.0 + 10 * m, 10.0) for m in range(k)]
+             for k in range(6)]
+    eager, eager_finder = walk(dict(params), list(scans))
+    params["lazy_updates"] = True
+    lazy, lazy_finder = walk(params, list(scans))
+    assert lazy.trajectories == eager.trajectories
+    assert lazy_finder.pending
+    assert lazy_finder.metrics.totals.deferred_vertices > 0
+    assert lazy_finder.metrics.totals.expansions < \
+        eager_finder.metrics.totals.expansions
+
+
+def test_lazy_updates_on_path_change(params):
+    # A change on the path updates the deferred vertices too.
+    scans = [[], [(35.0, 15.0, 10.0)],
+             [(35.0, 15.0, 10.0), (235.0, 135.0, 10.0)]]
+    eager, _ = walk(dict(params), list(scans))
+    params["lazy_updates"] = True
+    lazy, path_finder = walk(params, list(scans))
+    assert len(lazy.trajectories) == 2
+    assert lazy.trajectories == eager.trajectories
+    assert not path_finder.pending
+
+
+def test_lazy_updates_need_gmap(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..pf_exceptions import MapInitializationException
+    params["lazy_updates"] = True
+    params["tile_size"] = 8
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                          MockSensor([]), params)
+
+
+def test_lazy_updates_on_decrease(params):
+    # A removed obstacle may open a shortcut, it is never deferred.
+    params["lazy_updates"] = True
+    scans = [[(35.0, 15.0, 10.0)], [(35.0, 15.0, 10.0)], []]
+    _, path_finder = walk(params, scans)
+    assert path_finder.metrics.calls > 3
+    assert path_finder.metrics.totals.deferred_vertices == 0
+
+
+def test_queues(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..LazyQueue import LazyQueue
+    from ..pf_exceptions import MapInitializationException
+    from .test_landmarks import maze
+    paths = []
+    for queue in ("heap", "compact", "lazy"):
+        params["queue"] = queue
+        path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                        MockSensor([]), params)
+        path_finder.map.set_static_obstacles(maze())
+        path_finder.reset((285.0, 105.0))
+        paths.append(path_finder.compute_shortest_path())
+        path_finder.update_vertices(
+            path_finder.map.set_obstacles([(23, 13)]))
+        paths.append(path_finder.compute_shortest_path())
+    assert isinstance(path_finder.discover_order, LazyQueue)
+    assert paths[:2] == paths[2:4] == paths[4:]
+    params["queue"] = "fibonacci"
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                          MockSensor([]), params)
+    params["queue"] = "lazy"
+    params["queue_compaction_ratio"] = 0
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                          MockSensor([]), params)
+
+
+def test_zigzag_keeps_its_corner(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [[]]),
+                                    params)
+    path_finder.map.set_static_obstacles([(1, 9), (1, 11), (2, 10), (2, 11)])
+    path_finder.find_path((45.0, 105.0))
+    # The detour goes by (2, 9) with two opposite diagonals.
+    assert agent.trajectories[0][:3] == [(10.0, 100.0), (20.0, 90.0),
+                                         (30.0, 100.0)]
+
+
+def test_infinite_obstacle_cost(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["obstacle_case_value"] = float("inf")
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    wall = [(55.0, 5.0 + 10 * j, 10.0) for j in range(15)]
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [wall]),
+                                    params)
+    path_finder.find_path((95.0, 105.0))
+    # The vertices of the wall are unreachable, without parent.
+    assert path_finder.rhs[5][10] == path_finder.infinity
+    assert path_finder.parents[5][10] == -1
+    assert all(x != 55.0 or y >= 150.0
+               for x, y in agent.trajectories[-1])
@@ -1,9 +1,12 @@
 import pytest
 from typing import Tuple, List
 import random
+import numpy as np
 import time
+import warnings
 # from math import sqrt
 from lpastar_pf.pf_exceptions import ImpossibleTransitionException
+from lpastar_pf.pf_exceptions import MapInitializationException
 
 
 def generate_obstacles() -> List[Tuple[float, float, float]]:
@@ -78,3 +81,203 @@ def test_impossible_transition_cost(mock_map):
         j2 = random.randint(202, 400)
         with pytest.raises(ImpossibleTransitionException):
             mock_map.get_transition_cost((i1, j1), (i2, j2))
+
+
+@pytest.fixture
+def layered_map():
+    from ..GMap import GMap
+    return GMap(
+        params={
+            "width": 300,
+            "height": 200,
+            "resolution": 10,
+            "free_case_value": 1,
+            "obstacle_case_value": 1000,
+            "heuristics_multiplier": 1
+        }, static_obstacles=[(0.0, 0.0, 0.0), (100.0, 100.0, 0.0)]
+    )
+
+
+def test_static_layer(layered_map):
+    assert layered_map.static_layer[0, 0]
+    assert layered_map.static_layer[10, 10]
+    assert not layered_map.dynamic_layer.any()
+    assert layered_map.get_transition_cost((10, 10), (11, 10)) == 1000
+
+
+def test_dynamic_layer_changes(layered_map):
+    changed = layered_map.set_obstacles([(5, 5), (6, 5)])
+    assert sorted(changed) == [(5, 5), (6, 5)]
+    changed = layered_map.set_obstacles([(6, 5), (7, 5)])
+    assert sorted(changed) == [(5, 5), (7, 5)]
+    assert layered_map.set_obstacles([(6, 5), (7, 5)]) == []
+
+
+def test_dynamic_obstacle_on_static_layer(layered_map):
+    assert layered_map.set_obstacles([(10, 10), (0, 0)]) == []
+    assert layered_map.set_obstacles([]) == []
+    assert layered_map.occupancy[10, 10]
+
+
+def test_out_of_map_obstacles(layered_map):
+    assert layered_map.set_obstacles([(-1, 0), (30, 5), (29, 19)]) \
+        == [(29, 19)]
+
+
+def test_inflation_layer():
+    from ..GMap import GMap
+    inflated_map = GMap(
+        params={
+            "width": 300,
+            "height": 200,
+            "resolution": 10,
+            "free_case_value": 1,
+            "obstacle_case_value": 1000,
+            "heuristics_multiplier": 1,
+            "inflation_radius": 20
+        }
+    )
+    changed = inflated_map.set_obstacles([(10, 10)])
+    assert len(changed) == 13
+    assert inflated_map.inflation_layer[12, 10]
+    assert inflated_map.inflation_layer[11, 11]
+    assert not inflated_map.inflation_layer[12, 12]
+    assert not inflated_map.inflation_layer[10, 10]
+    assert inflated_map.occupancy[10, 10]
+
+
+@pytest.fixture
+def decay_map():
+    from ..GMap import GMap
+    return GMap(
+        params={
+            "width": 300,
+            "height": 200,
+            "resolution": 10,
+            "free_case_value": 1,
+            "obstacle_case_value": 1000,
+            "heuristics_multiplier": 1,
+            "inflation_radius": 10,
+            "cost_decay_radius": 40,
+            "cost_decay_factor": 0.1
+        }
+    )
+
+
+def test_cost_decay(decay_map):
+    changed = decay_map.set_obstacles([(10, 10)])
+    assert (10, 10) in changed and (14, 10) in changed
+    assert (15, 10) not in changed
+    assert decay_map.occupancy[11, 10]
+    assert decay_map.cell_costs[12, 10] > decay_map.cell_costs[13, 10] > 1
+    assert decay_map.cell_costs[15, 10] == 1
+    assert decay_map.get_transition_cost((13, 10), (14, 10)) > \
+        decay_map.get_transition_cost((14, 10), (15, 10)) > 1
+
+
+def test_cost_decay_with_infinite_obstacle_cost(decay_map):
+    decay_map.obstacle_case_value = float("inf")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        decay_map.set_obstacles([(10, 10)])
+    assert decay_map.cell_costs[12, 10] == float("inf")
+    assert decay_map.cell_costs[15, 10] == 1
+    assert not np.isnan(decay_map.cell_costs).any()
+
+
+def test_incremental_cost_update(decay_map):
+    decay_map.set_obstacles([(10, 10)])
+    changed = decay_map.set_obstacles([(10, 10), (25, 15)])
+    assert all(abs(i - 25) <= 4 and abs(j - 15) <= 4 for i, j in changed)
+    assert decay_map.cell_costs[12, 10] > 1
+
+
+def test_custom_cost_decay(decay_map):
+    decay_map.set_obstacles([(10, 10)])
+    changed = decay_map.set_cost_decay(
+        lambda distance: np.where(distance <= 20, 5.0, 0.0))
+    assert decay_map.cell_costs[12, 10] == 6
+    assert decay_map.cell_costs[13, 10] == 1
+    assert (13, 10) in changed
+    assert (20, 10) not in changed
+
+
+def test_terrain_patch(layered_map):
+    changed = layered_map.set_terrain(np.full((2, 3), 4.0), origin=(5, 6))
+    assert sorted(changed) == [(5, 6), (5, 7), (5, 8),
+                               (6, 6), (6, 7), (6, 8)]
+    assert layered_map.cell_costs[6, 8] == 4
+    assert layered_map.get_transition_cost((4, 6), (5, 6)) == 2.5
+    assert layered_map.set_terrain(np.full((2, 3), 4.0), origin=(5, 6)) \
+        == []
+
+
+def test_terrain_under_obstacles(layered_map):
+    layered_map.set_obstacles([(5, 5)])
+    assert layered_map.set_terrain(np.full((1, 1), 3.0), (5, 5)) == []
+    assert layered_map.set_obstacles([]) == [(5, 5)]
+    assert layered_map.cell_costs[5, 5] == 3
+
+
+def test_terrain_does_not_fit(layered_map):
+    with pytest.raises(MapInitializationException):
+        layered_map.set_terrain(np.ones((5, 5)), origin=(28, 0))
+    with pytest.raises(MapInitializationException):
+        layered_map.set_terrain(-np.ones((5, 5)))
+    with pytest.raises(MapInitializationException):
+        layered_map.set_terrain(np.zeros((5, 5)))
+
+
+def test_load_terrain_image(layered_map, tmp_path):
+    path = tmp_path / "terrain.pgm"
+    pixels = np.zeros((20, 30), dtype=np.uint8)
+    pixels[10:, :15] = 255
+    with open(path, "wb") as stream:
+        stream.write(b"P5\n# slow zone\n30 20\n255\n" + pixels.tobytes())
+    layered_map.load_terrain_image(str(path), min_cost=1.0, max_cost=5.0)
+    assert layered_map.terrain[0, 10] == 5
+    assert layered_map.terrain[14, 19] == 5
+    assert layered_map.terrain[15, 10] == 1
+    assert layered_map.terrain[0, 9] == 1
+
+    path = tmp_path / "terrain.npy"
+    np.save(path, pixels[::2, ::2])
+    layered_map.load_terrain_image(str(path), min_cost=1.0, max_cost=3.0)
+    assert layered_map.terrain[0, 10] == 3
+    assert layered_map.terrain[16, 10] == 1
+
+
+def test_coors_to_indexes_batch(mock_map):
+    coors = np.array([[1456.25, 490.0], [0.0, 0.0], [2999.9, 1999.9]])
+    assert mock_map.coors_to_indexes_batch(coors).tolist() == \
+        [[291, 98], [0, 0], [599, 399]]
+    assert mock_map.coors_to_indexes_batch([[3000.0, -20.0]]).tolist() == \
+        [[599, 0]]
+    assert mock_map.coors_to_indexes_batch([[3000.0, 2000.0]],
+                                           clip=False).tolist() == \
+        [[600, 400]]
+
+
+def test_indexes_to_coors_batch(mock_map):
+    coors = mock_map.indexes_to_coors_batch([(356, 123), (0, 1)])
+    assert coors.tolist() == [[1780.0, 615.0], [0.0, 5.0]]
+
+
+def test_convert_obstacles_to_graph(mock_map):
+    obstacles = generate_obstacles()
+    expected = set()
+    for x, y, w in obstacles:
+        left, top = mock_map.coors_to_indexes(max(0.0, x - w / 2),
+                                              max(0.0, y - w / 2))
+        right, bottom = mock_map.coors_to_indexes(min(2999.0, x + w / 2),
+                                                  min(1999.0, y + w / 2))
+        expected.update((i, j) for i in range(left, right + 1)
+                        for j in range(top, bottom + 1))
+    converted = mock_map.convert_obstacles_to_graph(obstacles)
+    assert set(map(tuple, converted.tolist())) == expected
+
+
+def test_convert_obstacles_outside_map(mock_map):
+    assert mock_map.convert_obstacles_to_graph([]).shape == (0, 2)
+    assert mock_map.convert_obstacles_to_graph(
+        [(-100.0, 50.0, 10.0), (5000.0, 50.0, 10.0)]).shape == (0, 2)
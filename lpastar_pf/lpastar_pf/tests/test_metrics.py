@@ -0,0 +1,102 @@
+import pytest
+import json
+from lpastar_pf.metrics import PlannerMetrics, PlannerStats
+from lpastar_pf.tests.test_lpa_star_algo import MockAgent, MockSensor
+
+
+@pytest.fixture
+def path_finder():
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    return LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                             MockSensor([(125.0, 105.0, 30.0)]),
+                             {
+                                 "width": 300,
+                                 "height": 200,
+                                 "resolution": 10,
+                                 "free_case_value": 1,
+                                 "obstacle_case_value": 1000,
+                                 "heuristics_multiplier": 1,
+                                 "period": 0,
+                                 "timeout": 5
+                             })
+
+
+def test_disabled_by_default(path_finder):
+    path_finder.reset((255.0, 105.0))
+    path_finder.compute_shortest_path()
+    assert path_finder.metrics is None
+    assert path_finder.stats is None
+
+
+def test_compute_shortest_path_stats(path_finder):
+    metrics = path_finder.enable_metrics()
+    expanded = []
+    metrics.add_hook("expand", expanded.append)
+    path_finder.reset((255.0, 105.0))
+    path_finder.compute_shortest_path()
+
+    assert metrics.calls == 1
+    assert metrics.last.expansions == len(expanded) > 0
+    assert metrics.last.queue_pops == metrics.last.expansions
+    assert metrics.last.vertex_updates >= metrics.last.expansions
+    assert metrics.last.plan_ns > 0
+    assert metrics.last.extraction_ns > 0
+    assert path_finder.stats is None
+
+
+def test_find_path_stats(path_finder):
+    metrics = path_finder.enable_metrics()
+    calls = []
+    metrics.add_hook("call", calls.append)
+
+    def arrive(points):
+        path_finder.agent.position = (255.0, 105.0, 0.0)
+    path_finder.agent.follow_trajectory = arrive
+    path_finder.find_path((255.0, 105.0))
+
+    assert metrics.calls == len(calls) == 1
+    assert calls[0].changed_vertices == 16
+    assert calls[0].scan_ns > 0
+    assert calls[0].expansions > 0
+
+
+def test_unknown_hook():
+    with pytest.raises(ValueError):
+        PlannerMetrics().add_hook("pop", print)
+
+
+def test_stats_add():
+    stats = PlannerStats()
+    other = PlannerStats()
+    other.expansions = 3
+    other.plan_ns = 10
+    stats.add(other)
+    stats.add(other)
+    assert stats.as_dict()["expansions"] == 6
+    assert stats.as_dict()["plan_ns"] == 20
+
+
+def test_exports():
+    metrics = PlannerMetrics()
+    stats = metrics.start()
+    stats.expansions = 12
+    stats.queue_inserts = 5
+    stats.sent_waypoints = 7
+    stats.deferred_vertices = 4
+    stats.scan_ns = 2500000000
+    metrics.finish(stats)
+    metrics.finish(metrics.start())
+
+    text = metrics.to_prometheus()
+    assert "# TYPE lpastar_pf_expansions_total counter" in text
+    assert "lpastar_pf_calls_total 2" in text
+    assert "lpastar_pf_expansions_total 12" in text
+    assert 'lpastar_pf_queue_operations_total{operation="insert"} 5' in text
+    assert "lpastar_pf_sent_waypoints_total 7" in text
+    assert "lpastar_pf_deferred_vertices_total 4" in text
+    assert 'lpastar_pf_phase_seconds_total{phase="scan"} 2.5' in text
+
+    data = json.loads(metrics.to_json())
+    assert data["calls"] == 2
+    assert data["totals"]["expansions"] == 12
+    assert data["last"]["expansions"] == 0
@@ -0,0 +1,96 @@
+import pytest
+from lpastar_pf.PathCache import PathCache
+from .test_lpa_star_algo import MockAgent, MockSensor
+
+
+def test_lru_eviction():
+    cache = PathCache(2)
+    cache.put((0, 0), (1, 1), 0, [(0, 0), (1, 1)])
+    cache.put((0, 0), (2, 2), 0, [(0, 0), (1, 1), (2, 2)])
+    assert cache.get((0, 0), (1, 1), 0) == [(0, 0), (1, 1)]
+    cache.put((0, 0), (3, 3), 0, [(0, 0), (1, 2), (2, 3), (3, 3)])
+    assert len(cache) == 2
+    assert cache.get((0, 0), (2, 2), 0) is None
+    assert cache.get((0, 0), (1, 1), 1) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_invalidate_crossing_paths_only():
+    cache = PathCache(8)
+    cache.put((0, 0), (2, 0), 3, [(0, 0), (1, 0), (2, 0)])
+    cache.put((0, 1), (2, 1), 3, [(0, 1), (1, 1), (2, 1)])
+    cache.put((0, 2), (2, 2), 2, [(0, 2), (1, 2), (2, 2)])
+    cache.invalidate([(1, 0)], 4, decreased=False)
+    assert cache.get((0, 0), (2, 0), 4) is None
+    assert cache.get((0, 1), (2, 1), 4) == [(0, 1), (1, 1), (2, 1)]
+    # This path has missed the change of version 3.
+    assert cache.get((0, 2), (2, 2), 4) is None
+    # A cheaper vertex may shorten any path.
+    cache.invalidate([(5, 5)], 5)
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def path_finder():
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    return LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                             MockSensor([]),
+                             {"width": 300,
+                              "height": 200,
+                              "resolution": 10,
+                              "free_case_value": 1,
+                              "obstacle_case_value": 1000,
+                              "heuristics_multiplier": 1,
+                              "period": 0,
+                              "timeout": 5,
+                              "path_cache": 4})
+
+
+def test_map_version(path_finder):
+    version = path_finder.map.version
+    path_finder.map.set_obstacles([])
+    assert path_finder.map.version == version
+    path_finder.map.set_obstacles([(3, 3)])
+    assert path_finder.map.version == version + 1
+
+
+def test_repeated_queries(path_finder):
+    path = path_finder.plan((5.0, 105.0), (255.0, 105.0))
+    assert path_finder.cache.misses == 1
+    assert path_finder.plan((5.0, 105.0), (255.0, 105.0)) == path
+    assert path_finder.cache.hits == 1
+
+    # A change away from the path keeps it.
+    path_finder.update_vertices(path_finder.map.set_obstacles([(3, 3)]))
+    assert path_finder.plan((5.0, 105.0), (255.0, 105.0)) == path
+    assert path_finder.cache.hits == 2
+
+    # A change on the path invalidates it.
+    path_finder.update_vertices(path_finder.map.set_obstacles([(12, 10)]))
+    detour = path_finder.plan((5.0, 105.0), (255.0, 105.0))
+    assert (12, 10) not in detour
+    assert path_finder.cache.hits == 2
+
+
+def test_find_path_uses_cache(path_finder):
+    class MovingAgent(MockAgent):
+        def follow_trajectory(self, points):
+            super().follow_trajectory(points)
+            self.position = points[-1] + (0.0,)
+
+    path_finder.plan((5.0, 105.0), (255.0, 105.0))
+    path_finder.agent = MovingAgent((5.0, 105.0, 0.0))
+    path_finder.find_path((255.0, 105.0))
+    assert path_finder.cache.hits == 1
+    assert path_finder.agent.trajectories == [[(250.0, 100.0)]]
+
+
+def test_removed_wall_invalidates_detours(path_finder):
+    wall = [(12, j) for j in range(5, 16)]
+    path_finder.update_vertices(path_finder.map.set_obstacles(wall))
+    detour = path_finder.plan((5.0, 105.0), (255.0, 105.0))
+    assert (12, 10) not in detour
+    # The wall is removed off the detour, the straight line is back.
+    path_finder.update_vertices(path_finder.map.set_obstacles([]))
+    path = path_finder.plan((5.0, 105.0), (255.0, 105.0))
+    assert path == [(i, 10) for i in range(26)]
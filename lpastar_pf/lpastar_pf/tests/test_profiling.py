@@ -0,0 +1,80 @@
+import sys
+import pytest
+from lpastar_pf.profiling import SamplingProfiler, phase_of, \
+    synthetic_scenario
+from lpastar_pf.pf_exceptions import TimeoutException
+from .test_lpa_star_algo import WalkingAgent
+from .test_replay import MovingSensor
+
+
+def test_phase_of_innermost_frame():
+    search = [("LPAStarPathFinder", "find_path"),
+              ("LPAStarPathFinder", "compute_shortest_path"),
+              ("LPAStarPathFinder", "__search")]
+    update = search + [("LPAStarPathFinder", "__update_vertex")]
+    assert phase_of(update + [("CompactQueue", "remove")]) == "queue"
+    assert phase_of(update + [("LPAStarPathFinder", "__compute_rhs"),
+                              ("GMap", "get_transition_cost")]) == \
+        "update_vertex"
+    assert phase_of(search + [("GMap", "get_neighbours")]) == "search"
+    assert phase_of(search[:1] + [("GMap", "convert_obstacles_to_graph"),
+                                  ("GMap", "coors_to_indexes_batch")]) == \
+        "scan"
+    assert phase_of(search[:1] + [("MySensor", "scan")]) == "scan"
+    assert phase_of(search[:1]) == "other"
+
+
+def test_profile_synthetic_mission(tmp_path):
+    path_finder, goal = synthetic_scenario(30, 0, steps=100)
+    profiler = SamplingProfiler(0.0005)
+    profiler.start()
+    try:
+        path_finder.find_path(goal)
+    except TimeoutException:
+        pass
+    profiler.stop()
+    samples = sum(profiler.stacks.values())
+    assert samples > 0
+    assert sum(profiler.phases().values()) == samples
+    assert profiler.phases()["update_vertex"] > 0
+    # The frames above the caller of start are not kept.
+    assert all(stack[0] == ("LPAStarPathFinder", "find_path")
+               for stack in profiler.stacks)
+    rows = profiler.summary()
+    assert sum(row[2] for row in rows) == pytest.approx(1.0)
+    assert rows[0][1] == max(profiler.phases().values())
+
+    path = str(tmp_path / "profile.folded")
+    profiler.write_collapsed(path)
+    with open(path) as stream:
+        lines = stream.read().splitlines()
+    assert len(lines) == len(profiler.stacks)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == samples
+    assert all(line.startswith("LPAStarPathFinder:find_path")
+               for line in lines)
+
+
+def test_profile_recorded_session(tmp_path, monkeypatch, capsys):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..profiling import main
+    from ..replay import SessionRecorder
+    params = {"width": 300, "height": 200, "resolution": 10,
+              "free_case_value": 1, "obstacle_case_value": 1000,
+              "heuristics_multiplier": 1, "period": 0, "timeout": 5}
+    path = str(tmp_path / "session.jsonl.gz")
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    recorder = SessionRecorder(path)
+    recorder.attach(LPAStarPathFinder(agent, MovingSensor(agent), params),
+                    params)
+    recorder.find_path((255.0, 105.0))
+    recorder.close()
+    output = str(tmp_path / "session.folded")
+    monkeypatch.setattr(sys, "argv", ["profiling", "--session", path,
+                                      "--interval", "0.2",
+                                      "--output", output])
+    main()
+    printed = capsys.readouterr().out
+    assert printed.splitlines()[0].split()[0] == "phase"
+    assert "stacks written to " + output in printed
+    with open(output) as stream:
+        assert all(line.split()[-1].isdigit() for line in stream)
@@ -0,0 +1,151 @@
+import pytest
+import numpy as np
+from lpastar_pf.tests.test_lpa_star_algo import ScriptedSensor, \
+    WalkingAgent
+from lpastar_pf.storage import SparseGrid
+
+
+@pytest.fixture
+def big_map():
+    from ..GMap import GMap
+    return GMap(
+        params={
+            "width": 2000,
+            "height": 1000,
+            "resolution": 10,
+            "free_case_value": 1,
+            "obstacle_case_value": 1000,
+            "heuristics_multiplier": 1
+        }, static_obstacles=[(1000.0, 400.0 + 10 * k, 10.0)
+                             for k in range(61)]
+    )
+
+
+@pytest.fixture
+def horizon(big_map):
+    from ..RecedingHorizon import RecedingHorizon
+    horizon = RecedingHorizon(big_map, window=10, block=5, budget=50)
+    horizon.set_goal((190, 50))
+    return horizon
+
+
+def test_goal_inside_window(horizon):
+    path = horizon.plan((185, 48))
+    assert path[0] == (185, 48)
+    assert path[-1] == (190, 50)
+    assert len(path) == 6
+
+
+def test_path_beyond_window(horizon, big_map):
+    path = horizon.plan((10, 50))
+    assert path[0] == (10, 50)
+    assert path[-1] == (190, 50)
+    window = [v for v in path if abs(v[0] - 10) <= 10 and abs(v[1] - 50) <= 10]
+    assert window == path[:len(window)]
+    assert len(window) == 11
+    assert not any(big_map.occupancy[v] for v in path)
+
+
+def test_path_around_wall(horizon):
+    path = horizon.plan((95, 50))
+    assert path[-1] == (190, 50)
+    assert all(v[1] < 39 or v[1] > 100 or v[0] != 100 for v in path)
+
+
+def test_background_refresh(horizon, big_map):
+    cached = horizon.cost_to_go.copy()
+    # Only blocks without free vertex are impassable.
+    changed = big_map.set_obstacles([(i, j) for i in range(150, 200)
+                                     for j in range(60, 65)])
+    horizon.invalidate(changed)
+    steps = 1
+    while not horizon.step():
+        assert np.array_equal(horizon.cost_to_go, cached)
+        steps += 1
+    assert steps > 1
+    assert horizon.cost_to_go[150 // 5, 60 // 5] > cached[150 // 5, 60 // 5]
+
+
+def test_refresh_with_changes_at_every_step(horizon, big_map):
+    cached = horizon.cost_to_go.copy()
+    obstacles = [(i, j) for i in range(150, 200) for j in range(60, 65)]
+    horizon.invalidate(big_map.set_obstacles(obstacles))
+    # The map changes at every step, the refresh still finishes.
+    for k in range(100):
+        obstacles.extend((k, j) for j in range(80, 85))
+        horizon.invalidate(big_map.set_obstacles(obstacles))
+        horizon.step()
+        if not np.array_equal(horizon.cost_to_go, cached):
+            break
+    assert k < 99
+    assert horizon.cost_to_go[150 // 5, 60 // 5] > cached[150 // 5, 60 // 5]
+    # The last refresh takes every change into account.
+    while not horizon.step():
+        pass
+    assert horizon.cost_to_go[k // 5 - 1, 80 // 5] > \
+        cached[k // 5 - 1, 80 // 5]
+
+
+def test_find_path_in_horizon_mode():
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent,
+                                    ScriptedSensor(agent,
+                                                   [[(125.0, 105.0, 30.0)]]),
+                                    {
+                                        "width": 300,
+                                        "height": 200,
+                                        "resolution": 10,
+                                        "free_case_value": 1,
+                                        "obstacle_case_value": 1000,
+                                        "heuristics_multiplier": 1,
+                                        "period": 0,
+                                        "timeout": 5,
+                                        "horizon": 5,
+                                        "horizon_block": 4
+                                    })
+    path_finder.find_path((255.0, 105.0))
+
+    assert len(agent.trajectories) > 1
+    assert all(t[-1] == (250.0, 100.0) for t in agent.trajectories)
+    # The whole map is not allocated for the unused LPA* search.
+    assert isinstance(path_finder.g, SparseGrid)
+    assert len(path_finder.g) <= 1
+
+
+def test_obstacle_in_goal_block():
+    from ..GMap import GMap
+    from ..RecedingHorizon import RecedingHorizon
+    for obstacle_case_value in (1000, float("inf")):
+        _map = GMap(params={
+            "width": 400,
+            "height": 400,
+            "resolution": 10,
+            "free_case_value": 1,
+            "obstacle_case_value": obstacle_case_value,
+            "heuristics_multiplier": 1
+        }, static_obstacles=[(385.0, 385.0, 10.0)])
+        horizon = RecedingHorizon(_map, window=5)
+        horizon.set_goal((36, 36))
+        # The obstacle does not change the cost of its block.
+        assert horizon.cost_to_go[3, 4] == pytest.approx(8.0)
+        path = horizon.plan((2, 2))
+        assert path[-1] == (36, 36)
+
+
+def test_horizon_needs_sparse_storage():
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..pf_exceptions import MapInitializationException
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(WalkingAgent((5.0, 5.0, 0.0)),
+                          ScriptedSensor(None, [[]]),
+                          {"width": 300,
+                           "height": 200,
+                           "resolution": 10,
+                           "free_case_value": 1,
+                           "obstacle_case_value": 1000,
+                           "heuristics_multiplier": 1,
+                           "period": 0,
+                           "timeout": 5,
+                           "horizon": 5,
+                           "storage": "dense"})
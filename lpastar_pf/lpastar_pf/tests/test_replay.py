@@ -0,0 +1,114 @@
+import pytest
+from lpastar_pf.pf_exceptions import ReplayException
+from lpastar_pf.tests.test_lpa_star_algo import MockSensor, WalkingAgent
+
+
+class MovingSensor(MockSensor):
+
+    def __init__(self, agent):
+        super().__init__([])
+        self.agent = agent
+        self.scans = 0
+
+    def scan(self, origin):
+        self.agent.walk()
+        self.scans += 1
+        return [(125.0 + 10 * self.scans, 105.0, 30.0)]
+
+
+@pytest.fixture
+def session(params, tmp_path):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..replay import SessionRecorder
+    path = str(tmp_path / "session.jsonl.gz")
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent, MovingSensor(agent), params,
+                                    static_obstacles=[(55.0, 55.0, 10.0)])
+    recorder = SessionRecorder(path)
+    recorder.attach(path_finder, params)
+    recorder.find_path((255.0, 105.0))
+    recorder.close()
+    return path, agent
+
+
+def test_replay_is_identical(session):
+    from ..replay import replay_session
+    path, agent = session
+    replay_agent, recorded = replay_session(path)
+    assert len(agent.trajectories) > 1
+    assert recorded == agent.trajectories
+    assert replay_agent.trajectories == agent.trajectories
+
+
+def test_session_log(session):
+    from ..replay import SessionLog
+    path, agent = session
+    log = SessionLog(path)
+    assert log.params["width"] == 300
+    assert (5, 5) in log.static
+    assert log.next("goal")["goal"] == [255.0, 105.0]
+    assert log.next("scan")["obstacles"] == [[135.0, 105.0, 30.0]]
+    with pytest.raises(ReplayException):
+        log.next("goal")
+
+
+def test_log_without_header(tmp_path):
+    import gzip
+    from ..replay import SessionLog
+    path = str(tmp_path / "empty.jsonl.gz")
+    with gzip.open(path, "wt") as stream:
+        stream.write('{"type":"goal","goal":[1.0,2.0],"t":0}\n')
+    with pytest.raises(ReplayException):
+        SessionLog(path)
+
+
+def test_log_of_unclosed_session(params, tmp_path):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..replay import SessionLog, SessionRecorder, replay_session
+    path = str(tmp_path / "crash.jsonl.gz")
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent, MovingSensor(agent), params)
+    recorder = SessionRecorder(path)
+    recorder.attach(path_finder, params)
+    recorder.find_path((255.0, 105.0))
+    # The recorder is not closed, as when the node is killed.
+    replay_agent, recorded = replay_session(path)
+    assert recorded == agent.trajectories
+    assert replay_agent.trajectories == agent.trajectories
+
+    # A tail cut in the middle of the compressed data is ignored.
+    with open(path, "rb") as stream:
+        data = stream.read()
+    torn = str(tmp_path / "torn.jsonl.gz")
+    with open(torn, "wb") as stream:
+        stream.write(data[:-3])
+    assert SessionLog(torn).params["width"] == 300
+    recorder.close()
+
+
+def test_replay_of_rays(params, tmp_path):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..replay import SessionRecorder, replay_session
+    from .test_belief_grid import ScriptedRaySensor
+    path = str(tmp_path / "rays.jsonl.gz")
+    params["belief_grid"] = True
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    sensor = ScriptedRaySensor([([[55.0, 105.0 + 10 * k]
+                                  for k in range(-3, 4)], [True] * 7),
+                                ([[125.0, 105.0]], [False])])
+    sensor.scan_rays = walking(agent, sensor.scan_rays)
+    path_finder = LPAStarPathFinder(agent, sensor, params)
+    recorder = SessionRecorder(path)
+    recorder.attach(path_finder, params)
+    recorder.find_path((255.0, 105.0))
+    recorder.close()
+    replay_agent, recorded = replay_session(path)
+    assert recorded == agent.trajectories
+    assert replay_agent.trajectories == agent.trajectories
+
+
+def walking(agent, scan):
+    def walk_and_scan(origin):
+        agent.walk()
+        return scan(origin)
+    return walk_and_scan
@@ -0,0 +1,123 @@
+import pytest
+from math import inf
+from lpastar_pf.GMap import GMap
+from lpastar_pf.SafeIntervalPlanner import SafeIntervalPlanner, ALWAYS_SAFE
+from lpastar_pf.pf_exceptions import MapInitializationException
+from lpastar_pf.pf_exceptions import PathDoesNotExistException
+from .test_lpa_star_algo import MockAgent, MockSensor
+
+
+@pytest.fixture
+def params(params):
+    params["obstacle_case_value"] = float("inf")
+    return params
+
+
+def corridor(params):
+    # A corridor along the row j = 10, open at i = 15.
+    _map = GMap(params)
+    _map.set_static_obstacles([(i, j) for i in range(30)
+                               for j in range(20)
+                               if j != 10 and not (i == 15 and j < 10)])
+    return _map
+
+
+# An obstacle going up the side passage, it crosses the corridor
+# at (15, 10) around 10 ticks.
+CROSSING = [(155.0, 5.0, 8.0, 0.0, 10.0)]
+
+
+def test_free_corridor(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 10.0)
+    sipp.set_goal((29, 10))
+    sipp.predict([], 0.0)
+    schedule = sipp.plan((0, 10))
+    assert [v for v, _ in schedule] == [(i, 10) for i in range(30)]
+    assert schedule[-1][1] == pytest.approx(29.0)
+    assert sipp.leg(schedule) == [v for v, _ in schedule]
+
+
+def assert_safe(sipp, schedule):
+    # Arrivals are in seconds, intervals in ticks.
+    for v, arrival in schedule:
+        assert any(begin <= arrival / sipp.tick <= end for begin, end
+                   in sipp.intervals.get(v, ALWAYS_SAFE))
+
+
+def test_wait_for_crossing(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 10.0)
+    sipp.set_goal((29, 10))
+    sipp.predict(CROSSING, 0.0)
+    assert (15, 10) in sipp.intervals
+    schedule = sipp.plan((5, 10))
+    assert_safe(sipp, schedule)
+    # The obstacle passes before the agent crosses.
+    assert dict(schedule)[(15, 10)] >= 10.5 * sipp.tick
+    leg = sipp.leg(schedule)
+    assert leg[0] == (5, 10) and len(leg) < len(schedule)
+
+
+def test_fast_agent_crosses_first(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 20.0)
+    assert sipp.tick == 0.5
+    sipp.set_goal((29, 10))
+    sipp.predict(CROSSING, 0.0)
+    schedule = sipp.plan((5, 10))
+    assert_safe(sipp, schedule)
+    assert dict(schedule)[(15, 10)] == pytest.approx(5.0)
+
+
+def test_goal_in_last_interval(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 10.0)
+    sipp.set_goal((15, 10))
+    sipp.predict(CROSSING, 0.0)
+    assert sipp.intervals[(15, 10)] == ((0.0, 9.5), (10.5, inf))
+    # The goal could be reached at 5 ticks, before the obstacle.
+    schedule = sipp.plan((10, 10))
+    # The agent does not wait on the goal in the way of the obstacle.
+    assert schedule[-1][0] == (15, 10)
+    assert schedule[-1][1] >= 10.5 * sipp.tick
+
+
+def test_deviation(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 10.0)
+    sipp.predict(CROSSING, 0.0)
+    assert not sipp.deviates([(155.0, 25.0, 8.0, 0.0, 10.0)], 2.0)
+    assert sipp.deviates([(155.0, 5.0, 8.0, 0.0, 10.0)], 2.0)
+    assert sipp.deviates([], 2.0)
+
+
+def test_no_path(params):
+    sipp = SafeIntervalPlanner(corridor(params), 20.0, 10.0)
+    sipp.set_goal((15, 0))
+    sipp.predict([], 0.0)
+    with pytest.raises(PathDoesNotExistException):
+        sipp.plan((0, 0))
+
+
+def test_predictive_find_path(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["obstacle_case_value"] = 1000
+    params["prediction_horizon"] = 5.0
+    params["agent_speed"] = 10.0
+
+    class MovingAgent(MockAgent):
+        def follow_trajectory(self, points):
+            super().follow_trajectory(points)
+            self.position = points[-1] + (0.0,)
+
+    # A slow obstacle far from the path stays off the map.
+    sensor = MockSensor([(155.0, 15.0, 10.0, 0.0, -0.01)])
+    path_finder = LPAStarPathFinder(MovingAgent((5.0, 105.0, 0.0)),
+                                    sensor, params)
+    path_finder.find_path((255.0, 105.0))
+    assert path_finder.agent.trajectories == [[(250.0, 100.0)]]
+    assert path_finder.map.obstacles == []
+
+
+def test_predictive_mode_needs_speed(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["prediction_horizon"] = 5.0
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                          MockSensor([]), params)
@@ -0,0 +1,38 @@
+import numpy as np
+from lpastar_pf.storage import SparseGrid, allocate_grid, grid_nbytes, \
+    reset_grid
+
+
+def test_sparse_grid_default():
+    grid = SparseGrid(np.inf)
+    assert grid[3][4] == np.inf
+    assert len(grid) == 0
+    grid[3][4] = 1.5
+    assert grid[3][4] == 1.5
+    assert len(grid) == 1
+
+
+def test_allocate_grid():
+    dense = allocate_grid((30, 20), -1, False)
+    assert (len(dense), len(dense[0])) == (30, 20)
+    assert dense[29][19] == -1
+    assert grid_nbytes(dense) > 600 * 8
+
+    sparse = allocate_grid((30, 20), -1, True)
+    assert isinstance(sparse, SparseGrid)
+    assert sparse[29][19] == -1
+    empty = grid_nbytes(sparse)
+    sparse[1][1] = 2
+    assert grid_nbytes(sparse) > empty
+
+
+def test_reset_grid():
+    dense = allocate_grid((3, 2), 0.0, False)
+    dense[2][1] = 5.0
+    reset_grid(dense, np.inf)
+    assert dense == [[np.inf] * 2] * 3
+
+    sparse = allocate_grid((3, 2), np.inf, True)
+    sparse[2][1] = 5.0
+    reset_grid(sparse, np.inf)
+    assert len(sparse) == 0 and sparse[2][1] == np.inf
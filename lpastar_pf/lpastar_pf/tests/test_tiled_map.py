@@ -0,0 +1,154 @@
+import pytest
+import numpy as np
+from lpastar_pf.TiledGMap import TiledGMap
+from lpastar_pf.pf_exceptions import MapInitializationException
+from .test_lpa_star_algo import MockAgent, MockSensor, ScriptedSensor, \
+    WalkingAgent
+
+
+@pytest.fixture
+def params():
+    return {
+        "resolution": 10,
+        "free_case_value": 1,
+        "obstacle_case_value": 1000,
+        "heuristics_multiplier": 1,
+        "tile_size": 8,
+        "period": 0,
+        "timeout": 5
+    }
+
+
+def test_tiles_are_lazy(params):
+    tiled = TiledGMap(params)
+    assert len(tiled.tiles) == 0
+    assert tiled.get_transition_cost((-100, 5000), (-99, 5000)) == 1
+    assert len(tiled.tiles) == 0
+
+    changed = tiled.set_obstacles([(-3, 2), (20, 20)])
+    assert sorted(changed) == [(-3, 2), (20, 20)]
+    assert set(tiled.tiles) == {(-1, 0), (2, 2)}
+    assert tiled.get_transition_cost((-4, 2), (-3, 2)) == 1000
+
+    changed = tiled.set_obstacles([(20, 20)])
+    assert changed == [(-3, 2)]
+    assert tiled.obstacles == [(20, 20)]
+
+
+def test_negative_coordinates(params):
+    tiled = TiledGMap(params)
+    assert tiled.coors_to_indexes(-5.0, 15.0) == (-1, 1)
+    indexes = tiled.convert_obstacles_to_graph([(-5.0, 15.0, 0.0)])
+    assert indexes.tolist() == [[-1, 1]]
+
+
+def test_bounded(params):
+    params["width"] = 100
+    params["height"] = 50
+    tiled = TiledGMap(params)
+    assert len(tiled.get_neighbours((0, 0))) == 3
+    assert tiled.set_obstacles([(-1, 0), (10, 0), (9, 4)]) == [(9, 4)]
+    with pytest.raises(MapInitializationException):
+        tiled.set_terrain(np.ones((2, 2)), origin=(9, 4))
+    with pytest.raises(MapInitializationException):
+        tiled.set_terrain(np.zeros((2, 2)), origin=(0, 0))
+
+
+def test_terrain_across_tiles(params):
+    tiled = TiledGMap(params)
+    changed = tiled.set_terrain(np.full((4, 4), 3.0), origin=(6, 6))
+    assert len(changed) == 16
+    assert len(tiled.tiles) == 4
+    assert tiled.get_transition_cost((7, 7), (8, 7)) == 3.0
+
+
+def test_drop_far_tiles(params):
+    params["max_tiles"] = 1
+    params["tile_keep_radius"] = 0
+    tiled = TiledGMap(params)
+    tiled.set_agents([(0, 0)])
+    changed = tiled.set_static_obstacles([(1, 1), (100, 100)])
+    assert set(changed) == {(1, 1), (100, 100)}
+    assert list(tiled.tiles) == [(0, 0)]
+    assert tiled.get_transition_cost((99, 100), (100, 100)) == 1
+
+    tiled.set_terrain(np.full((1, 1), 2.0), origin=(50, 50))
+    assert tiled.set_obstacles([]) == [(50, 50)]
+
+
+def test_spill_far_tiles(params, tmp_path):
+    params["max_tiles"] = 1
+    params["tile_keep_radius"] = 0
+    params["tile_spill_directory"] = str(tmp_path)
+    tiled = TiledGMap(params)
+    tiled.set_agents([(0, 0)])
+    tiled.set_static_obstacles([(1, 1), (100, 100)])
+    assert list(tiled.tiles) == [(0, 0)]
+    assert tiled.spilled == {(12, 12)}
+    # A read reloads the tile, which is evicted again.
+    assert tiled.get_transition_cost((99, 100), (100, 100)) == 1000
+    assert list(tiled.tiles) == [(0, 0)]
+    assert tiled.spilled == {(12, 12)}
+
+    tiled.set_agents([(100, 100)])
+    assert tiled.get_transition_cost((99, 100), (100, 100)) == 1000
+    assert list(tiled.tiles) == [(12, 12)]
+    assert tiled.spilled == {(0, 0)}
+
+
+def test_search_across_spilled_tiles(params, tmp_path):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["max_tiles"] = 1
+    params["tile_keep_radius"] = 0
+    params["tile_spill_directory"] = str(tmp_path)
+    params["metrics"] = True
+    path_finder = LPAStarPathFinder(MockAgent((-95.0, 5.0, 0.0)),
+                                    MockSensor([]), params)
+    walls = [(k, j) for k in (0, 10, 20) for j in range(-5, 6)]
+    path_finder.map.set_static_obstacles(walls)
+    assert len(path_finder.map.spilled) >= 3
+    tiles = []
+    path_finder.metrics.add_hook(
+        "expand", lambda v: tiles.append(len(path_finder.map.tiles)))
+    path_finder.reset((305.0, 5.0))
+    path = path_finder.compute_shortest_path()
+    assert path[-1] == (30, 0)
+    assert not set(path) & set(walls)
+    assert max(tiles) <= 1
+
+
+def test_search_across_tiles(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    path_finder = LPAStarPathFinder(MockAgent((-95.0, 5.0, 0.0)),
+                                    MockSensor([]), params)
+    path_finder.map.set_static_obstacles([(0, j) for j in range(-5, 6)])
+    path_finder.reset((205.0, 5.0))
+    path = path_finder.compute_shortest_path()
+    assert path[0] == (-10, 0)
+    assert path[-1] == (20, 0)
+    assert not any(i == 0 and -5 <= j <= 5 for i, j in path)
+    assert len(path_finder.g) < 2000
+
+
+def test_find_path_with_scanned_obstacles(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    agent = WalkingAgent((-95.0, 5.0, 0.0))
+    # A wall on the way, and an obstacle far from the explored region.
+    scan = [(5.0, 5.0 + 10 * j, 10.0) for j in range(-5, 6)] + \
+        [(5005.0, -3005.0, 10.0)]
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [scan]),
+                                    params)
+    path_finder.find_path((205.0, 5.0))
+    # The trajectory goes around the wall.
+    assert len(agent.trajectories[0]) > 1
+    assert any(abs(y) > 50.0 for _, y in agent.trajectories[0])
+    path_finder.update_vertices([(-700, 900)])
+    assert path_finder.rhs[-700][900] == float("inf")
+
+
+def test_tiled_needs_sparse_storage(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["storage"] = "dense"
+    with pytest.raises(MapInitializationException):
+        LPAStarPathFinder(MockAgent((5.0, 5.0, 0.0)), MockSensor([]),
+                          params)
@@ -0,0 +1,98 @@
+import itertools
+import pytest
+import numpy as np
+from lpastar_pf.GMap import GMap
+from lpastar_pf.tour import cost_matrix, order_tour, tour_cost
+from .test_landmarks import dijkstra, maze
+from .test_lpa_star_algo import MockAgent, ScriptedSensor, WalkingAgent
+
+
+def test_cost_matrix(params):
+    _map = GMap(params)
+    _map.set_static_obstacles(maze())
+    start, goals = (0, 10), [(28, 10), (12, 2), (20, 18)]
+    costs = cost_matrix(_map, start, goals)
+    assert costs.shape == (4, 4)
+    vertices = [start] + goals
+    for a, source in enumerate(vertices):
+        reference = dijkstra(_map, source)
+        for b, target in enumerate(vertices):
+            assert costs[a, b] == pytest.approx(reference[target])
+
+
+def test_order_is_optimal_on_small_tours():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        points = rng.uniform(0, 100, (7, 2))
+        costs = np.linalg.norm(points[:, None] - points[None], axis=2)
+        best = min(tour_cost(costs, order)
+                   for order in itertools.permutations(range(1, 7)))
+        order = order_tour(costs, 1.0)
+        assert sorted(order) == list(range(1, 7))
+        assert tour_cost(costs, order) <= best * 1.1
+
+
+def test_two_opt_improves_nearest_neighbour():
+    # The nearest goal first leaves the far end of the line for last.
+    points = np.array([[0.0], [1.0], [-2.0], [4.0], [-8.0]])
+    costs = np.abs(points - points.T)
+    assert order_tour(costs, 0.0) == [1, 2, 3, 4]
+    order = order_tour(costs, 1.0)
+    assert tour_cost(costs, order) < tour_cost(costs, [1, 2, 3, 4])
+    assert tour_cost(costs, order) == 16.0
+
+
+def test_unreachable_goal_is_last():
+    costs = np.array([[0.0, 1.0, np.inf, 2.0],
+                      [1.0, 0.0, np.inf, 1.0],
+                      [np.inf, np.inf, 0.0, np.inf],
+                      [2.0, 1.0, np.inf, 0.0]])
+    assert order_tour(costs, 1.0) == [1, 3, 2]
+
+
+def test_find_tour(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [[]]),
+                                    params)
+    path_finder.map.set_static_obstacles(maze())
+    goals = [(285.0, 105.0), (125.0, 25.0), (45.0, 185.0)]
+    order = path_finder.find_tour(goals)
+    assert order == [(45.0, 185.0), (125.0, 25.0), (285.0, 105.0)]
+    x, y, _ = agent.position
+    assert (x - 285.0) ** 2 + (y - 105.0) ** 2 <= 10.0 ** 2
+    assert (len(path_finder.g), len(path_finder.g[0])) == (30, 20)
+
+
+def test_tour_with_infinite_obstacle_cost(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    params["obstacle_case_value"] = float("inf")
+    agent = WalkingAgent((5.0, 105.0, 0.0))
+    path_finder = LPAStarPathFinder(agent, ScriptedSensor(agent, [[]]),
+                                    params)
+    path_finder.map.set_static_obstacles(maze())
+    goals = [(285.0, 105.0), (125.0, 25.0), (45.0, 185.0)]
+    assert path_finder.find_tour(goals) == \
+        [(45.0, 185.0), (125.0, 25.0), (285.0, 105.0)]
+
+    # A goal walled in is visited last.
+    path_finder.map.set_static_obstacles(
+        maze() + [(i, 15) for i in range(5)]
+        + [(4, j) for j in range(16, 20)])
+    costs = cost_matrix(path_finder.map, (0, 10),
+                        [(2, 18), (28, 10), (4, 2)])
+    assert np.isinf(costs[0, 1]) and np.isfinite(costs[0, 2:]).all()
+    agent.position = (5.0, 105.0, 0.0)
+    order = path_finder.order_tour([(25.0, 185.0), (285.0, 105.0),
+                                    (45.0, 25.0)])
+    assert order[-1] == (25.0, 185.0)
+
+
+def test_find_tour_needs_gmap(params):
+    from ..LPAStarPathFinder import LPAStarPathFinder
+    from ..pf_exceptions import MapInitializationException
+    params["tile_size"] = 8
+    path_finder = LPAStarPathFinder(MockAgent((5.0, 105.0, 0.0)),
+                                    ScriptedSensor(None, [[]]), params)
+    with pytest.raises(MapInitializationException):
+        path_finder.order_tour([(15.0, 15.0), (25.0, 25.0)])
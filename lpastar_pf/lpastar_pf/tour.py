@@ -0,0 +1,103 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.landmarks import cost_field
+from typing import List, Sequence, Tuple
+import time
+import numpy as np
+
+
+def cost_matrix(_map: GMap,
+                start: Tuple[int, int],
+                goals: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """ Computes the costs of the shortest paths between the start and
+        the goals. The transition costs are symmetric, so the cost field
+        of a goal gives its costs from the start and from every other
+        goal at once: one search per goal fills a row and a column.
+
+    Args:
+        _map (GMap):
+            The map
+        start (Tuple[int, int]):
+            The start vertex
+        goals (Sequence[Tuple[int, int]]):
+            The goal vertices
+
+    Returns:
+        np.ndarray: A **(n + 1) x (n + 1)** matrix of path costs, the
+        start first then the goals in their order
+    """
+    vertices = [start] + list(goals)
+    columns, rows = np.array(vertices).T
+    costs = np.zeros((len(vertices), len(vertices)))
+    for k, goal in enumerate(goals, 1):
+        costs[:, k] = cost_field(_map, goal)[columns, rows]
+    costs[1:, 0] = costs[0, 1:]
+    return costs
+
+
+def order_tour(costs: np.ndarray, budget: float) -> List[int]:
+    """ Orders the visits of the goals from the start, which is not
+        returned to. The nearest goal is visited next, then the order
+        is improved by 2-opt: a part of the tour is visited in reverse
+        order while this makes the tour shorter and **budget** seconds
+        have not passed. Unreachable goals are visited last.
+
+    Args:
+        costs (np.ndarray):
+            A matrix given by **cost_matrix**
+        budget (float):
+            The time allowed to improve the order, in seconds
+
+    Returns:
+        List[int]: The indices of the goals in **costs**, from 1, in
+        the visiting order
+    """
+    deadline = time.perf_counter() + budget
+    count = len(costs)
+    finite = costs[np.isfinite(costs)]
+    # Unreachable goals cost more than any tour of reachable ones.
+    penalty = (finite.max() + 1) * count if len(finite) > 0 else 1.0
+    costs = np.where(np.isfinite(costs), costs, penalty)
+
+    tour = [0]
+    left = set(range(1, count))
+    while left:
+        tour.append(min(left, key=lambda k: (costs[tour[-1], k], k)))
+        left.remove(tour[-1])
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, count - 1):
+            a, b = tour[i - 1], tour[i]
+            for k in range(i + 1, count):
+                c = tour[k]
+                # The reversed part ends the tour if k is the last goal.
+                e = tour[k + 1] if k + 1 < count else None
+                delta = costs[a, c] - costs[a, b]
+                if e is not None:
+                    delta += costs[b, e] - costs[c, e]
+                if delta < -1e-9:
+                    tour[i:k + 1] = reversed(tour[i:k + 1])
+                    b = tour[i]
+                    improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return tour[1:]
+
+
+def tour_cost(costs: np.ndarray, order: Sequence[int]) -> float:
+    """ Computes the cost of visiting the goals in **order** from the
+        start.
+
+    Args:
+        costs (np.ndarray):
+            A matrix given by **cost_matrix**
+        order (Sequence[int]):
+            The indices of the goals in **costs**
+
+    Returns:
+        float: The sum of the costs of the legs
+    """
+    stops = [0] + list(order)
+    return float(sum(costs[stops[k], stops[k + 1]]
+                     for k in range(len(stops) - 1)))
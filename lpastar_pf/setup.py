@@ -5,6 +5,7 @@ setup(
     version='0.0.1',
     install_requires=[
         'importlib-metadata; python_version == "3.8"',
+        'numpy',
     ],
     packages=find_packages(
         where='.',
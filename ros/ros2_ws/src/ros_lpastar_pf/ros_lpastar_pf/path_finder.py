@@ -5,8 +5,8 @@ from rclpy.node import Node
 from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
 from lpastar_pf.pf_exceptions import MapInitializationException
 from lpastar_pf.pf_exceptions import TimeoutException
-from typing import Dict
-from pf_interfaces.srv import Goal
+from typing import Dict, Tuple
+from pf_interfaces.srv import Goal, Tour
 import sys
 import yaml
 
@@ -20,6 +20,9 @@ class PathFinder(Node):
         self.path_service = self.create_service(Goal,
                                                 "pf_path_finder",
                                                 self.path_finder_callback)
+        self.tour_service = self.create_service(Tour,
+                                                "pf_tour",
+                                                self.tour_callback)
         try:
             self.path_finder = LPAStarPathFinder(
                 agent=self.agent_client,
@@ -33,11 +36,39 @@ class PathFinder(Node):
             exit(1)
         self.goal = None
 
+        # Sessions are recorded to be replayed with
+        # lpastar_pf.replay.replay_session.
+        self.recorder = None
+        if params.get("record_session"):
+            from lpastar_pf.replay import SessionRecorder
+            self.recorder = SessionRecorder(params["record_session"])
+            self.recorder.attach(self.path_finder, params)
+
     def path_finder_callback(self, request, response) -> None:
+        response.status = self.go_to((request.x, request.y))
+        return response
+
+    def tour_callback(self, request, response) -> None:
+        # The legs are run by the same planner, in the order which
+        # minimizes the cost of the tour. The statuses of the legs
+        # are combined.
+        goals = list(zip(request.xs, request.ys))
+        order = self.path_finder.order_tour(goals)
+        status = 0
+        for goal in order:
+            status |= self.go_to(goal)
+        response.status = status
+        response.xs = [x for x, _ in order]
+        response.ys = [y for _, y in order]
+        return response
+
+    def go_to(self, goal: Tuple[float, float]) -> int:
         status = 0
-        goal = (request.x, request.y)
         try:
-            self.path_finder.find_path(goal)
+            if self.recorder is not None:
+                self.recorder.find_path(goal)
+            else:
+                self.path_finder.find_path(goal)
         except TimeoutException:
             self.get_logger().info("Path-finder timeout \
                                     exceeded for goal (%f, %f)",
@@ -52,8 +83,7 @@ class PathFinder(Node):
                                     actual position is (%f, %f)",
                                    goal[0], goal[1], x, y)
             status += 2
-        response.status = status
-        return response
+        return status
 
 
 def main(args=None):
@@ -72,7 +102,11 @@ def main(args=None):
 
     pf = PathFinder(params)
 
-    rclpy.spin(pf)
+    try:
+        rclpy.spin(pf)
+    finally:
+        if pf.recorder is not None:
+            pf.recorder.close()
     rclpy.shutdown()
 
 
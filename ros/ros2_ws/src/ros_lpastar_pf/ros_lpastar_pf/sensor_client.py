@@ -18,4 +18,8 @@ class SensorClient(Node, ASensor):
     def scan(self, origin: Tuple[float, float, float]) -> Iterable[Tuple[float, float, float]]:
         self.scan_req.origin = [origin[0], origin[1], origin[2]]
         res = self.scan_req.call(self.scan_req)
+        # Velocities are optional, only moving obstacles are predicted.
+        if len(res.obstacles_vxs) == len(res.obstacles_xs):
+            return [(res.obstacles_xs[i], res.obstacles_ys[i], res.obstacles_ws[i],
+                     res.obstacles_vxs[i], res.obstacles_vys[i]) for i in range(len(res.obstacles_xs))]
         return [(res.obstacles_xs[i], res.obstacles_ys[i], res.obstacles_ws[i]) for i in range(len(res.obstacles_xs))]
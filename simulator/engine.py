@@ -0,0 +1,269 @@
+from lpastar_pf.GMap import GMap
+from lpastar_pf.LPAStarPathFinder import LPAStarPathFinder
+from lpastar_pf.clock import VirtualClock
+from lpastar_pf.landmarks import cost_field
+from lpastar_pf.pf_exceptions import TimeoutException
+from simulator.robot import SimAgent
+from simulator.sensor import RaySensor
+from simulator.terrain import MovingObstacle, Terrain
+from typing import Any, Callable, Dict, List
+from math import cos, inf, pi, sin
+import time
+import numpy as np
+
+
+class Simulation:
+
+    """ A headless closed loop between the planner and a simulated
+    world. Time is virtual: the planner runs with **clock** and the
+    world advances while the planner sleeps between two periods, so
+    the loop runs as fast as the planner computes. The wall time spent
+    by the planner between two sleeps is recorded as its latency.
+
+    Attributes
+    ----------
+    terrain: Terrain
+        The static world.
+    agent: SimAgent
+        The simulated robot.
+    obstacles: List[MovingObstacle]
+        The moving obstacles.
+    sensor: RaySensor
+        The sensor of the robot.
+    clock: VirtualClock
+        The clock of the planner, which steps the simulation.
+    time: float
+        The virtual time, in seconds.
+    steps: int
+        The number of steps.
+    collisions: int
+        The number of steps which ended with the robot on an occupied
+        case or in a moving obstacle.
+    latencies: List[float]
+        The wall time between consecutive steps, in seconds.
+    listeners: List[Callable[[Simulation], None]]
+        Called after each step, by a viewer for instance.
+
+    Methods
+    -------
+
+    step(dt):
+        Advances the world.
+    __collides():
+        Tells if the robot is on an obstacle.
+    """
+
+    def __init__(self, terrain: Terrain, agent: SimAgent,
+                 obstacles: List[MovingObstacle], rays: int,
+                 max_range: float) -> None:
+        """ Initializes the simulation at virtual time 0.
+
+        Args:
+            terrain (Terrain):
+                The static world
+            agent (SimAgent):
+                The simulated robot
+            obstacles (List[MovingObstacle]):
+                The moving obstacles
+            rays (int):
+                The number of rays of the sensor
+            max_range (float):
+                The range of the sensor, in world units
+        """
+        self.terrain = terrain
+        self.agent = agent
+        self.obstacles = obstacles
+        self.time = 0.0
+        self.steps = 0
+        self.collisions = 0
+        self.latencies = []
+        self.listeners = []
+        self.sensor = RaySensor(terrain, obstacles, rays, max_range)
+        self.clock = VirtualClock()
+        self.clock.listeners.append(self.step)
+        self.__last = None
+
+    def step(self, dt: float) -> None:
+        """ Moves the obstacles and the robot for **dt** seconds and
+            calls the listeners.
+
+        Args:
+            dt (float):
+                The duration, in seconds
+        """
+        if self.__last is not None:
+            self.latencies.append(time.perf_counter() - self.__last)
+        self.time = self.clock.now_ns() / 1e9
+        self.steps += 1
+        for obstacle in self.obstacles:
+            obstacle.advance(dt, self.terrain.width, self.terrain.height)
+        self.agent.advance(dt)
+        if self.__collides():
+            self.collisions += 1
+        for listener in self.listeners:
+            listener(self)
+        self.__last = time.perf_counter()
+
+    def __collides(self) -> bool:
+        """ Tells if the robot is on an occupied case or in a moving
+            obstacle.
+
+        Returns:
+            bool: True if the robot collides
+        """
+        x, y, _ = self.agent.get_position()
+        return self.terrain.is_occupied(x, y) or \
+            any(obstacle.contains(x, y) for obstacle in self.obstacles)
+
+
+def planner_params(config: Dict[str, Any]) -> Dict[str, Any]:
+    """ Gets the parameters of the planner from the simulator
+        configuration: the **planner** section, with the dimensions of
+        the world, a period of **dt** and a timeout of **mission_time**
+        seconds, both in virtual time.
+
+    Args:
+        config (Dict[str, Any]):
+            The simulator configuration
+
+    Returns:
+        Dict[str, Any]: The parameters of LPAStarPathFinder
+    """
+    params = dict(config.get("planner", {}))
+    params.update(width=config["width"], height=config["height"],
+                  resolution=config["case_size"],
+                  period=config.get("dt", 0.1) * 1000,
+                  timeout=config.get("mission_time", 120.0))
+    return params
+
+
+def run_mission(config: Dict[str, Any], rng: np.random.Generator,
+                listeners: List[Callable[[Simulation], None]] = ()
+                ) -> Dict[str, Any]:
+    """ Generates a random world and makes a new planner drive the
+        robot to a random reachable goal.
+
+    Args:
+        config (Dict[str, Any]):
+            The simulator configuration
+        rng (np.random.Generator):
+            The random generator
+        listeners=() (List[Callable[[Simulation], None]]):
+            Called after each step of the simulation
+
+    Returns:
+        Dict[str, Any]: The outcome of the mission: **reached**,
+        virtual **time**, **steps**, **collisions**, **distance**
+        driven, **wall** time and **latencies**
+    """
+    params = planner_params(config)
+    resolution = config["case_size"]
+    while True:
+        terrain = Terrain.random(config["width"], config["height"],
+                                 resolution, config.get("density", 0.1),
+                                 rng)
+        free = terrain.free_cases()
+        start = tuple(free[rng.integers(len(free))])
+        _map = GMap(params)
+        _map.set_static_obstacles(terrain.obstacles())
+        costs = cost_field(_map, start)[free[:, 0], free[:, 1]]
+        far = np.abs(free - start).max(axis=1) >= \
+            config.get("min_goal_distance", 10)
+        # Unreachable cases cost at least an obstacle, or are infinite
+        # with an infinite obstacle cost.
+        reachable = np.isfinite(costs) & \
+            (costs < params["obstacle_case_value"])
+        goals = free[reachable & far]
+        if len(goals) > 0:
+            break
+    goal = terrain.center(*goals[rng.integers(len(goals))])
+
+    x, y = terrain.center(*start)
+    obstacles = []
+    width = config.get("obstacle_width", 2 * resolution)
+    while len(obstacles) < config.get("moving_obstacles", 0):
+        ox = rng.uniform(width / 2, terrain.width - width / 2)
+        oy = rng.uniform(width / 2, terrain.height - width / 2)
+        if abs(ox - x) < 2 * width and abs(oy - y) < 2 * width:
+            continue
+        heading = rng.uniform(0, 2 * pi)
+        speed = config.get("obstacle_speed", 0.0)
+        obstacles.append(MovingObstacle(ox, oy, width,
+                                        speed * cos(heading),
+                                        speed * sin(heading)))
+
+    agent = SimAgent((x, y, 0.0), config.get("agent_speed", 100.0),
+                     config.get("turn_rate", inf))
+    simulation = Simulation(terrain, agent, obstacles,
+                            config.get("rays", 90),
+                            config.get("sensor_range", 10 * resolution))
+    simulation.listeners.extend(listeners)
+    path_finder = LPAStarPathFinder(agent, simulation.sensor, params,
+                                    clock=simulation.clock)
+    if config.get("known_terrain", True):
+        path_finder.map.set_static_obstacles(terrain.obstacles())
+
+    begin = time.perf_counter()
+    try:
+        path_finder.find_path(goal)
+        reached = True
+    except TimeoutException:
+        reached = False
+    return {
+        "reached": reached,
+        "time": simulation.time,
+        "steps": simulation.steps,
+        "collisions": simulation.collisions,
+        "distance": agent.odometer,
+        "wall": time.perf_counter() - begin,
+        "latencies": simulation.latencies
+    }
+
+
+def soak(config: Dict[str, Any], missions: int, seed: int = 0,
+         listeners: List[Callable[[Simulation], None]] = ()
+         ) -> List[Dict[str, Any]]:
+    """ Runs **missions** random missions one after the other.
+
+    Args:
+        config (Dict[str, Any]):
+            The simulator configuration
+        missions (int):
+            The number of missions
+        seed=0 (int):
+            The seed of the random generator
+        listeners=() (List[Callable[[Simulation], None]]):
+            Called after each step of the simulations
+
+    Returns:
+        List[Dict[str, Any]]: The outcomes of the missions
+    """
+    rng = np.random.default_rng(seed)
+    return [run_mission(config, rng, listeners) for _ in range(missions)]
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """ Aggregates the outcomes of missions: success rate, collisions,
+        throughput and percentiles of the planner latency.
+
+    Args:
+        results (List[Dict[str, Any]]):
+            The outcomes given by **run_mission**
+
+    Returns:
+        Dict[str, float]: The statistics, latencies in milliseconds
+    """
+    latencies = np.concatenate([result["latencies"] for result in results]
+                               + [np.zeros(0)]) * 1e3
+    wall = sum(result["wall"] for result in results)
+    summary = {
+        "missions": len(results),
+        "reached": sum(result["reached"] for result in results),
+        "collisions": sum(result["collisions"] for result in results),
+        "virtual_time": sum(result["time"] for result in results),
+        "missions_per_hour": len(results) * 3600 / wall if wall else inf,
+    }
+    for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+        summary["latency_" + name] = float(np.percentile(latencies, q)) \
+            if len(latencies) else 0.0
+    return summary
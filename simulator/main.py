@@ -1,36 +1,55 @@
-import pygame
+""" Runs random missions of the planner in the headless simulator and
+prints their statistics. The missions run as fast as the planner
+computes, unless they are drawn with --view, which needs pygame.
+
+Usage:
+    PYTHONPATH=lpastar_pf:. python -m simulator.main [--missions N]
+        [--seed S] [--config PATH] [--view]
+"""
+from simulator.engine import soak, summarize
+import argparse
+import os
 import sys
 import yaml
 
 
-if __name__ == "__main__":
-    data = None
-    with open("config/simulator_config.yaml") as config:
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missions", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", default=os.path.join(
+        os.path.dirname(__file__), "config", "simulator_config.yaml"))
+    parser.add_argument("--view", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.config) as config:
         try:
             data = yaml.safe_load(config)
         except yaml.YAMLError as err:
             print(err)
+            sys.exit(1)
 
-    width, height = data["width"], data["height"]
-    size = (data["width"], data["height"])
-
-    background = (80, 80, 80)
-    clear_color = (255, 255, 255)
-    obstacle_color = (0, 0, 0)
-    robot_color = (255, 0, 0)
-
-    pygame.init()
-    screen = pygame.display.set_mode(size)
-
-    case_size = data["case_size"]
+    listeners = []
+    if args.view:
+        try:
+            from simulator.viewer import Viewer
+        except ImportError:
+            print("The viewer needs pygame")
+            sys.exit(1)
+        listeners.append(Viewer(data["width"], data["height"],
+                                data.get("dt", 0.1)))
+
+    missions = args.missions or data.get("missions", 10)
+    summary = summarize(soak(data, missions, args.seed, listeners))
+    print("missions: %d, reached: %d, collisions: %d"
+          % (summary["missions"], summary["reached"],
+             summary["collisions"]))
+    print("virtual time: %.1f s, missions per hour: %.0f"
+          % (summary["virtual_time"], summary["missions_per_hour"]))
+    print("latency (ms): p50 %.2f, p95 %.2f, p99 %.2f, max %.2f"
+          % (summary["latency_p50"], summary["latency_p95"],
+             summary["latency_p99"], summary["latency_max"]))
 
-    while 1:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit(0)
 
-        screen.fill(background)
-        for i in range(0, height, case_size):
-            for j in range(0, width, case_size):
-                pygame.draw.rect(screen, clear_color, pygame.Rect((j+1, i+1), (case_size-2, case_size-2)))
-        pygame.display.flip()
+if __name__ == "__main__":
+    main()
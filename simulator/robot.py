@@ -1 +1,127 @@
-pass
+from lpastar_pf.GAgent import GAgent
+from typing import Iterable, List, Tuple
+from math import atan2, cos, hypot, inf, pi, sin
+
+
+class SimAgent(GAgent):
+
+    """ A simulated unicycle robot. It follows its trajectory in the
+    simulator process, without worker process: **advance** is called
+    by the simulation at each step. The robot turns in place towards
+    the next waypoint at **turn_rate**, then drives straight to it at
+    **speed**.
+
+    Attributes
+    ----------
+    x: float
+        The x-coordinate of the robot.
+    y: float
+        The y-coordinate of the robot.
+    alpha: float
+        The orientation of the robot, in radians.
+    speed: float
+        The linear speed, in world units per second.
+    turn_rate: float
+        The angular speed, in radians per second.
+    trajectory: List[Tuple[float, float]]
+        The waypoints the robot follows.
+    index: int
+        The index of the waypoint the robot drives to.
+    odometer: float
+        The distance driven since the creation of the robot.
+
+    Methods
+    -------
+
+    get_position():
+        Gets the position of the robot.
+    follow_trajectory(points):
+        Replaces the trajectory.
+    update_trajectory(points, start):
+        Replaces the end of the trajectory.
+    stop_trajectory():
+        Clears the trajectory.
+    move(x, y):
+        Teleports the robot.
+    stop():
+        Stops the robot.
+    advance(dt):
+        Moves the robot along its trajectory for some time.
+    """
+
+    def __init__(self, position: Tuple[float, float, float],
+                 speed: float, turn_rate: float = inf) -> None:
+        """ Initializes a still robot.
+
+        Args:
+            position (Tuple[float, float, float]):
+                The position in **[x, y, alpha]** format
+            speed (float):
+                The linear speed, in world units per second
+            turn_rate=inf (float):
+                The angular speed, in radians per second
+        """
+        super().__init__()
+        self.x, self.y, self.alpha = position
+        self.speed = speed
+        self.turn_rate = turn_rate
+        self.trajectory = []
+        self.index = 0
+        self.odometer = 0.0
+
+    def get_position(self) -> Tuple[float, float, float]:
+        return self.x, self.y, self.alpha
+
+    def follow_trajectory(self, points: Iterable[Tuple[float, float]]) -> None:
+        self.trajectory = list(points)
+        self.index = 0
+
+    def update_trajectory(self,
+                          points: List[Tuple[float, float]],
+                          start: int) -> None:
+        self.trajectory = list(points)
+        self.index = min(self.index, start, len(self.trajectory) - 1)
+
+    def stop_trajectory(self) -> None:
+        self.stop()
+
+    def move(self, x: float, y: float) -> None:
+        self.x, self.y = x, y
+
+    def stop(self) -> None:
+        self.trajectory = []
+        self.index = 0
+
+    def advance(self, dt: float) -> None:
+        """ Moves the robot along its trajectory for **dt** seconds.
+            Turning and driving share the time, so the robot may stop
+            between two waypoints. It stays on the last waypoint.
+
+        Args:
+            dt (float):
+                The duration, in seconds
+        """
+        while dt > 0 and self.index < len(self.trajectory):
+            tx, ty = self.trajectory[self.index]
+            distance = hypot(tx - self.x, ty - self.y)
+            if distance > 1e-9:
+                heading = atan2(ty - self.y, tx - self.x)
+                error = (heading - self.alpha + pi) % (2 * pi) - pi
+                turn = abs(error) / self.turn_rate
+                if turn > dt:
+                    self.alpha += dt * self.turn_rate * (1 if error > 0
+                                                         else -1)
+                    return
+                self.alpha = heading
+                dt -= turn
+                step = min(distance, self.speed * dt)
+                self.x += step * cos(heading)
+                self.y += step * sin(heading)
+                self.odometer += step
+                dt -= step / self.speed
+                if step < distance:
+                    return
+            self.x, self.y = tx, ty
+            if self.index == len(self.trajectory) - 1:
+                return
+            self.index += 1
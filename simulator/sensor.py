@@ -0,0 +1,147 @@
+from lpastar_pf.ARaySensor import ARaySensor
+from simulator.terrain import MovingObstacle, Terrain
+from typing import Iterable, List, Tuple
+import numpy as np
+
+
+class RaySensor(ARaySensor):
+
+    """ A simulated range sensor. Rays are cast all around the sensor
+    and sampled every half case up to **max_range**: a ray stops on the
+    first occupied case of the terrain or the first moving obstacle it
+    meets. All rays are sampled at once with array operations.
+
+    Occupied cases are reported as obstacles of half a case centered on
+    the case, so they cover this case only. Moving obstacles are
+    reported whole, with their velocity. The rays end on what they hit,
+    or at their range, or where they leave the terrain, which is not a
+    hit.
+
+    Attributes
+    ----------
+    terrain: Terrain
+        The static world.
+    obstacles: List[MovingObstacle]
+        The moving obstacles.
+    rays: int
+        The number of rays.
+    max_range: float
+        The range of the rays, in world units.
+
+    Methods
+    -------
+
+    scan(origin):
+        Casts the rays.
+    scan_rays(origin):
+        Gets the ends of the rays.
+    cast(origin):
+        Gets the obstacles hit by the rays.
+    __sample(origin):
+        Samples the rays.
+    """
+
+    def __init__(self, terrain: Terrain,
+                 obstacles: Iterable[MovingObstacle],
+                 rays: int, max_range: float) -> None:
+        """ Initializes the sensor.
+
+        Args:
+            terrain (Terrain):
+                The static world
+            obstacles (Iterable[MovingObstacle]):
+                The moving obstacles
+            rays (int):
+                The number of rays
+            max_range (float):
+                The range of the rays, in world units
+        """
+        self.terrain = terrain
+        self.obstacles = list(obstacles)
+        self.rays = rays
+        self.max_range = max_range
+
+    def scan(self, origin: Tuple[float, float, float]) -> \
+            List[Tuple[float, ...]]:
+        return self.cast(origin)
+
+    def scan_rays(self, origin: Tuple[float, float, float]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        xs, ys, _, _, occupied, moving, outside = self.__sample(origin)
+        blocked = outside | occupied | (moving >= 0)
+        # Rays which hit nothing end on their last sample.
+        first = np.where(blocked.any(axis=1), np.argmax(blocked, axis=1),
+                         xs.shape[1] - 1)
+        rays = np.arange(self.rays)
+        endpoints = np.stack((xs[rays, first], ys[rays, first]), axis=1)
+        return endpoints, blocked[rays, first] & ~outside[rays, first]
+
+    def cast(self, origin: Tuple[float, float, float]) -> \
+            List[Tuple[float, ...]]:
+        """ Casts the rays from **origin** and gets what they hit.
+
+        Args:
+            origin (Tuple[float, float, float]):
+                The position of the sensor in **[x, y, alpha]** format
+
+        Returns:
+            List[Tuple[float, ...]]: The occupied cases in **[x, y, w]**
+            format and the moving obstacles in **[x, y, w, vx, vy]**
+            format
+        """
+        _, _, cis, cjs, occupied, moving, outside = self.__sample(origin)
+        blocked = outside | occupied | (moving >= 0)
+        first = np.argmax(blocked, axis=1)
+        hit = blocked[np.arange(self.rays), first]
+        rays = np.nonzero(hit)[0]
+        first = first[rays]
+
+        found = []
+        for k in sorted(set(moving[rays, first].tolist()) - {-1}):
+            found.append(self.obstacles[k].as_tuple())
+        cases = occupied[rays, first] & (moving[rays, first] < 0)
+        for i, j in sorted(set(zip(cis[rays, first][cases].tolist(),
+                                   cjs[rays, first][cases].tolist()))):
+            x, y = self.terrain.center(i, j)
+            found.append((x, y, self.terrain.resolution / 2))
+        return found
+
+    def __sample(self, origin: Tuple[float, float, float]
+                 ) -> Tuple[np.ndarray, ...]:
+        """ Samples the rays from **origin** every half case.
+
+        Args:
+            origin (Tuple[float, float, float]):
+                The position of the sensor in **[x, y, alpha]** format
+
+        Returns:
+            Tuple[np.ndarray, ...]: **rays x samples** grids of the
+            coordinates of the samples, of their cases, True where the
+            case is occupied, of the index of the moving obstacle under
+            the sample, -1 if none, and True where the sample is out of
+            the terrain
+        """
+        resolution = self.terrain.resolution
+        angles = origin[2] + np.linspace(0.0, 2 * np.pi, self.rays,
+                                         endpoint=False)
+        distances = np.arange(resolution / 2, self.max_range,
+                              resolution / 2)
+        # rays x samples points.
+        xs = origin[0] + np.outer(np.cos(angles), distances)
+        ys = origin[1] + np.outer(np.sin(angles), distances)
+
+        columns, rows = self.terrain.occupancy.shape
+        cis = np.floor(xs / resolution).astype(np.int64)
+        cjs = np.floor(ys / resolution).astype(np.int64)
+        outside = (cis < 0) | (cis >= columns) | (cjs < 0) | (cjs >= rows)
+        occupied = self.terrain.occupancy[np.clip(cis, 0, columns - 1),
+                                          np.clip(cjs, 0, rows - 1)]
+        occupied &= ~outside
+
+        # Index of the moving obstacle under each point, -1 if none.
+        moving = np.full(xs.shape, -1)
+        for k, obstacle in enumerate(self.obstacles):
+            half = obstacle.w / 2
+            moving[(np.abs(xs - obstacle.x) <= half)
+                   & (np.abs(ys - obstacle.y) <= half)] = k
+        return xs, ys, cis, cjs, occupied, moving, outside
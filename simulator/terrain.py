@@ -1 +1,228 @@
-pass
+from typing import List, Tuple
+import numpy as np
+
+
+class Terrain:
+
+    """ The static world of the simulator: a grid of cases which are
+    free or occupied, indexed as the vertices of a GMap, **(i, j)**
+    covering **[i * resolution, (i + 1) * resolution)** on x and
+    **[j * resolution, (j + 1) * resolution)** on y.
+
+    Attributes
+    ----------
+    resolution: float
+        The size of a case in world units.
+    occupancy: np.ndarray
+        A **columns x rows** grid, True where a case is occupied.
+    width: float
+        The width of the world.
+    height: float
+        The height of the world.
+
+    Methods
+    -------
+
+    random(width, height, resolution, density, rng):
+        Generates a terrain with random walls.
+    is_occupied(x, y):
+        Tells if the case under a point is occupied.
+    obstacles():
+        Gets the indices of the occupied cases.
+    free_cases():
+        Gets the indices of the free cases.
+    center(i, j):
+        Gets the center of a case.
+    """
+
+    def __init__(self, occupancy: np.ndarray, resolution: float) -> None:
+        """ Initializes the terrain from an occupancy grid.
+
+        Args:
+            occupancy (np.ndarray):
+                A **columns x rows** grid, True where a case is occupied
+            resolution (float):
+                The size of a case in world units
+        """
+        self.occupancy = np.asarray(occupancy, dtype=bool)
+        self.resolution = resolution
+        self.width = self.occupancy.shape[0] * resolution
+        self.height = self.occupancy.shape[1] * resolution
+
+    @classmethod
+    def random(cls, width: float, height: float, resolution: float,
+               density: float, rng: np.random.Generator) -> "Terrain":
+        """ Generates a terrain with straight walls of random length,
+            position and direction, until **density** of the cases
+            are occupied.
+
+        Args:
+            width (float):
+                The width of the world
+            height (float):
+                The height of the world
+            resolution (float):
+                The size of a case in world units
+            density (float):
+                The fraction of occupied cases
+            rng (np.random.Generator):
+                The random generator
+
+        Returns:
+            Terrain: The terrain
+        """
+        columns, rows = int(width / resolution), int(height / resolution)
+        occupancy = np.zeros((columns, rows), dtype=bool)
+        longest = max(2, min(columns, rows) // 3)
+        while occupancy.mean() < density:
+            i, j = rng.integers(0, columns), rng.integers(0, rows)
+            length = rng.integers(2, longest + 1)
+            if rng.random() < 0.5:
+                occupancy[i:i + length, j] = True
+            else:
+                occupancy[i, j:j + length] = True
+        return cls(occupancy, resolution)
+
+    def is_occupied(self, x: float, y: float) -> bool:
+        """ Tells if the case under **(x, y)** is occupied. The outside
+            of the world is occupied.
+
+        Args:
+            x (float):
+                The x-coordinate
+            y (float):
+                The y-coordinate
+
+        Returns:
+            bool: True if the case is occupied
+        """
+        i, j = int(x // self.resolution), int(y // self.resolution)
+        columns, rows = self.occupancy.shape
+        if not (0 <= i < columns and 0 <= j < rows):
+            return True
+        return bool(self.occupancy[i, j])
+
+    def obstacles(self) -> List[Tuple[int, int]]:
+        """ Gets the indices of the occupied cases.
+
+        Returns:
+            List[Tuple[int, int]]: The occupied cases
+        """
+        return list(map(tuple, np.argwhere(self.occupancy).tolist()))
+
+    def free_cases(self) -> np.ndarray:
+        """ Gets the indices of the free cases.
+
+        Returns:
+            np.ndarray: A **N x 2** array of indices **(i, j)**
+        """
+        return np.argwhere(~self.occupancy)
+
+    def center(self, i: int, j: int) -> Tuple[float, float]:
+        """ Gets the center of the case **(i, j)**.
+
+        Args:
+            i (int):
+                First index of the case
+            j (int):
+                Second index of the case
+
+        Returns:
+            Tuple[float, float]: The coordinates of the center
+        """
+        return (i + 0.5) * self.resolution, (j + 0.5) * self.resolution
+
+
+class MovingObstacle:
+
+    """ A square obstacle which moves straight at constant velocity and
+    bounces off the borders of the world.
+
+    Attributes
+    ----------
+    x: float
+        The x-coordinate of the center.
+    y: float
+        The y-coordinate of the center.
+    w: float
+        The width of the square.
+    vx: float
+        The velocity along x, in world units per second.
+    vy: float
+        The velocity along y, in world units per second.
+
+    Methods
+    -------
+
+    advance(dt, width, height):
+        Moves the obstacle for some time.
+    contains(x, y):
+        Tells if a point is inside the obstacle.
+    as_tuple():
+        Gets the obstacle in **[x, y, w, vx, vy]** format.
+    """
+
+    def __init__(self, x: float, y: float, w: float,
+                 vx: float, vy: float) -> None:
+        """ Initializes the obstacle.
+
+        Args:
+            x (float):
+                The x-coordinate of the center
+            y (float):
+                The y-coordinate of the center
+            w (float):
+                The width of the square
+            vx (float):
+                The velocity along x
+            vy (float):
+                The velocity along y
+        """
+        self.x, self.y, self.w = x, y, w
+        self.vx, self.vy = vx, vy
+
+    def advance(self, dt: float, width: float, height: float) -> None:
+        """ Moves the obstacle for **dt** seconds. Its velocity is
+            reflected when it leaves the world.
+
+        Args:
+            dt (float):
+                The duration, in seconds
+            width (float):
+                The width of the world
+            height (float):
+                The height of the world
+        """
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        half = self.w / 2
+        if not half <= self.x <= width - half:
+            self.vx = -self.vx
+            self.x = min(max(self.x, half), width - half)
+        if not half <= self.y <= height - half:
+            self.vy = -self.vy
+            self.y = min(max(self.y, half), height - half)
+
+    def contains(self, x: float, y: float) -> bool:
+        """ Tells if **(x, y)** is inside the obstacle.
+
+        Args:
+            x (float):
+                The x-coordinate
+            y (float):
+                The y-coordinate
+
+        Returns:
+            bool: True if the point is inside
+        """
+        half = self.w / 2
+        return abs(x - self.x) <= half and abs(y - self.y) <= half
+
+    def as_tuple(self) -> Tuple[float, float, float, float, float]:
+        """ Gets the obstacle as a sensor reports it.
+
+        Returns:
+            Tuple[float, float, float, float, float]: The obstacle in
+            **[x, y, w, vx, vy]** format
+        """
+        return self.x, self.y, self.w, self.vx, self.vy
@@ -0,0 +1,127 @@
+import pytest
+import numpy as np
+from math import pi
+from simulator.engine import Simulation, soak, summarize
+from simulator.robot import SimAgent
+from simulator.sensor import RaySensor
+from simulator.terrain import MovingObstacle, Terrain
+
+
+@pytest.fixture
+def config():
+    return {
+        "width": 300,
+        "height": 200,
+        "case_size": 10,
+        "density": 0.1,
+        "moving_obstacles": 2,
+        "obstacle_width": 20,
+        "obstacle_speed": 20,
+        "agent_speed": 100,
+        "rays": 60,
+        "sensor_range": 100,
+        "dt": 0.1,
+        "mission_time": 60,
+        "planner": {
+            "free_case_value": 1,
+            "obstacle_case_value": 1000,
+            "heuristics_multiplier": 1
+        }
+    }
+
+
+def test_agent_kinematics():
+    agent = SimAgent((0.0, 0.0, 0.0), speed=10.0, turn_rate=pi)
+    agent.follow_trajectory([(10.0, 0.0), (10.0, 10.0)])
+    agent.advance(0.5)
+    assert agent.get_position() == pytest.approx((5.0, 0.0, 0.0))
+    # Half a second to reach the first waypoint, half to turn.
+    agent.advance(1.0)
+    assert agent.get_position() == pytest.approx((10.0, 0.0, pi / 2))
+    agent.advance(5.0)
+    assert agent.get_position() == pytest.approx((10.0, 10.0, pi / 2))
+    assert agent.odometer == pytest.approx(20.0)
+
+
+def test_agent_keeps_waypoint_on_update():
+    agent = SimAgent((0.0, 0.0, 0.0), speed=10.0)
+    agent.follow_trajectory([(0.0, 0.0), (10.0, 0.0), (20.0, 0.0)])
+    agent.advance(1.5)
+    assert agent.index == 2
+    agent.update_trajectory([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)], 2)
+    assert agent.index == 2
+    agent.stop_trajectory()
+    assert agent.trajectory == []
+
+
+def test_rays_stop_on_walls():
+    occupancy = np.zeros((20, 20), dtype=bool)
+    occupancy[10, 5:15] = True
+    occupancy[12, 5:15] = True
+    sensor = RaySensor(Terrain(occupancy, 10.0), [], 120, 150.0)
+    found = sensor.cast((55.0, 95.0, 0.0))
+    assert (105.0, 95.0, 5.0) in found
+    assert all(x < 110.0 for x, _, _ in found)
+
+
+def test_rays_see_moving_obstacles():
+    obstacle = MovingObstacle(100.0, 50.0, 20.0, -5.0, 0.0)
+    sensor = RaySensor(Terrain(np.zeros((20, 10), dtype=bool), 10.0),
+                       [obstacle], 60, 100.0)
+    assert sensor.cast((50.0, 50.0, 0.0)) == [(100.0, 50.0, 20.0,
+                                               -5.0, 0.0)]
+
+
+def test_rays_end_on_hits():
+    occupancy = np.zeros((20, 20), dtype=bool)
+    occupancy[10, :] = True
+    sensor = RaySensor(Terrain(occupancy, 10.0), [], 4, 150.0)
+    endpoints, hits = sensor.scan_rays((55.0, 95.0, 0.0))
+    # The other rays leave the terrain, which is not a hit.
+    assert hits.tolist() == [True, False, False, False]
+    assert np.floor(endpoints[0] / 10.0).tolist() == [10, 9]
+    assert endpoints[2][0] < 0.0
+
+
+def test_obstacles_bounce():
+    obstacle = MovingObstacle(15.0, 50.0, 10.0, -10.0, 0.0)
+    obstacle.advance(1.5, 100.0, 100.0)
+    assert (obstacle.x, obstacle.vx) == (5.0, 10.0)
+
+
+def test_simulation_steps_on_sleep():
+    agent = SimAgent((5.0, 5.0, 0.0), 10.0)
+    agent.follow_trajectory([(5.0, 5.0), (50.0, 5.0)])
+    simulation = Simulation(Terrain(np.zeros((10, 10), dtype=bool), 10.0),
+                            agent, [], 8, 50.0)
+    simulation.clock.sleep(0.5)
+    simulation.clock.sleep(0.5)
+    assert simulation.time == 1.0
+    assert simulation.steps == 2
+    assert agent.get_position()[0] == pytest.approx(15.0)
+    assert len(simulation.latencies) == 1
+
+
+def test_soak(config):
+    results = soak(config, 3, seed=1)
+    assert all(result["reached"] for result in results)
+    summary = summarize(results)
+    assert summary["missions"] == 3
+    assert summary["reached"] == 3
+    assert 0 < summary["latency_p50"] <= summary["latency_max"]
+    # Virtual time is not slept.
+    assert sum(result["wall"] for result in results) < \
+        summary["virtual_time"]
+
+
+def test_soak_with_belief_grid(config):
+    config["known_terrain"] = False
+    config["planner"]["belief_grid"] = True
+    results = soak(config, 3, seed=1)
+    assert all(result["reached"] for result in results)
+
+
+def test_soak_with_infinite_obstacle_cost(config):
+    config["planner"]["obstacle_case_value"] = float("inf")
+    results = soak(config, 2, seed=1)
+    assert all(result["reached"] for result in results)
@@ -0,0 +1,87 @@
+import sys
+import pygame
+
+
+BACKGROUND = (80, 80, 80)
+CLEAR_COLOR = (255, 255, 255)
+OBSTACLE_COLOR = (0, 0, 0)
+MOVING_COLOR = (0, 0, 255)
+TRAJECTORY_COLOR = (0, 160, 0)
+ROBOT_COLOR = (255, 0, 0)
+
+
+class Viewer:
+
+    """ Draws a simulation with pygame after each step, one world unit
+    per pixel. The drawing is paced to the virtual time, so the robot
+    moves at its real speed on screen. pygame is only needed by this
+    module, the engine runs without it.
+
+    Attributes
+    ----------
+    screen: pygame.Surface
+        The window.
+    clock: pygame.time.Clock
+        Paces the drawing.
+    dt: float
+        The virtual duration of a step, in seconds.
+
+    Methods
+    -------
+
+    __call__(simulation):
+        Draws the simulation.
+    """
+
+    def __init__(self, width: int, height: int, dt: float) -> None:
+        """ Opens the window.
+
+        Args:
+            width (int):
+                The width of the world
+            height (int):
+                The height of the world
+            dt (float):
+                The virtual duration of a step, in seconds
+        """
+        self.dt = dt
+        pygame.init()
+        self.screen = pygame.display.set_mode((int(width), int(height)))
+        self.clock = pygame.time.Clock()
+
+    def __call__(self, simulation) -> None:
+        """ Draws the terrain, the moving obstacles, the trajectory and
+            the robot. Closing the window exits.
+
+        Args:
+            simulation (Simulation):
+                The simulation to draw
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sys.exit(0)
+
+        terrain = simulation.terrain
+        size = int(terrain.resolution)
+        self.screen.fill(BACKGROUND)
+        columns, rows = terrain.occupancy.shape
+        for i in range(columns):
+            for j in range(rows):
+                color = OBSTACLE_COLOR if terrain.occupancy[i, j] \
+                    else CLEAR_COLOR
+                pygame.draw.rect(self.screen, color,
+                                 pygame.Rect((i * size + 1, j * size + 1),
+                                             (size - 2, size - 2)))
+        for obstacle in simulation.obstacles:
+            pygame.draw.rect(self.screen, MOVING_COLOR,
+                             pygame.Rect((obstacle.x - obstacle.w / 2,
+                                          obstacle.y - obstacle.w / 2),
+                                         (obstacle.w, obstacle.w)))
+        agent = simulation.agent
+        if len(agent.trajectory) > 1:
+            pygame.draw.lines(self.screen, TRAJECTORY_COLOR, False,
+                              agent.trajectory, 2)
+        pygame.draw.circle(self.screen, ROBOT_COLOR,
+                           (agent.x, agent.y), size / 2)
+        pygame.display.flip()
+        self.clock.tick(1 / self.dt)